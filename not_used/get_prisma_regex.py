@@ -0,0 +1,95 @@
+'''
+Previous regex-based parser of a single Prisma Cloud policy reference .adoc file
+Replaced with single-pass line tokenizer in parse_pac/get_prisma.py, saved for corpus equivalence checks(see tests/test_prisma_tokenizer.py)
+Fix section regexes scan the rest of the document per match; code blocks are cut at the first "*"
+'''
+import re
+import json
+
+MISSING = None
+
+severity_unify = {
+    "CRITICAL": "Critical",
+    "HIGH": "High",
+    "MEDIUM": "Medium",
+    "LOW": "Low",
+    "INFO": "Info"
+}
+
+def parse_prisma_records_regex(text: str) -> list:
+    """
+    Parse Prisma/Checkov policy doc into a list of records.
+    Get List of Frameworks, find if there are examples related to it.
+    Create separate rule per framework within rule if there is an example.
+    If not, empty out example and create barebone row.
+    Columns:
+    ID(Prisma Cloud ID), CheckovID, Title, Severity, Subcategory, Framework(Divide each framework to single row), Description,
+    Query Document, Related Document, Insecure Code Example 1
+    """
+    
+    def grab(pattern):
+        m = re.search(pattern, text, re.IGNORECASE)
+        return m.group(1).strip() if m else None
+
+    # Metadata
+    title = grab(r'^\s*(?:==\s*)([^\n]*)')
+    prisma_id = grab(r'Prisma Cloud Policy ID\s*\|\s*(.+)')
+    query_document = grab(r'Checkov ID\s*\|\s*(.*)\[.+\]')
+    checkov_id = grab(r'Checkov(?: Check)? ID\s*\|\s*(?:[^\[\n]*\[)?([A-Z0-9_]+)(?:\])?')
+    severity = grab(r'Severity\s*\|\s*(.+)')
+    subtype = grab(r'Subtype\s*\|\s*(.+)')
+
+    # Description
+    desc_m = re.search(r'Description\s+([\s\S]*?)(?=[/=])',
+                       text, re.MULTILINE | re.IGNORECASE)
+    description = desc_m.group(1).strip() if desc_m else None
+
+    # Fix section
+    # Ignore "Fix - Runtime"; CLI fixes, not relevant
+    fix_total_block = re.search(r'Fix - Buildtime[\s\S]*(\*[\s\S]*)', text, re.IGNORECASE)
+    records = []
+
+    def clean(s):
+        if s is None:
+            return MISSING
+        return re.sub(r'^\s*\*+\s*', '', s, flags=re.MULTILINE).strip()
+    
+    if fix_total_block:
+        fix_text = fix_total_block.group(0)
+        framework_sections = re.split(r"\*(\w+)\*", fix_text)
+
+        for i in range(1, len(framework_sections), 2):
+            framework = framework_sections[i]
+            body = framework_sections[i+1]
+
+            '''
+            # Resource and Argument
+            # Removed for better unification between other open-source tools, enable if necessary
+            resource = re.search(r"\* *Resource:\* *([^\n]+)", body)
+            argument = re.search(r"\* *Argument:\* *([^\n]+)", body)
+            '''
+            
+            # Code block(s)
+            code_blocks = re.findall(r"(\[[^*]*)", body, re.S)
+            code_final = [code.strip() for code in code_blocks]
+
+            # Create row per framework
+            '''
+            # Removed for better unification between other open-source tools, enable if necessary
+            "Resource": resource.group(1) if resource else None,
+            "Argument": argument.group(1) if argument else None,
+            '''
+            records.append({
+                "Open-source Tool": "Prisma",
+                "ID": clean(prisma_id),
+                "CheckovID": clean(checkov_id),
+                "Title": clean(title),
+                "Severity": severity_unify[clean(severity)] if clean(severity) in severity_unify.keys() else clean(severity),
+                "Subcategory": clean(subtype),
+                "IaC Framework": clean(framework),
+                "Description": clean(description),
+                "Query Document": clean(query_document),
+                "Insecure Code Example 1": json.dumps([code_final]) if len(code_final) != 0 else MISSING
+            })
+
+    return records
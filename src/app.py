@@ -4,15 +4,148 @@ from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 from ydata_profiling import ProfileReport
 
 import os
-import io
 import re
+import hashlib
+import numpy as np
 import pandas as pd
 
-from init_setup.setup_integrity import data_init, data_checker, create_ver_token
-from init_setup.setup_base import dir_init, dir_update, get_update_tool_list
-from init_setup.setup_data import get_pac_folder, get_pac_url
-from init_setup.setup_save_master import save_dataframe
-from parse_pac.parse_tool import get_pac_of_tool
+from init_setup.setup_integrity import data_init
+from init_setup.setup_base import dir_init
+from init_setup.setup_load_master import open_master
+from init_setup.setup_shared_master import read_master_pointer
+from init_setup.setup_code_store import CODE_REFS, load_code_examples, attach_code_examples
+from init_setup.setup_pipeline import run_download
+from init_setup.setup_jobs import JobRunner, ACTIVE_STATES, DONE, FAILED
+from search_pac.search_query import QueryError
+from search_pac.search_cache import QueryCache
+from search_pac.search_page import ROW_ID, filter_column, get_page, get_sorted
+from search_pac.search_facet import FACET_COLUMNS, build_facet_index, load_facet_index, facet_positions, facet_counts
+from search_pac.search_equiv import build_equivalence, load_equivalence, build_lookup, counterparts
+from search_pac.search_export import EXPORT_FORMATS, export_key, export_bytes
+from search_pac.search_similar import build_similarity_index, load_similarity_index, find_similar
+from search_pac.search_api import DEFAULT_HOST, start_api_server
+
+def master_key(master_df_csv):
+    '''Version of published shared MASTER; mtime of MASTER file if none is published'''
+    pointer = read_master_pointer(os.path.dirname(master_df_csv))
+    return pointer["version"] if pointer else os.path.getmtime(master_df_csv)
+
+@st.cache_resource(max_entries=1, show_spinner="Loading MASTER database...")
+def get_master(master_df_csv, key):
+    '''
+    Load compact MASTER once per version; shared by all sessions
+    Shared MASTER is memory-mapped if published(see setup_shared_master), else read from the .csv file.
+    key is only used as cache key; only the latest version is kept, so a rebuilt MASTER replaces the old mapping.
+    Returns:
+    1) master_df: Compact MASTER dataframe
+    2) mem_report: Memory usage per column before/after compaction; None if memory-mapped
+    3) version: Version of the loaded MASTER; key of its search indexes, so they always match master_df
+    '''
+    return open_master(master_df_csv, key)
+
+@st.cache_resource(show_spinner="Loading search indexes...")
+def get_facets(master_db_dir, version, _master_df):
+    '''
+    Load facet index saved with MASTER; rebuilt in memory if missing or stale
+    _master_df is excluded from cache key; version(see get_master) identifies it
+    '''
+    facets = load_facet_index(master_db_dir, version, len(_master_df))
+    return facets if facets is not None else build_facet_index(_master_df)
+
+@st.cache_resource(show_spinner="Loading equivalence mapping...")
+def get_equivalence(master_db_dir, version, _master_df):
+    '''
+    Load cross-tool equivalence table saved with MASTER as constant-time lookup tables
+    Rebuilt in memory if missing or stale
+    '''
+    equiv_df = load_equivalence(master_db_dir, version, len(_master_df))
+    return build_lookup(equiv_df if equiv_df is not None else build_equivalence(_master_df))
+
+@st.cache_resource(show_spinner="Loading similarity index...")
+def get_similarity(master_db_dir, version, _master_df):
+    '''
+    Load MinHash signatures saved with MASTER and rebuild LSH buckets
+    Rebuilt in memory if missing or stale
+    '''
+    index = load_similarity_index(master_db_dir, _master_df, version)
+    return index if index is not None else build_similarity_index(_master_df)
+
+@st.cache_resource
+def get_query_cache():
+    '''Search result cache of MASTER row positions; shared by all sessions'''
+    return QueryCache()
+
+@st.cache_data(max_entries=16, show_spinner="Building export...")
+def build_export(cache_key, file_type, _df):
+    '''
+    Build export bytes once per cache key; _df is excluded from hashing
+    cache_key covers search term, filter state and MASTER version
+    '''
+    return export_bytes(_df, file_type)
+
+@st.cache_resource
+def get_job_runner(project_root, pac_raw_dir, pac_db_dir):
+    '''Single background job runner per process; shared by all sessions'''
+    def run_job(params, log, progress):
+        return run_download(
+            project_root, pac_raw_dir, pac_db_dir,
+            params["tools"], params["files"], params["db_only"], params["incremental"], params.get("force", False),
+            log=log, progress=progress
+        )
+    return JobRunner(os.path.join(pac_db_dir, ".jobs"), run_job)
+
+def render_download_job(runner, job):
+    '''Progress/logs of a download job'''
+    st.subheader("📋 Download Status")
+    st.progress(min(max(job["progress"], 0.0), 1.0))
+    if job["status"] == DONE:
+        st.markdown("✅ **All tasks completed!** 🎉")
+    else:
+        st.markdown(f"**Status:** {job['status']} — {job['progress_text']}")
+    with st.expander("Logs", expanded=job["status"] != DONE):
+        for line in runner.get_logs(job["id"]):
+            show = {"success": st.success, "error": st.error}.get(line["kind"], st.info)
+            show(line["message"])
+    if job["status"] == DONE and st.session_state.get("download_job_done") != job["id"]:
+        st.session_state["download_job_done"] = job["id"]
+        st.balloons()
+    elif job["status"] == FAILED:
+        st.error(f"❌ Download failed: {job['error']}")
+
+@st.fragment(run_every=2)
+def poll_download_job(runner, job_id):
+    '''Polls an active job; only this fragment reruns while polling'''
+    job = runner.get_job(job_id)
+    if job is None:
+        return
+    if job["status"] not in ACTIVE_STATES:
+        # Rerun whole page once; it then shows the finished job statically(stopping this timer) and picks up new MASTER
+        st.rerun()
+    render_download_job(runner, job)
+
+def show_download_job(runner, job_id):
+    '''Polls job while it is queued/running; finished jobs are rendered once without a timer'''
+    job = runner.get_job(job_id)
+    if job is None:
+        return
+    if job["status"] in ACTIVE_STATES:
+        poll_download_job(runner, job_id)
+    else:
+        render_download_job(runner, job)
+
+@st.cache_resource
+def get_api_server(master_db_dir):
+    '''Start query API alongside the app once per process if PAC_API_PORT is set(see search_api)'''
+    port = os.environ.get("PAC_API_PORT")
+    if not port:
+        return None
+    return start_api_server(master_db_dir, os.environ.get("PAC_API_HOST", DEFAULT_HOST), int(port))
+
+def jump_to_policy(policy_id):
+    '''Button callback; searches for given policy ID with all facet filters cleared'''
+    st.session_state["global_search"] = f'"{policy_id}"'
+    for col in FACET_COLUMNS:
+        st.session_state[f"facet_{col}"] = []
 
 def app():
     st.set_page_config(
@@ -22,7 +155,9 @@ def app():
     # Create all base directories
     project_root, pac_raw_dir, pac_db_dir, master_db_dir = dir_init()
     master_df_csv = os.path.join(master_db_dir, "MASTER_db.csv")
+    code_store_dir = os.path.join(pac_db_dir, "code_store")
     master_df = pd.DataFrame()
+    get_api_server(master_db_dir)
     
     with st.sidebar:
         selected = option_menu(
@@ -42,7 +177,7 @@ def app():
 
         - **Collects & normalizes policies** from popular open-source IaC scanners (e.g., **Checkov**, **KICS**, **Terrascan**, **Trivy**).
         - **Creates a unified database** to look-up and compare what polices each open-source tool uses.
-        - **Streamlines results** into standardized outputs (**CSV**, **JSON**, **SQL**, **XLSX**).
+        - **Streamlines results** into standardized outputs (**CSV**, **JSON**, **NDJSON**, **SQL**, **XLSX**).
         
         ---
         
@@ -53,8 +188,8 @@ def app():
         | Menu | Icon | Description |
         |------|------|-------------|
         | **Home** | :house: | 🏃 Quick overview and essential info at a glance. |
-        | **Download** | :arrow_down: | 📥 Download/update your raw PaC files and get most recent PaCs per tool <br> 🗂️ Save combined/individual PaC database as file(**CSV**, **JSON**, **SQL**, **XLSX**) |
-        | **Search** | :mag: | 🕹️ Search PaCs with specific keywords or filtering out data <br> 🗂️ Save search/filtered results as a **CSV** or **XLSX** file for closer examination |
+        | **Download** | :arrow_down: | 📥 Download/update your raw PaC files and get most recent PaCs per tool <br> 🗂️ Save combined/individual PaC database as file(**CSV**, **JSON**, **NDJSON**, **SQL**, **XLSX**) |
+        | **Search** | :mag: | 🕹️ Search PaCs with specific keywords or filtering out data <br> 🗂️ Save search/filtered results as a **CSV**, **XLSX**, **Parquet** or **NDJSON** file for closer examination |
         | **Visualize** | :bar_chart: | 🗒️ Visualize statistics and details of the combined database|
         
         ---
@@ -79,11 +214,11 @@ def app():
 
         - ⚡ **Fast & Lightweight** – Scans large repos of multiple open-source IaC scanning tools within seconds.
         - 🛡️ **Thorough Policy Lookups** – Find all PaC files of each open-source tool, some which do not provide official documents for.
-        - 🔍 **Easy search engine** – Easily search for content within the app and export search results in either **.csv or .xlsx** for closer examination.
+        - 🔍 **Easy search engine** – Easily search for content within the app and export search results as **.csv, .xlsx, .parquet or .ndjson** for closer examination.
         - 🌍 **Broad IaC Coverage** – Library contains PaCs for multiple IaC languages, including Terraform, CloudFormation, Kubernetes, Docker, Helm charts, and generic YAML/JSON.
         - 📚 **Curated PaC Library** – Aggregates rules from open‑source IaC scanners into one pandas dataframe.
         - 🧠 **Smart Normalization** – Preserved original PaC files from each tool as much as possible to maintain its contents and meaning.
-        - 📊 **Flexible DB** – Save results in various file formats, such as **.csv, .sql, .json, .xlsx.**
+        - 📊 **Flexible DB** – Save results in various file formats, such as **.csv, .sql, .json, .ndjson, .xlsx.**
         - 🐍 **Poetry‑Powered** – Reproducible environments & dependency pinning with **Poetry**.
         - 👶 **Straightforward UI** - Based on Streamlit, launch an easy-to-use UI to download, search and look up data.
         
@@ -98,7 +233,7 @@ def app():
         # Get version info and run data integrity check
         version_info, version, date, full_tool_list, full_tool_info = data_init(project_root)
         # Supported full file list; update manually if necessary
-        full_file_list = ["csv", "json", "sql", "xlsx"]
+        full_file_list = ["csv", "json", "ndjson", "sql", "xlsx"]
         # Print version info
         st.subheader("📦 PaC_Extract Version Info")
         # Info box for version/date/tools
@@ -129,6 +264,16 @@ def app():
             value=False,
             help="If selected, only database files will be created for selected tools without downloading/updating the raw PaC files."
         )
+        incremental = st.checkbox(
+            "Incremental database update",
+            value=True,
+            help="If selected, database outputs(SQL) only apply inserted/updated/deleted policies since the previous build, and a change log is written per tool."
+        )
+        force = st.checkbox(
+            "Force full refresh",
+            value=False,
+            help="If selected, selected tools are downloaded and parsed again even if their upstream repository did not change since the last download."
+        )
         tools_input = st.multiselect(
             "Select tools to update",
             options=full_tool_list,
@@ -160,135 +305,27 @@ def app():
             if not select_all_files and not files_input:
                 st.error("Please select at least one file type.")
                 return
-            st.success("Download process started...")
-            
-            # Run integrity check
-            is_valid = data_checker(project_root, pac_raw_dir) and os.path.exists(master_df_csv)
-            # Based on integrity check, update directory content
-            dir_update(project_root, pac_raw_dir, is_valid)
-            
-            # Get user inputs
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            task_count = 0
-            up_tool_list = get_update_tool_list(is_valid, tools_input, full_tool_list)
-            # All tools + Master file
-            total_tasks = len(up_tool_list) + 1
-            
-            # Status section
-            if is_valid:
-                st.success("✅ Data integrity check complete — all files are valid!")
-            else:
-                st.error("❗ Invalid file composition — redownloading all files...")
-            if db_only and is_valid:
-                st.info(
-                    f"""
-                    **Creating database files for total {len(up_tool_list)} tools...**\n
-                    **List of tools: {up_tool_list}** \n
-                    **Database file types: {files_input}**
-                    """,
-                    icon="ℹ️"
-                )
+            # Pipeline runs in background job; identical requests share the same job
+            job_id, is_new = get_job_runner(project_root, pac_raw_dir, pac_db_dir).submit({
+                "tools": list(tools_input),
+                "files": list(files_input),
+                "db_only": db_only,
+                "incremental": incremental,
+                "force": force
+            })
+            st.session_state["download_job"] = job_id
+            if is_new:
+                st.success("Download process started...")
             else:
-                st.info(
-                    f"""
-                    **Downloading files for total {len(up_tool_list)} tools...**\n
-                    **List of tools: {up_tool_list}**
-                    """,
-                    icon="ℹ️"
-                )
-            st.markdown("<hr style='margin:0; border: 0.5px solid #ddd;'>", unsafe_allow_html=True)
-            
-            # Update all tools based on user input
-            for tool in up_tool_list:
-                # Setup progress bar
-                if total_tasks > 0:
-                    progress_value = task_count / total_tasks
-                else:
-                    progress_value = 0
-                progress_bar.progress(progress_value)
-                percent = int(progress_value * 100)
-                status_text.markdown(f"**Progress:** {percent}% — Downloading **{tool}**...")
-                tool_raw_path = os.path.join(pac_raw_dir, tool)
-                
-                # First, download RAW PaC files
-                if not db_only or not is_valid:
-                    st.info(
-                        f"""
-                        **Downloading raw PaC files for tool: {tool}**
-                        """,
-                        icon="ℹ️"
-                    )
-                    if full_tool_info[tool]["is_repo"] == "True":
-                        get_pac_folder(
-                            tool_name=tool,
-                            repo_git=full_tool_info[tool]["url"],
-                            folder=full_tool_info[tool]["folder_path"],
-                            dest=tool_raw_path,
-                            ref=full_tool_info[tool]["branch"],
-                        )
-                    else:
-                        get_pac_url(
-                            tool_name=tool,
-                            url=full_tool_info[tool]["url"],
-                            dest=tool_raw_path
-                        )
-                    st.success(f"✅ Raw PaC files for tool - '{tool}' -  saved at: `{tool_raw_path}`")
-                    st.markdown("<hr style='margin:0; border: 0.5px solid #ddd;'>", unsafe_allow_html=True)
-                
-                # Second, save individual file
-                st.info(
-                    f"""
-                    **Creating database files for tool: {tool}**
-                    """,
-                    icon="ℹ️"
-                )
-                head_file_path = os.path.join(tool_raw_path, full_tool_info[tool]["head_path"])
-                tool_df = get_pac_of_tool(tool, head_file_path)
-                master_df = pd.concat([master_df, tool_df], ignore_index=True)
-                tool_db_dir = os.path.join(pac_db_dir, tool)
-                for type in files_input:
-                    output_path = save_dataframe(tool_db_dir, tool_df, tool, type)
-                    st.success(f"✅ Database file for - '{tool}' - in format - '{type}' - saved at: {output_path}\n")
-                st.markdown("<hr style='margin:0; border: 0.5px solid #ddd;'>", unsafe_allow_html=True)
-                task_count += 1
-            
-            # Third and last, save master file
-            st.info(
-                    f"""
-                    **Creating MASTER database files...**
-                    """,
-                    icon="ℹ️"
-            )
-            for full_tool in full_tool_list:
-                if full_tool not in up_tool_list:
-                    tool_raw_path = os.path.join(pac_raw_dir, full_tool)
-                    head_file_path = os.path.join(tool_raw_path, full_tool_info[full_tool]["head_path"])
-                    tool_df = get_pac_of_tool(full_tool, head_file_path)
-                    master_df = pd.concat([master_df, tool_df], ignore_index=True)
-            # REQUIRED: .csv file for master_df
-            master_db_dir = os.path.join(pac_db_dir, "MASTER")
-            if "csv" not in files_input:
-                files_input.append("csv")
-            for type in files_input:
-                save_dataframe(master_db_dir, master_df, "MASTER", type)
-                st.success(f"✅ MASTER database file in format - '{type}' saved at: {output_path}\n")
-            st.markdown("<hr style='margin:0; border: 0.5px solid #ddd;'>", unsafe_allow_html=True)
-            
-            # After all individual files are downloaded, update token
-            if is_valid is False:
-                st.info(
-                    f"""
-                    **Creating version token...**\n
-                    """,
-                    icon="ℹ️"
-                )
-                create_ver_token(pac_raw_dir, version_info)
-            
-            progress_bar.progress(1.0)
-            st.success(f"✅ All tasks completed! 🎉")
-            status_text.markdown("✅ **All tasks completed!** 🎉")
-            st.balloons()
+                st.info("Same download is already in progress — showing its progress.", icon="ℹ️")
+        # Job status; polled without re-running the whole page
+        runner = get_job_runner(project_root, pac_raw_dir, pac_db_dir)
+        job_id = st.session_state.get("download_job")
+        if job_id is None:
+            active = runner.active_job()
+            job_id = active["id"] if active else None
+        if job_id is not None:
+            show_download_job(runner, job_id)
     # Search menu
     elif selected == "Search":
         st.title("🔍 PaC Search")
@@ -300,31 +337,99 @@ def app():
                 Go to 'Main Menu'-'Download PaC Files' and click 'Start Download' button to download all files and try again.
             """)
         else:
-            if master_df.empty:
-                master_df = pd.read_csv(master_df_csv)
-            # Sidebar - Global search input (for filtering rows)
-            search_term = st.text_input("Global Search")
-
-            # Filter the dataframe based on search_term across all columns (case insensitive)
+            # Dataframe and all search indexes are keyed by the same loaded MASTER version
+            master_df, _, master_version = get_master(master_df_csv, master_key(master_df_csv))
+            facets = get_facets(master_db_dir, master_version, master_df)
+            equiv_lookup = get_equivalence(master_db_dir, master_version, master_df)
+            similarity_index = get_similarity(master_db_dir, master_version, master_df)
+            # Sidebar - Facet filters with live counts; current selections are read before drawing widgets
+            selections = {col: st.session_state.get(f"facet_{col}", []) for col in FACET_COLUMNS}
+            with st.sidebar:
+                st.markdown("### 🧭 Filters")
+                for col in FACET_COLUMNS:
+                    counts = facet_counts(facets, selections, col)
+                    selections[col] = st.multiselect(
+                        col,
+                        options=sorted(counts, key=lambda value: (-counts[value], value)),
+                        format_func=lambda value, counts=counts: f"{value} ({counts[value]})",
+                        key=f"facet_{col}"
+                    )
+            positions = facet_positions(facets, selections)
+            # Global search input (for filtering rows); query is shared through the URL('?q=...')
+            if "global_search" not in st.session_state:
+                st.session_state["global_search"] = st.query_params.get("q", "")
+            search_term = st.text_input(
+                "Global Search",
+                key="global_search",
+                help='Words/"phrases" match any column. Use field:value, field=value, severity>=High, -term, OR and (...) e.g. tool:KICS severity>=High provider:AWS "s3 bucket" -deprecated'
+            )
             if search_term:
-                mask = master_df.apply(lambda row: row.astype(str).str.contains(search_term, case=False).any(), axis=1)
-                filtered_df = master_df[mask]
+                st.query_params["q"] = search_term
+            else:
+                st.query_params.pop("q", None)
+
+            # Filter the dataframe based on search query; all terms are evaluated as vectorized column operations
+            # Query results are cached per MASTER version and narrowed queries(e.g. each keystroke) reuse them
+            try:
+                query_positions = get_query_cache().search(master_df, master_version, search_term)
+            except QueryError as e:
+                st.error(f"❗ Invalid search query: {e}")
+                query_positions = np.array([], dtype=np.int64)
+            if query_positions is not None:
+                positions = query_positions if positions is None else np.intersect1d(positions, query_positions, assume_unique=True)
+            filtered_df = master_df if positions is None else master_df.iloc[positions]
+
+            server_paging = st.toggle(
+                "Server-side paging",
+                value=True,
+                help="If selected, sorting/filtering/paging run on the server and only the current page is sent to the browser. Disable to edit rows in the grid."
+            )
+            if server_paging:
+                # Backend sorting, filtering and paging; only visible columns of current page are sent
+                all_cols = [col for col in filtered_df.columns if col != CODE_REFS]
+                with st.expander("⚙️ Grid settings"):
+                    visible_cols = st.multiselect("Visible columns", options=all_cols, default=all_cols)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        filter_col = st.selectbox("Filter column", options=[None] + all_cols)
+                        sort_col = st.selectbox("Sort by", options=[None] + all_cols)
+                    with col2:
+                        filter_value = st.text_input("Filter value", disabled=filter_col is None)
+                        ascending = st.toggle("Ascending", value=True)
+                filtered_df = filter_column(filtered_df, filter_col, filter_value)
+                col1, col2 = st.columns(2)
+                with col1:
+                    page_size = st.selectbox("Rows per page", options=[25, 50, 100, 200], index=2)
+                with col2:
+                    page = st.number_input("Page", min_value=1, value=1, step=1)
+                grid_cols = visible_cols + [CODE_REFS] if CODE_REFS in filtered_df.columns else visible_cols
+                grid_df, total_pages, page = get_page(filtered_df, page, page_size, sort_col, ascending, grid_cols)
             else:
-                filtered_df = master_df
+                grid_df = filtered_df
+            # MASTER row position of each row; used to look up selected row
+            grid_df = grid_df.assign(**{ROW_ID: grid_df.index})
 
             # Setup AgGrid options
-            gb = GridOptionsBuilder.from_dataframe(filtered_df)
-            gb.configure_pagination(paginationAutoPageSize=False, paginationPageSize=100)  # Pagination with page size 5
-            gb.configure_default_column(editable=True, filter=True, sortable=True, resizable=True)
+            gb = GridOptionsBuilder.from_dataframe(grid_df)
+            if server_paging:
+                gb.configure_default_column(editable=False, filter=False, sortable=False, resizable=True)
+            else:
+                gb.configure_pagination(paginationAutoPageSize=False, paginationPageSize=100)  # Pagination with page size 5
+                gb.configure_default_column(editable=True, filter=True, sortable=True, resizable=True)
             gb.configure_grid_options(domLayout='normal')  # Normal layout to show pagination controls
+            gb.configure_selection(selection_mode="single")
+            if CODE_REFS in grid_df.columns:
+                # Code example bodies are loaded only for the selected row
+                gb.configure_column(CODE_REFS, hide=True)
+            gb.configure_column(ROW_ID, hide=True)
 
             grid_options = gb.build()
 
             # Display grid with update mode to capture changes
             grid_response = AgGrid(
-                filtered_df,
+                grid_df,
                 gridOptions=grid_options,
-                update_mode=GridUpdateMode.MODEL_CHANGED,
+                update_mode=GridUpdateMode.SELECTION_CHANGED if server_paging else GridUpdateMode.MODEL_CHANGED,
                 allow_unsafe_jscode=True,
                 theme="alpine",  # 'streamlit', 'alpine', 'balham', 'material', ...
                 enable_enterprise_modules=False,
@@ -332,32 +437,96 @@ def app():
                 fit_columns_on_grid_load=True
             )
 
-            edited_df = pd.DataFrame(grid_response['data'])
-
-            # Show filtered and edited data count
-            st.markdown(f"**Showing {len(edited_df)} rows (filtered & editable)**")
+            if server_paging:
+                # Grid is read-only
+                start = (page - 1) * page_size
+                st.markdown(f"**Showing rows {min(start + 1, len(filtered_df))}-{min(start + page_size, len(filtered_df))} of {len(filtered_df)} (page {page}/{total_pages})**")
+            else:
+                edited_df = pd.DataFrame(grid_response['data']).drop(columns=[ROW_ID], errors="ignore")
 
-            # Download buttons for the filtered and edited data
-            def to_csv(df):
-                return df.to_csv(index=False).encode('utf-8')
+                # Show filtered and edited data count
+                st.markdown(f"**Showing {len(edited_df)} rows (filtered & editable)**")
 
-            def to_excel(df):
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    df.to_excel(writer, index=False, sheet_name='FilteredData')
-                return output.getvalue()
+            # Show code examples of selected row
+            selected_rows = grid_response["selected_rows"]
+            if selected_rows is not None and len(selected_rows) > 0:
+                selected_row = selected_rows.iloc[0] if isinstance(selected_rows, pd.DataFrame) else selected_rows[0]
+                code_examples = load_code_examples(selected_row.get(CODE_REFS), code_store_dir)
+                with st.expander(f"🧩 Code examples of - '{selected_row.get('ID')}'", expanded=True):
+                    if not code_examples:
+                        st.info("No code examples for selected policy.", icon="ℹ️")
+                    for col, body in code_examples.items():
+                        st.markdown(f"**{col}**")
+                        st.code(body if body is not None else "❗ Code example missing from store")
+                # Show equivalent policies of other tools
+                others = counterparts(equiv_lookup, selected_row.get(ROW_ID))
+                with st.expander(f"🔗 Equivalent policies in other tools ({len(others)})", expanded=bool(others)):
+                    if not others:
+                        st.info("No equivalent policies found for selected policy.", icon="ℹ️")
+                    for other in others:
+                        other_row = master_df.iloc[other]
+                        col1, col2 = st.columns([5, 1])
+                        with col1:
+                            st.markdown(f"**{other_row['Open-source Tool']}** · `{other_row['ID']}` · {other_row['IaC Framework']} — {other_row['Title']}")
+                        with col2:
+                            st.button("Go to", key=f"goto_{other}", on_click=jump_to_policy, args=(other_row["ID"],))
+                # Show similar policies of other tools
+                similar = find_similar(similarity_index, selected_row.get(ROW_ID))
+                with st.expander(f"🧬 Similar policies in other tools ({len(similar)})"):
+                    if not similar:
+                        st.info("No similar policies found for selected policy.", icon="ℹ️")
+                    for other, score in similar:
+                        other_row = master_df.iloc[other]
+                        col1, col2 = st.columns([5, 1])
+                        with col1:
+                            st.markdown(f"**{other_row['Open-source Tool']}** · `{other_row['ID']}` · {score:.0%} — {other_row['Title']}")
+                        with col2:
+                            st.button("Go to", key=f"similar_{other}", on_click=jump_to_policy, args=(other_row["ID"],))
+            include_code = st.checkbox(
+                "Include code examples in downloads",
+                value=False,
+                help="If selected, code example bodies are loaded from the code store and added to the downloaded file."
+            )
 
-            col1, col2 = st.columns(2)
+            # Exports are built only on request and cached per search/filter state and MASTER version
+            if server_paging:
+                export_state = {"facets": selections, "filter": [filter_col, filter_value], "sort": [sort_col, ascending], "columns": visible_cols}
+            else:
+                # Grid is editable; edited content is hashed only when a download is prepared, so typing never serializes rows
+                export_state = {"facets": selections, "editable": True}
+            col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
             with col1:
-                if search_term:
-                    st.download_button("📥 Download CSV", data=to_csv(edited_df), file_name=f"db_keyword_{search_term}.csv", mime="text/csv")
-                else:
-                    st.download_button("📥 Download CSV", data=to_csv(edited_df), file_name="db_filtered.csv", mime="text/csv")
+                export_type = st.selectbox(
+                    "Download format",
+                    options=list(EXPORT_FORMATS),
+                    format_func=lambda file_type: EXPORT_FORMATS[file_type][0]
+                )
+            export_label, export_mime, _ = EXPORT_FORMATS[export_type]
+            cache_key = export_key(master_version, search_term, {**export_state, "include_code": include_code, "type": export_type})
             with col2:
+                prepare = st.button("⚙️ Prepare download", use_container_width=True)
+            if prepare:
+                # Downloads contain all pages in current order when server-side paging is used
+                export_df = get_sorted(filtered_df, sort_col, ascending, grid_cols) if server_paging else edited_df
+                if include_code:
+                    export_df = attach_code_examples(export_df, code_store_dir)
+                else:
+                    export_df = export_df.drop(columns=[CODE_REFS], errors="ignore")
+                build_key = cache_key
+                if not server_paging:
+                    edits = hashlib.sha256(pd.util.hash_pandas_object(edited_df, index=False).to_numpy().tobytes()).hexdigest()
+                    build_key = export_key(master_version, search_term, {"export": cache_key, "edits": edits})
+                st.session_state["search_export"] = (cache_key, build_export(build_key, export_type, export_df))
+            prepared = st.session_state.get("search_export")
+            if prepared and prepared[0] == cache_key:
                 if search_term:
-                    st.download_button("📥 Download Excel", data=to_excel(edited_df), file_name=f"db_keyword_{search_term}.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                    keyword = re.sub(r"[^\w.-]+", "_", search_term).strip("_")
+                    file_name = f"db_keyword_{keyword}.{export_type}"
                 else:
-                    st.download_button("📥 Download Excel", data=to_excel(edited_df), file_name="db_filtered.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                    file_name = f"db_filtered.{export_type}"
+                st.download_button(f"📥 Download {export_label}", data=prepared[1], file_name=file_name, mime=export_mime, use_container_width=True)
+                if not server_paging:
+                    st.caption("Edits made after preparing are not included; prepare the download again to include them.")
     # Visualize menu
     elif selected == "Visualize":
         st.title("📊 PaC Data Visualization")
@@ -370,7 +539,12 @@ def app():
         else:
             # Check master_df; if empty, read master db file
             if master_df.empty:
-                master_df = pd.read_csv(master_df_csv)
+                master_df, mem_report, _ = get_master(master_df_csv, master_key(master_df_csv))
+                with st.expander("🧮 MASTER memory usage(before/after compaction)"):
+                    if mem_report is None:
+                        st.info("MASTER is memory-mapped from its shared Arrow file; pages are shared by all app processes.", icon="ℹ️")
+                    else:
+                        st.dataframe(mem_report, hide_index=True, use_container_width=True)
 
             st.header("📋 Data Profiling Report")
             target_cols = master_df.columns.to_list()
@@ -380,6 +554,8 @@ def app():
             profile_cols.remove("Query Document")
             profile_cols.remove("Related Document")
             profile_cols.remove("CheckovID")
+            if CODE_REFS in profile_cols:
+                profile_cols.remove(CODE_REFS)
             profile = ProfileReport(
                 master_df[profile_cols],
                 title="Master Data Profiling Report",
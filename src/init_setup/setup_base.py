@@ -19,13 +19,14 @@ def dir_init():
     os.makedirs(pac_raw_dir, exist_ok=True)
     pac_db_dir = os.path.join(project_root, f"pac_database")
     os.makedirs(pac_db_dir, exist_ok=True)
-    master_db_dir = os.path.join(pac_db_dir, "master")
+    master_db_dir = os.path.join(pac_db_dir, "MASTER")
     return project_root, pac_raw_dir, pac_db_dir, master_db_dir
 
 
-def dir_update(project_root, pac_raw_dir, is_valid):
+def dir_update(project_root, pac_raw_dir, is_valid, keep=()):
     '''
     If integrity check failed, creates empty 'data' dir; if 'data' dir exists, delete all contents and create an empty one.
+    Entries named in keep(e.g. tools already fetched by an interrupted run) are not deleted.
     Also creates 'database_dir'
     Returns:
     1) pac_raw_dir: Directory where all raw PaC files(repo, URL) are stored
@@ -37,6 +38,9 @@ def dir_update(project_root, pac_raw_dir, is_valid):
         if os.path.exists(pac_raw_dir):
             # Remove all contents of the directory
             for filename in os.listdir(pac_raw_dir):
+                if filename in keep:
+                    print(f"✅ Keeping files fetched by interrupted run: {filename}")
+                    continue
                 file_path = os.path.join(pac_raw_dir, filename)
                 try:
                     if os.path.isfile(file_path) or os.path.islink(file_path):
@@ -0,0 +1,97 @@
+'''
+File that stores all functions related to the checkpoint journal of the download pipeline
+Every completed step of a tool is recorded in 'pac_database/.checkpoint.json', so an interrupted run(network error,
+browser disconnect, crash) resumes from the last completed step instead of starting over:
+1) fetched: raw PaC files downloaded; value is the fetched SHA(or True for URL based tools)
+2) parsed: raw PaC files parsed; value is {"rows": number of rows}
+3) saved: database file formats written for the tool
+4) master: MASTER file formats the tool's rows were written into
+Journal only applies to the 'version_info.json' it was written with, and is removed once a run completes.
+'''
+import datetime
+import hashlib
+import json
+import os
+
+CHECKPOINT_FILE = ".checkpoint.json"
+STAGES = ("fetched", "parsed", "saved", "master")
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+def _run_key(version_info: dict) -> str:
+    '''Hash of version info; journal of a different version/tool setup is never resumed'''
+    data = json.dumps(
+        {key: version_info.get(key) for key in ("version", "date", "tool_info")}, sort_keys=True
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+class Checkpoint:
+    '''Per tool, per stage journal of a single download run; every update is written to disk at once'''
+    def __init__(self, pac_db_dir, version_info: dict):
+        self.path = os.path.join(pac_db_dir, CHECKPOINT_FILE)
+        self.run_key = _run_key(version_info)
+        journal = self._load()
+        if journal and journal.get("run") != self.run_key:
+            print("❗ Checkpoint of a different version info found; starting over")
+            journal = None
+        self.started = journal["started"] if journal else _now()
+        self.tools = journal["tools"] if journal else {}
+        # True if an interrupted run left completed steps behind
+        self.resumed = bool(self.tools)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"run": self.run_key, "started": self.started, "updated": _now(), "tools": self.tools}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, tool_name: str, stage: str, default=None):
+        return self.tools.get(tool_name, {}).get(stage, default)
+
+    def done(self, tool_name: str, stage: str) -> bool:
+        return bool(self.get(tool_name, stage))
+
+    def mark(self, tool_name: str, stage: str, value=True):
+        '''Record completed stage of tool'''
+        if stage not in STAGES:
+            raise ValueError(f"❌ Unknown checkpoint stage: {stage}")
+        self.tools.setdefault(tool_name, {})[stage] = value
+        self.save()
+
+    def mark_saved(self, tool_name: str, file_types, stage: str = "saved"):
+        '''Add file_types to the formats already saved for tool'''
+        saved = self.get(tool_name, stage) or []
+        self.mark(tool_name, stage, saved + [file_type for file_type in file_types if file_type not in saved])
+
+    def reset(self, tool_name: str, stages=STAGES):
+        '''Drop stages of tool; used before its work is redone'''
+        entry = self.tools.get(tool_name, {})
+        for stage in stages:
+            entry.pop(stage, None)
+        if not entry:
+            self.tools.pop(tool_name, None)
+        self.save()
+
+    def fetched_tools(self) -> list:
+        return [tool_name for tool_name in self.tools if self.done(tool_name, "fetched")]
+
+    def summary(self) -> dict:
+        '''{tool: list of completed stages}'''
+        return {tool_name: [stage for stage in STAGES if self.done(tool_name, stage)] for tool_name in self.tools}
+
+    def clear(self):
+        '''Remove journal after a completed run'''
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.tools = {}
+        self.resumed = False
+
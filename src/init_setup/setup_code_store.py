@@ -0,0 +1,99 @@
+'''
+File that stores all functions related to the content-addressed code example store
+Code example bodies('Secure Code Example N', 'Insecure Code Example N', 'Insecure Code Line N') are stored
+once per unique content, keyed by their hash. Database files only hold a 'Code Refs' column of references.
+'''
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+from parse_pac.normalize import MISSING
+
+CODE_COLUMN_PTN = re.compile(r"^(Secure|Insecure) Code (Example|Line) (\d+)$")
+# Column holding {code column name: content hash} as JSON
+CODE_REFS = "Code Refs"
+
+def code_columns(df: pd.DataFrame):
+    '''Get all dynamic code example columns of df'''
+    return [col for col in df.columns if CODE_COLUMN_PTN.match(col)]
+
+def _code_column_order(col):
+    '''Sort key keeping code columns in their original order: Secure Example, Insecure Example, Insecure Line'''
+    kind, part, num = CODE_COLUMN_PTN.match(col).groups()
+    return (kind != "Secure", part != "Example", int(num))
+
+def _body_path(store_dir, digest):
+    '''Files are sharded by the first two hex digits of their hash'''
+    return os.path.join(store_dir, digest[:2], f"{digest}.txt")
+
+def put_code(store_dir, body: str) -> str:
+    '''Store body if not stored yet; returns content hash'''
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    path = _body_path(store_dir, digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    return digest
+
+def get_code(store_dir, digest: str):
+    '''Read single body by content hash; returns None if missing'''
+    try:
+        with open(_body_path(store_dir, digest), "r", encoding="utf-8", newline="") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def externalize_code_examples(df: pd.DataFrame, store_dir) -> pd.DataFrame:
+    '''
+    Move all code example columns of df into the store
+    Returns df without code example columns and with a single CODE_REFS column
+    '''
+    cols = code_columns(df)
+    if not cols:
+        return df
+    stored = set()
+    refs = []
+    for values in df[cols].itertuples(index=False, name=None):
+        row_refs = {}
+        for col, body in zip(cols, values):
+            if body is None or pd.isna(body):
+                continue
+            body = str(body)
+            digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+            if digest not in stored:
+                put_code(store_dir, body)
+                stored.add(digest)
+            row_refs[col] = digest
+        refs.append(json.dumps(row_refs) if row_refs else MISSING)
+    result = df.drop(columns=cols)
+    result[CODE_REFS] = refs
+    return result
+
+def load_code_examples(refs, store_dir) -> dict:
+    '''
+    Load bodies of a single row's CODE_REFS value
+    Returns {code column name: body} in original column order
+    '''
+    if refs is None or pd.isna(refs) or not refs:
+        return {}
+    row_refs = json.loads(refs)
+    return {col: get_code(store_dir, row_refs[col]) for col in sorted(row_refs, key=_code_column_order)}
+
+def attach_code_examples(df: pd.DataFrame, store_dir) -> pd.DataFrame:
+    '''
+    Inverse of externalize_code_examples; expands CODE_REFS back into code example columns
+    Used for exports that should include code example bodies
+    '''
+    if CODE_REFS not in df.columns:
+        return df
+    bodies = [load_code_examples(refs, store_dir) for refs in df[CODE_REFS]]
+    cols = sorted({col for row in bodies for col in row}, key=_code_column_order)
+    result = df.drop(columns=[CODE_REFS]).reset_index(drop=True)
+    for col in cols:
+        result[col] = [row.get(col, MISSING) for row in bodies]
+    return result
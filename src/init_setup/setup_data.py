@@ -24,8 +24,9 @@ PHASE_PATTERNS = {
     "Updating files":      re.compile(r"Updating files:\s+(\d+)%"),
 }
 
-# URL tool function mappings
+# URL tool function mappings; each function(url, dest) saves PaC files of tool within dest
 tool_function = {
+    "KICS": get_kics_queries
 }
 
 def _make_progress():
@@ -0,0 +1,235 @@
+'''
+File that stores the background job runner used for downloads
+A single worker thread per process takes jobs from a queue, so a Streamlit script run(or browser refresh) never blocks on,
+or aborts, the pipeline. Identical requests share one job while it is queued/running.
+Job status is persisted as '<job id>.json' and its logs are appended to '<job id>.log'(one JSON line each) within the jobs
+directory, so every session(and process) can poll them while status updates stay small.
+A lockfile makes sure only one pipeline runs against 'pac_raw' at a time, even across processes.
+'''
+import datetime
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING)
+LOCK_FILE = "runner.lock"
+# Seconds between retries while another process holds the lock
+LOCK_WAIT = 2
+# Max number of(latest) log lines returned per job
+MAX_LOG_LINES = 1000
+# Max number of finished jobs kept on disk
+MAX_JOBS = 50
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(int(pid), 0)
+    except (OSError, ValueError, TypeError):
+        return False
+    return True
+
+def job_key(params: dict) -> str:
+    '''Dedup key of job params; list order does not matter'''
+    normalized = {key: sorted(value) if isinstance(value, list) else value for key, value in params.items()}
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+class JobRunner:
+    '''
+    Single worker job runner
+    run_job(params, log, progress) is called for every job in submission order.
+    '''
+    def __init__(self, jobs_dir, run_job):
+        self.jobs_dir = jobs_dir
+        self.run_job = run_job
+        self.queue = queue.Queue()
+        self.jobs = {}
+        # Reentrant; submit checks active jobs while holding it
+        self.lock = threading.RLock()
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._recover()
+        self.worker = threading.Thread(target=self._work, name="pac-job-runner", daemon=True)
+        self.worker.start()
+
+    def _job_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _log_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.log")
+
+    def _save(self, job):
+        path = self._job_path(job["id"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _recover(self):
+        '''Mark jobs left queued/running by a process that no longer exists as failed'''
+        for job in self.list_jobs():
+            if job["status"] in ACTIVE_STATES and not _pid_alive(job.get("pid")):
+                job["status"] = FAILED
+                job["error"] = "Interrupted; runner process stopped"
+                job["finished"] = _now()
+                self._save(job)
+
+    def get_job(self, job_id):
+        '''Latest status of job; read from disk so jobs of other processes are visible too'''
+        with self.lock:
+            if job_id in self.jobs:
+                return json.loads(json.dumps(self.jobs[job_id]))
+        try:
+            with open(self._job_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get_logs(self, job_id, limit: int = MAX_LOG_LINES) -> list:
+        '''Latest limit log lines of job as {time, kind, message}; incomplete trailing line of an ongoing write is skipped'''
+        try:
+            with open(self._log_path(job_id), "r", encoding="utf-8") as f:
+                lines = deque(f, maxlen=limit)
+        except FileNotFoundError:
+            return []
+        logs = []
+        for line in lines:
+            try:
+                logs.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return logs
+
+    def list_jobs(self):
+        '''All persisted jobs, newest first'''
+        jobs = []
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith(".json"):
+                job = self.get_job(name[:-len(".json")])
+                if job:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job["created"], reverse=True)
+
+    def active_job(self, key=None):
+        '''Queued/running job(of given key, if any) of any process; None if nothing is active'''
+        for job in self.list_jobs():
+            if job["status"] in ACTIVE_STATES and _pid_alive(job.get("pid")) and (key is None or job["key"] == key):
+                return job
+        return None
+
+    def submit(self, params: dict):
+        '''
+        Queue a job for params
+        Returns:
+        1) job_id: id of new job, or of an identical queued/running job
+        2) is_new: False if an identical job was reused
+        '''
+        key = job_key(params)
+        with self.lock:
+            existing = self.active_job(key)
+            if existing:
+                return existing["id"], False
+            job = {
+                "id": f"{datetime.datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}",
+                "key": key,
+                "params": params,
+                "pid": os.getpid(),
+                "status": QUEUED,
+                "progress": 0.0,
+                "progress_text": "Waiting in queue...",
+                "created": _now(),
+                "started": None,
+                "finished": None,
+                "error": None,
+                "result": None
+            }
+            self.jobs[job["id"]] = job
+            self._save(job)
+            self._prune()
+        self.queue.put(job["id"])
+        return job["id"], True
+
+    def _prune(self):
+        '''Delete oldest finished jobs over MAX_JOBS'''
+        finished = [job for job in self.list_jobs() if job["status"] not in ACTIVE_STATES]
+        for job in finished[MAX_JOBS:]:
+            self.jobs.pop(job["id"], None)
+            for path in (self._job_path(job["id"]), self._log_path(job["id"])):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            job = self.jobs[job_id]
+            job.update(fields)
+            self._save(job)
+
+    def _log(self, job_id, kind, message):
+        '''Append a log line; status file is left untouched'''
+        line = json.dumps({"time": _now(), "kind": kind, "message": message}, ensure_ascii=False) + "\n"
+        with self.lock:
+            with open(self._log_path(job_id), "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def _acquire(self, job_id):
+        '''Create lockfile; waits while a live process holds it, stale locks are removed'''
+        lock_path = os.path.join(self.jobs_dir, LOCK_FILE)
+        waiting = False
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"pid": os.getpid(), "job": job_id}, f)
+                return lock_path
+            except FileExistsError:
+                try:
+                    with open(lock_path, "r", encoding="utf-8") as f:
+                        owner = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    # Being created/removed by another process; check again
+                    owner = None
+                if owner is not None and not _pid_alive(owner.get("pid")):
+                    try:
+                        os.remove(lock_path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if not waiting:
+                    self._update(job_id, progress_text="Waiting for another running download...")
+                    waiting = True
+                time.sleep(LOCK_WAIT)
+
+    def _work(self):
+        while True:
+            job_id = self.queue.get()
+            lock_path = self._acquire(job_id)
+            self._update(job_id, status=RUNNING, started=_now(), progress_text="Starting...")
+            try:
+                result = self.run_job(
+                    self.jobs[job_id]["params"],
+                    log=lambda kind, message: self._log(job_id, kind, message),
+                    progress=lambda value, text: self._update(job_id, progress=float(value), progress_text=text)
+                )
+                self._update(job_id, status=DONE, finished=_now(), result=result)
+            except BaseException as e:
+                self._log(job_id, "error", traceback.format_exc())
+                self._update(job_id, status=FAILED, finished=_now(), error=f"{type(e).__name__}: {e}")
+            finally:
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+                self.queue.task_done()
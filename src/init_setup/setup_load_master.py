@@ -0,0 +1,38 @@
+'''
+File that stores all functions related to loading the MASTER database file into memory
+'''
+import os
+
+import pandas as pd
+from .setup_stream_write import read_csv_chunks
+from .setup_save_master import read_master_version
+from .setup_shared_master import map_master
+from parse_pac.normalize import compact_frame, memory_report
+
+def load_master(master_df_csv):
+    '''
+    Read MASTER csv file and convert it into the canonical compact representation
+    Returns:
+    1) master_df: Compact MASTER dataframe(categoricals, Arrow-backed strings, pd.NA)
+    2) mem_report: Memory usage per column before/after compaction
+    '''
+    raw_df = next(read_csv_chunks(master_df_csv, None))
+    master_df = compact_frame(raw_df)
+    mem_report = memory_report(raw_df, master_df)
+    return master_df, mem_report
+
+def open_master(master_df_csv, default_version=None):
+    '''
+    Memory-map shared MASTER if published(see setup_shared_master); else read it from the .csv file
+    Returns:
+    1) master_df: Compact MASTER dataframe
+    2) mem_report: Memory usage per column before/after compaction; None if memory-mapped
+    3) version: Version of loaded MASTER; 'MASTER_version.json' or default_version if it is not mapped
+    '''
+    master_db_dir = os.path.dirname(master_df_csv)
+    master_df, version = map_master(master_db_dir)
+    if master_df is not None:
+        return master_df, None, version
+    version = (read_master_version(master_db_dir) or {}).get("version", default_version)
+    master_df, mem_report = load_master(master_df_csv)
+    return master_df, mem_report, version
@@ -0,0 +1,292 @@
+'''
+File that stores the full download pipeline: fetch raw PaC files, parse, save database files and MASTER
+Runs without Streamlit; progress and messages are reported through callbacks so it can run in a background job(see setup_jobs).
+'''
+import json
+import os
+
+import pandas as pd
+
+from .setup_integrity import data_init, data_checker, create_ver_token
+from .setup_base import dir_update, create_up_tool_list
+from .setup_checkpoint import Checkpoint
+from .setup_data import get_pac_folder, get_pac_url
+from .setup_save_master import save_master_version
+from .setup_shared_master import publish_master
+from .setup_stream_write import FormatWriter, write_formats, read_csv_chunks, CHUNK_SIZE
+from .setup_remote import SHA_FILE, check_upstream, load_fetched_shas, save_fetched_sha
+from .setup_snapshot import SnapshotStore, snapshot_dir
+from .setup_code_store import CODE_REFS, externalize_code_examples
+from parse_pac.parse_tool import iter_pac_of_tool, get_columns, get_master_columns
+from parse_pac.normalize import normalize_missing, unmapped_report
+from parse_pac.parse_quarantine import load_quarantine, quarantine_dir
+from search_pac.search_facet import save_facet_index
+from search_pac.search_equiv import save_equivalence
+from search_pac.search_similar import save_similarity_index, save_similarity_report
+
+def _print_log(kind, message):
+    print(message)
+
+def _no_progress(value, text):
+    pass
+
+def stream_tool_pac(tool, head_file_path, code_store_dir, tool_writer, master_writer, master_columns, pac_db_dir=None):
+    '''
+    Stream parsed batches of a tool into its database writer(if given) and the MASTER writer
+    Code examples are moved into the code store per batch; peak memory is bounded by the batch size
+    Files that fail to parse are reported within pac_db_dir if given(see parse_quarantine)
+    Returns list of code-free MASTER batches, used for building search indexes
+    '''
+    tool_columns = get_columns(tool, CODE_REFS)
+    master_batches = []
+    try:
+        for batch in iter_pac_of_tool(tool, head_file_path, pac_db_dir=pac_db_dir):
+            batch = externalize_code_examples(batch, code_store_dir).reindex(columns=tool_columns)
+            if tool_writer is not None:
+                tool_writer.write(batch)
+            master_batch = batch.reindex(columns=master_columns)
+            master_writer.write(master_batch)
+            master_batches.append(master_batch)
+    except BaseException:
+        if tool_writer is not None:
+            tool_writer.abort()
+        raise
+    return master_batches
+
+def stream_saved_pac(tool_csv, master_writer, master_columns):
+    '''
+    Stream database .csv file saved by a previous run into the MASTER writer; used for tools unchanged upstream
+    Returns list of MASTER batches, used for building search indexes
+    '''
+    master_batches = []
+    for chunk in read_csv_chunks(tool_csv, CHUNK_SIZE, master_columns):
+        master_batch = normalize_missing(chunk).reindex(columns=master_columns)
+        master_writer.write(master_batch)
+        master_batches.append(master_batch)
+    return master_batches
+
+def complete_saved_pac(tool_db_dir, tool, file_types, incremental=False):
+    '''
+    Write missing file_types of a tool from its saved database .csv file; used when a run was interrupted after saving
+    Returns {file type: output path}
+    '''
+    tool_csv = os.path.join(tool_db_dir, f"{tool}_db.csv")
+    tool_columns = get_columns(tool, CODE_REFS)
+    chunks = (normalize_missing(chunk) for chunk in read_csv_chunks(tool_csv, CHUNK_SIZE, tool_columns))
+    return write_formats(tool_db_dir, chunks, tool, file_types, incremental, columns=tool_columns)
+
+def fetch_tool(tool, tool_info, tool_raw_path, sha=None):
+    '''
+    Download raw PaC files of a single tool
+    If sha is given, exactly that commit is checked out so the recorded SHA matches fetched files
+    '''
+    if tool_info["is_repo"] == "True":
+        get_pac_folder(
+            tool_name=tool,
+            repo_git=tool_info["url"],
+            folder=tool_info["folder_path"],
+            dest=tool_raw_path,
+            ref=sha or tool_info["branch"],
+        )
+    else:
+        get_pac_url(
+            tool_name=tool,
+            url=tool_info["url"],
+            dest=tool_raw_path
+        )
+
+def run_download(project_root, pac_raw_dir, pac_db_dir, tools_input, files_input, db_only=False, incremental=True, force=False, log=None, progress=None):
+    '''
+    Run full download pipeline
+    Tools whose upstream head SHA did not change since the last fetch skip fetch and parse; their saved .csv is used for MASTER.
+    Completed steps of each tool are journaled(see setup_checkpoint); an interrupted run resumes from the last completed step.
+    If force=True, every selected tool is fetched and parsed again.
+    1) log(kind, message): kind is one of 'info', 'success', 'error'
+    2) progress(value, text): value within [0, 1]
+    Returns dict of: master_version, tools(updated tool list), files(MASTER file types)
+    '''
+    log = log or _print_log
+    progress = progress or _no_progress
+    version_info, version, date, full_tool_list, full_tool_info = data_init(project_root)
+    master_db_dir = os.path.join(pac_db_dir, "MASTER")
+    master_df_csv = os.path.join(master_db_dir, "MASTER_db.csv")
+    code_store_dir = os.path.join(pac_db_dir, "code_store")
+
+    # Unmapped raw values are counted from here on
+    unmapped_report(reset=True)
+    # Completed steps of an interrupted run are reused
+    checkpoint = Checkpoint(pac_db_dir, version_info)
+    if checkpoint.resumed:
+        log("info", f"Resuming interrupted run; completed steps: {checkpoint.summary()}")
+    # Run integrity check
+    is_valid = data_checker(project_root, pac_raw_dir) and os.path.exists(master_df_csv)
+    # Based on integrity check, update directory content; raw files fetched by an interrupted run are kept
+    fetched_tools = [tool for tool in checkpoint.fetched_tools() if tool in full_tool_list]
+    dir_update(project_root, pac_raw_dir, is_valid, keep=fetched_tools + [SHA_FILE] if fetched_tools else ())
+    up_tool_list = create_up_tool_list(is_valid, tools_input, full_tool_list)
+    # All tools + Master file
+    total_tasks = len(up_tool_list) + 1
+    task_count = 0
+
+    # Status section
+    if is_valid:
+        log("success", "✅ Data integrity check complete — all files are valid!")
+    else:
+        log("error", "❗ Invalid file composition — redownloading all files...")
+    if db_only and is_valid:
+        log("info", f"Creating database files for total {len(up_tool_list)} tools: {up_tool_list}, file types: {files_input}")
+    else:
+        log("info", f"Downloading files for total {len(up_tool_list)} tools: {up_tool_list}")
+
+    # Upstream change check; resolved SHAs are recorded after each fetch
+    upstream = {}
+    if not db_only or not is_valid:
+        upstream = check_upstream(pac_raw_dir, full_tool_info, up_tool_list)
+        unchanged = [tool for tool in up_tool_list if not upstream[tool]["changed"]]
+        if is_valid and unchanged and not force:
+            log("info", f"Unchanged upstream since last fetch: {unchanged}")
+
+    # MASTER writer stays open while every tool is parsed; REQUIRED: .csv file for master_df
+    master_files = list(files_input) + ["csv"] if "csv" not in files_input else list(files_input)
+    master_columns = get_master_columns(CODE_REFS)
+    # REQUIRED: .csv file per tool; reused by later runs(unchanged upstream, resume)
+    tool_files = list(files_input) + ["csv"] if "csv" not in files_input else list(files_input)
+    # MASTER files written by an interrupted run are reused; only the steps after them are run again
+    master_done = checkpoint.resumed and not force and all(
+        set(master_files) <= set(checkpoint.get(full_tool, "master", [])) for full_tool in full_tool_list
+    ) and all(os.path.exists(os.path.join(master_db_dir, f"MASTER_db.{type}")) for type in master_files)
+    if master_done:
+        log("success", "✅ MASTER database files saved by interrupted run; reusing them")
+        master_batches = [
+            normalize_missing(chunk).reindex(columns=master_columns)
+            for chunk in read_csv_chunks(master_df_csv, CHUNK_SIZE, master_columns)
+        ]
+        output_paths = {}
+    else:
+        master_writer = FormatWriter(master_db_dir, "MASTER", master_files, incremental, change_log=incremental, columns=master_columns)
+        master_batches = []
+        try:
+            # Update all tools based on user input
+            for tool in up_tool_list:
+                progress(task_count / total_tasks, f"Downloading {tool}...")
+                tool_raw_path = os.path.join(pac_raw_dir, tool)
+                tool_db_dir = os.path.join(pac_db_dir, tool)
+                tool_csv = os.path.join(tool_db_dir, f"{tool}_db.csv")
+                sha = upstream.get(tool, {}).get("sha")
+                if force:
+                    checkpoint.reset(tool)
+
+                # Skip fetch and parse if nothing changed upstream; requires database files of previous run
+                saved = all(os.path.exists(os.path.join(tool_db_dir, f"{tool}_db.{type}")) for type in set(files_input) | {"csv"})
+                if is_valid and tool in upstream and not upstream[tool]["changed"] and not force and saved:
+                    log("success", f"✅ No upstream changes for tool - '{tool}' - ({sha[:12]}); reusing saved database files")
+                    master_batches += stream_saved_pac(tool_csv, master_writer, master_columns)
+                    task_count += 1
+                    continue
+
+                # First, download RAW PaC files
+                if (not db_only or not is_valid) and checkpoint.done(tool, "fetched") and os.path.isdir(tool_raw_path):
+                    fetched_sha = checkpoint.get(tool, "fetched")
+                    sha = fetched_sha if isinstance(fetched_sha, str) else None
+                    log("success", f"✅ Raw PaC files for tool - '{tool}' - already fetched by interrupted run; skipping download")
+                elif not db_only or not is_valid:
+                    log("info", f"Downloading raw PaC files for tool: {tool}")
+                    # Recorded SHA and checkpoint are dropped until database files of the new fetch are saved
+                    checkpoint.reset(tool)
+                    save_fetched_sha(pac_raw_dir, tool, full_tool_info[tool], None)
+                    fetch_tool(tool, full_tool_info[tool], tool_raw_path, sha)
+                    checkpoint.mark(tool, "fetched", sha or True)
+                    log("success", f"✅ Raw PaC files for tool - '{tool}' -  saved at: `{tool_raw_path}`")
+
+                # Second, save individual file; formats saved by an interrupted run are reused
+                saved_types = [type for type in checkpoint.get(tool, "saved", []) if os.path.exists(os.path.join(tool_db_dir, f"{tool}_db.{type}"))]
+                if checkpoint.done(tool, "parsed") and "csv" in saved_types:
+                    log("success", f"✅ Database files for - '{tool}' - in formats - {saved_types} - saved by interrupted run; reusing them")
+                    missing_types = [type for type in tool_files if type not in saved_types]
+                    if missing_types:
+                        output_paths = complete_saved_pac(tool_db_dir, tool, missing_types, incremental)
+                        checkpoint.mark_saved(tool, missing_types)
+                        for type in missing_types:
+                            log("success", f"✅ Database file for - '{tool}' - in format - '{type}' - saved at: {output_paths[type]}")
+                    master_batches += stream_saved_pac(tool_csv, master_writer, master_columns)
+                else:
+                    log("info", f"Creating database files for tool: {tool}")
+                    head_file_path = os.path.join(tool_raw_path, full_tool_info[tool]["head_path"])
+                    # Parsed batches are written into all formats of tool and MASTER as they arrive
+                    tool_writer = FormatWriter(tool_db_dir, tool, tool_files, incremental, change_log=incremental, columns=get_columns(tool, CODE_REFS))
+                    master_batches += stream_tool_pac(tool, head_file_path, code_store_dir, tool_writer, master_writer, master_columns, pac_db_dir)
+                    rows = tool_writer.rows
+                    output_paths = tool_writer.close()
+                    checkpoint.mark(tool, "parsed", {"rows": rows})
+                    checkpoint.mark_saved(tool, tool_files)
+                    for type in files_input:
+                        log("success", f"✅ Database file for - '{tool}' - in format - '{type}' - saved at: {output_paths[type]}")
+                    # Files that failed to parse are skipped and reported instead of aborting the tool
+                    report_dir = quarantine_dir(pac_db_dir)
+                    quarantined = load_quarantine(tool, report_dir)
+                    if quarantined:
+                        log("info", f"❗ {len(quarantined)} files of - '{tool}' - quarantined; see: {os.path.join(report_dir, f'{tool}_quarantine.json')}")
+                    if incremental:
+                        diff = output_paths["change_log"]
+                        log("info", f"Changes for - '{tool}' - added: {len(diff['added'])}, removed: {len(diff['removed'])}, modified: {len(diff['modified'])}")
+                if sha is not None and (not db_only or not is_valid):
+                    save_fetched_sha(pac_raw_dir, tool, full_tool_info[tool], sha)
+                task_count += 1
+
+            # Third and last, save master file
+            progress(task_count / total_tasks, "Creating MASTER database files...")
+            log("info", "Creating MASTER database files...")
+            for full_tool in full_tool_list:
+                if full_tool not in up_tool_list:
+                    tool_raw_path = os.path.join(pac_raw_dir, full_tool)
+                    head_file_path = os.path.join(tool_raw_path, full_tool_info[full_tool]["head_path"])
+                    master_batches += stream_tool_pac(full_tool, head_file_path, code_store_dir, None, master_writer, master_columns, pac_db_dir)
+        except BaseException:
+            master_writer.abort()
+            raise
+        output_paths = master_writer.close()
+        for full_tool in full_tool_list:
+            checkpoint.mark_saved(full_tool, master_files, stage="master")
+        for type in master_files:
+            log("success", f"✅ MASTER database file in format - '{type}' saved at: {output_paths[type]}")
+    # Search indexes need all rows; only code-free batches are kept in memory
+    master_df = pd.concat(master_batches, ignore_index=True) if master_batches else pd.DataFrame(columns=master_columns)
+    # Version MASTER and build its search indexes
+    master_version = save_master_version(master_db_dir, master_df)["version"]
+    # Shared read-only copy mapped by every app process
+    arrow_path = publish_master(master_db_dir, master_df, master_version)
+    log("success", f"✅ Shared MASTER published at: {arrow_path}")
+    # Record build in snapshot store; keyed by date, MASTER version and upstream SHAs
+    fetched = load_fetched_shas(pac_raw_dir)
+    snapshot = SnapshotStore(snapshot_dir(pac_db_dir)).record(
+        master_df, master_version, {tool: fetched.get(tool, {}).get("sha") for tool in full_tool_list}
+    )
+    log("success", f"✅ Snapshot recorded: {snapshot['id']}")
+    save_facet_index(master_db_dir, master_df, master_version)
+    save_equivalence(master_db_dir, master_df, master_version)
+    similarity_index = save_similarity_index(master_db_dir, master_df, master_version)
+    report_path = save_similarity_report(master_db_dir, master_df, similarity_index)
+    log("success", f"✅ Near-duplicate policy report saved at: {report_path}")
+    log("success", f"✅ MASTER search indexes saved for version: {master_version}")
+    if incremental and "change_log" in output_paths:
+        diff = output_paths["change_log"]
+        log("info", f"Changes for - 'MASTER' - added: {len(diff['added'])}, removed: {len(diff['removed'])}, modified: {len(diff['modified'])}")
+
+    # Raw values without a mapping(see parse_pac/mappings.json) are reported instead of failing the run
+    unmapped = unmapped_report(reset=True)
+    unmapped_path = os.path.join(pac_db_dir, "unmapped_values.json")
+    with open(unmapped_path, "w", encoding="utf-8") as f:
+        json.dump(unmapped, f, indent=2, ensure_ascii=False)
+    if unmapped:
+        log("info", f"❗ {len(unmapped)} raw values without mapping(add them to 'pac_mappings.json'); see: {unmapped_path}")
+
+    # After all individual files are downloaded, update token
+    if is_valid is False:
+        log("info", "Creating version token...")
+        create_ver_token(pac_raw_dir, version_info)
+    # Run completed; nothing left to resume
+    checkpoint.clear()
+
+    progress(1.0, "All tasks completed!")
+    log("success", "✅ All tasks completed! 🎉")
+    return {"master_version": master_version, "tools": up_tool_list, "files": master_files}
@@ -0,0 +1,89 @@
+'''
+File that stores all functions related to detecting upstream changes of each tool before fetching
+Head SHA of each tool's branch is resolved with 'git ls-remote'(no clone, no objects transferred) and
+compared to the SHA recorded after the last successful fetch('pac_raw/.fetched_shas.json').
+'''
+import json
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+SHA_FILE = ".fetched_shas.json"
+# Seconds before 'git ls-remote' is given up; tool is then treated as changed
+LS_REMOTE_TIMEOUT = 30
+SHA_PTN = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+def remote_head(repo_git: str, ref: str = "main"):
+    '''
+    Resolve ref(branch, tag or full SHA) of remote repo into commit SHA with 'git ls-remote'
+    Returns None if it cannot be resolved(network error, unknown ref etc.)
+    '''
+    if SHA_PTN.match(ref):
+        return ref
+    try:
+        proc = subprocess.run(
+            ["git", "ls-remote", repo_git, ref, f"refs/tags/{ref}^{{}}"],
+            capture_output=True, text=True, timeout=LS_REMOTE_TIMEOUT, check=True
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"❗ Failed to resolve '{ref}' of {repo_git}: {e}")
+        return None
+    refs = {}
+    for line in proc.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) == 2:
+            refs[parts[1]] = parts[0]
+    # Branch first, then annotated tag(peeled), then lightweight tag
+    for name in [f"refs/heads/{ref}", f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", ref]:
+        if name in refs:
+            return refs[name]
+    return None
+
+def _sha_path(pac_raw_dir):
+    return os.path.join(pac_raw_dir, SHA_FILE)
+
+def _source(tool_info: dict) -> dict:
+    '''Fields of tool info that define fetched content; recorded SHA is only valid while they stay the same'''
+    return {key: tool_info.get(key) for key in ("url", "folder_path", "branch", "head_path")}
+
+def load_fetched_shas(pac_raw_dir) -> dict:
+    '''{tool: {"sha": ..., "source": ...}} of last successful fetches; empty if missing'''
+    try:
+        with open(_sha_path(pac_raw_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_fetched_sha(pac_raw_dir, tool_name: str, tool_info: dict, sha):
+    '''Record SHA of tool after a successful fetch; None removes the record'''
+    shas = load_fetched_shas(pac_raw_dir)
+    if sha is None:
+        shas.pop(tool_name, None)
+    else:
+        shas[tool_name] = {"sha": sha, "source": _source(tool_info)}
+    path = _sha_path(pac_raw_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(shas, f, indent=4)
+    os.replace(tmp_path, path)
+
+def check_upstream(pac_raw_dir, full_tool_info: dict, tools) -> dict:
+    '''
+    Compare remote head SHA of each repo based tool with its recorded SHA
+    Returns {tool: {"sha": remote SHA or None, "changed": bool}}; unknown SHAs count as changed
+    '''
+    fetched = load_fetched_shas(pac_raw_dir)
+    repo_tools = [tool for tool in tools if full_tool_info[tool]["is_repo"] == "True"]
+    with ThreadPoolExecutor(max_workers=max(len(repo_tools), 1)) as pool:
+        heads = dict(zip(repo_tools, pool.map(
+            lambda tool: remote_head(full_tool_info[tool]["url"], full_tool_info[tool]["branch"]), repo_tools
+        )))
+    result = {}
+    for tool in tools:
+        sha = heads.get(tool)
+        record = fetched.get(tool, {})
+        unchanged = sha is not None and record.get("sha") == sha and record.get("source") == _source(full_tool_info[tool])
+        result[tool] = {"sha": sha, "changed": not unchanged}
+    return result
+
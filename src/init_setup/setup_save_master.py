@@ -1,24 +1,41 @@
 '''
 File that stores all functions related to saving the master dataframe to requested type of file
 '''
+import datetime
+import hashlib
+import json
 import pandas as pd
 import os
+from .setup_stream_write import write_formats
 
-def save_dataframe(db_dir, df: pd.DataFrame, tool_name:str, file_type: str):
-    # Define all convertable file format here
-    formats = {
-        "sql": lambda path: df.to_sql("table_name", "sqlite:///" + path, if_exists="replace", index=False),
-        "csv": lambda path: df.to_csv(path, index=False),
-        "xlsx": lambda path: df.to_excel(path, index=False),
-        "json": lambda path: df.to_json(path, orient="records", indent=2)
+def save_dataframe(db_dir, df: pd.DataFrame, tool_name:str, file_type: str, incremental: bool = False):
+    '''
+    Save df as '<tool_name>_db.<file_type>' within db_dir
+    Written in chunks through streaming writers(see setup_stream_write); use write_formats to save several formats in one pass.
+    If incremental=True, database outputs(sql) only apply changed rows instead of being rewritten
+    '''
+    return write_formats(db_dir, df, tool_name, [file_type], incremental)[file_type]
+
+def save_master_version(master_db_dir, df: pd.DataFrame):
+    '''
+    Write 'MASTER_version.json' next to MASTER database files
+    Version is a content hash of MASTER; used as cache key by search indexes and exports
+    '''
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    version_info = {
+        "version": hashlib.sha256(row_hashes.tobytes()).hexdigest()[:16],
+        "rows": len(df),
+        "date": datetime.datetime.now().isoformat(timespec="seconds")
     }
-    
-    # Check dir path and save file
-    os.makedirs(db_dir, exist_ok=True)
-    output_path = os.path.join(db_dir, f"{tool_name}_db.{file_type}")
-    formats[file_type](output_path)
-    if tool_name == "MASTER":
-        print(f"✅ MASTER file saved at: {output_path}\n")
-    else:
-        print(f"✅ Database file for - '{tool_name}' - in format - '{file_type}' saved at: {output_path}\n")
-    return output_path
\ No newline at end of file
+    os.makedirs(master_db_dir, exist_ok=True)
+    with open(os.path.join(master_db_dir, "MASTER_version.json"), "w", encoding="utf-8") as f:
+        json.dump(version_info, f, indent=2)
+    return version_info
+
+def read_master_version(master_db_dir):
+    '''Read 'MASTER_version.json'; returns None if MASTER has not been versioned yet'''
+    try:
+        with open(os.path.join(master_db_dir, "MASTER_version.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,98 @@
+'''
+File that stores all functions related to publishing MASTER as a shared, memory-mapped Arrow IPC file
+After each build MASTER is written once as 'MASTER_<version>.arrow'(uncompressed, so it can be mapped) and
+'MASTER_arrow.json' is atomically switched to point at it. Every Streamlit process maps the same file read-only;
+pages are shared through the OS page cache, so memory per host stays flat as processes/sessions are added.
+Readers of the previous version keep their mapping until they swap to the new pointer.
+'''
+import datetime
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from parse_pac.normalize import compact_frame
+
+POINTER_FILE = "MASTER_arrow.json"
+# Number of published versions kept on disk; older ones may still be mapped by running processes
+KEEP_VERSIONS = 2
+
+def arrow_path(master_db_dir, version: str):
+    return os.path.join(master_db_dir, f"MASTER_{version}.arrow")
+
+def read_master_pointer(master_db_dir):
+    '''Read 'MASTER_arrow.json'; returns None if no shared MASTER is published or its file is missing'''
+    try:
+        with open(os.path.join(master_db_dir, POINTER_FILE), "r", encoding="utf-8") as f:
+            pointer = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not os.path.exists(os.path.join(master_db_dir, pointer["file"])):
+        return None
+    return pointer
+
+def publish_master(master_db_dir, df: pd.DataFrame, version: str):
+    '''
+    Write compact MASTER as 'MASTER_<version>.arrow' and atomically point 'MASTER_arrow.json' to it
+    Returns path of published file
+    '''
+    path = arrow_path(master_db_dir, version)
+    if not os.path.exists(path):
+        table = pa.Table.from_pandas(compact_frame(df), preserve_index=False)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    else:
+        # Same content published before; mark as newest so it is not pruned
+        os.utime(path)
+    pointer = {
+        "version": version,
+        "file": os.path.basename(path),
+        "rows": df.shape[0],
+        "date": datetime.datetime.now().isoformat(timespec="seconds")
+    }
+    pointer_path = os.path.join(master_db_dir, POINTER_FILE)
+    tmp_path = f"{pointer_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pointer, f, indent=2)
+    os.replace(tmp_path, pointer_path)
+    _prune_versions(master_db_dir)
+    return path
+
+def _prune_versions(master_db_dir):
+    '''Delete oldest published files over KEEP_VERSIONS'''
+    published = sorted(
+        (entry for entry in os.scandir(master_db_dir) if entry.name.startswith("MASTER_") and entry.name.endswith(".arrow")),
+        key=lambda entry: entry.stat().st_mtime_ns, reverse=True
+    )
+    for entry in published[KEEP_VERSIONS:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            # Still mapped by another process(Windows); removed on a later publish
+            pass
+
+def _types_mapper(arrow_type):
+    '''Keep string columns backed by the mapped Arrow buffers instead of copying them into Python objects'''
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+def map_master(master_db_dir):
+    '''
+    Map published MASTER read-only
+    String columns reference mapped pages directly(zero-copy); categorical columns only copy their small code arrays.
+    Returns:
+    1) master_df: Compact MASTER dataframe, or None if no shared MASTER is published
+    2) version: Published MASTER version
+    '''
+    pointer = read_master_pointer(master_db_dir)
+    if pointer is None:
+        return None, None
+    source = pa.memory_map(os.path.join(master_db_dir, pointer["file"]), "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(types_mapper=_types_mapper, split_blocks=True), pointer["version"]
+
@@ -0,0 +1,239 @@
+'''
+File that stores all functions related to the versioned snapshot store of MASTER
+Every build is recorded as a snapshot keyed by date, MASTER version and upstream SHAs of each tool, so past policy sets
+can be read("as of" a date) and compared without re-parsing raw files.
+Layout(within 'pac_database/snapshots'):
+1) rows.pack: append-only pack of unique rows(one JSON line each), addressed by row content hash
+2) rows.idx: append-only index of pack; one '<hash> <offset> <length>' line per row
+3) manifests/<snapshot id>.json: date, MASTER version, SHAs, columns and ordered [row key, row hash] pairs
+4) snapshots.jsonl: append-only catalog; one summary line per snapshot
+Rows are content-addressed, so unchanged policies take no extra space in later snapshots.
+'''
+import datetime
+import json
+import os
+
+import pandas as pd
+
+from .setup_upsert import ROW_KEY, ROW_HASH, build_row_index, diff_row_index
+
+PACK_FILE = "rows.pack"
+INDEX_FILE = "rows.idx"
+MANIFEST_DIR = "manifests"
+CATALOG_FILE = "snapshots.jsonl"
+
+class SnapshotStore:
+    '''
+    Append-only snapshot store; safe to read while a build appends(index lines are written after pack content)
+    Index is re-read from where it was left whenever rows.idx has grown, so long lived readers(search API) see
+    snapshots recorded later by another instance(pipeline)
+    '''
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.pack_path = os.path.join(store_dir, PACK_FILE)
+        self.index_path = os.path.join(store_dir, INDEX_FILE)
+        self.manifest_dir = os.path.join(store_dir, MANIFEST_DIR)
+        self.catalog_path = os.path.join(store_dir, CATALOG_FILE)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        self.index = {}
+        # Bytes of rows.idx already loaded into index
+        self.index_offset = 0
+        self._load_index()
+
+    def _load_index(self):
+        '''
+        Add {row hash: (offset, length)} lines appended to rows.idx since last load
+        Incomplete trailing lines of an interrupted(or ongoing) write are left for the next load
+        '''
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self.index_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self.index_offset += len(line)
+                    parts = line.split()
+                    if len(parts) == 3:
+                        self.index[parts[0].decode("utf-8")] = (int(parts[1]), int(parts[2]))
+        except FileNotFoundError:
+            pass
+
+    def _refresh_index(self):
+        '''Load new index lines if rows.idx has grown'''
+        try:
+            size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            return
+        if size > self.index_offset:
+            self._load_index()
+
+    def catalog_stamp(self) -> tuple:
+        '''(size, mtime) of catalog; changes whenever a snapshot is recorded'''
+        try:
+            stat = os.stat(self.catalog_path)
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _append_rows(self, rows: dict):
+        '''Append {row hash: row dict} not yet in pack'''
+        self._refresh_index()
+        new_rows = {row_hash: row for row_hash, row in rows.items() if row_hash not in self.index}
+        if not new_rows:
+            return 0
+        entries = []
+        with open(self.pack_path, "ab") as pack:
+            offset = pack.seek(0, os.SEEK_END)
+            for row_hash, row in new_rows.items():
+                data = (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+                pack.write(data)
+                entries.append((row_hash, offset, len(data)))
+                offset += len(data)
+            pack.flush()
+            os.fsync(pack.fileno())
+        with open(self.index_path, "a", encoding="utf-8") as index:
+            index.writelines(f"{row_hash} {offset} {length}\n" for row_hash, offset, length in entries)
+        self._load_index()
+        return len(entries)
+
+    def _read_rows(self, row_hashes) -> dict:
+        '''{row hash: row dict}; pack is read in offset order'''
+        wanted = set(row_hashes)
+        if not wanted.issubset(self.index):
+            self._refresh_index()
+        missing = wanted.difference(self.index)
+        if missing:
+            raise KeyError(f"Rows missing from snapshot store index: {', '.join(sorted(missing)[:3])}")
+        wanted = sorted(wanted, key=lambda row_hash: self.index[row_hash][0])
+        rows = {}
+        with open(self.pack_path, "rb") as pack:
+            for row_hash in wanted:
+                offset, length = self.index[row_hash]
+                pack.seek(offset)
+                rows[row_hash] = json.loads(pack.read(length))
+        return rows
+
+    def record(self, df: pd.DataFrame, master_version: str, shas: dict, date=None) -> dict:
+        '''
+        Record MASTER df as a new snapshot; skipped if the latest snapshot has the same MASTER version and SHAs
+        Returns manifest summary(without rows)
+        '''
+        latest = self.list_snapshots()[-1:]
+        if latest and latest[0]["master_version"] == master_version and latest[0]["shas"] == shas:
+            print(f"✅ Snapshot unchanged; latest snapshot is: {latest[0]['id']}")
+            return latest[0]
+        date = date or datetime.datetime.now()
+        row_index = build_row_index(df)
+        values = df.astype(object).where(df.notna(), None)
+        columns = list(df.columns)
+        rows = {row_hash: dict(zip(columns, row)) for row_hash, row in zip(row_index[ROW_HASH], values.itertuples(index=False, name=None))}
+        added = self._append_rows(rows)
+        manifest = {
+            "id": f"{date:%Y%m%dT%H%M%S}-{master_version}",
+            "date": date.isoformat(timespec="seconds"),
+            "master_version": master_version,
+            "shas": shas,
+            "total": len(df),
+            "columns": columns,
+            "rows": [[key, row_hash] for key, row_hash in zip(row_index[ROW_KEY], row_index[ROW_HASH])]
+        }
+        path = os.path.join(self.manifest_dir, f"{manifest['id']}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        summary = {key: value for key, value in manifest.items() if key not in ("rows", "columns")}
+        with open(self.catalog_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        print(f"✅ Snapshot recorded: {manifest['id']} ({added} new of {len(df)} rows)")
+        return summary
+
+    def list_snapshots(self) -> list:
+        '''Summaries of all snapshots, oldest first; read from catalog so manifests are not loaded'''
+        summaries = []
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        summaries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Interrupted write
+                        continue
+        except FileNotFoundError:
+            pass
+        return sorted(summaries, key=lambda summary: summary["date"])
+
+    def get_manifest(self, snapshot_id: str) -> dict:
+        try:
+            with open(os.path.join(self.manifest_dir, f"{snapshot_id}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Snapshot not found: {snapshot_id}")
+
+    def resolve(self, when) -> str:
+        '''
+        Id of latest snapshot taken at or before when(ISO date/datetime string or datetime), or when itself if it is a snapshot id
+        Raises KeyError if there is none
+        '''
+        snapshots = self.list_snapshots()
+        if isinstance(when, str) and any(summary["id"] == when for summary in snapshots):
+            return when
+        if isinstance(when, datetime.datetime):
+            when = when.isoformat(timespec="seconds")
+        elif isinstance(when, datetime.date):
+            when = when.isoformat()
+        # Date only: whole day counts
+        if len(when) == 10:
+            when += "T23:59:59"
+        candidates = [summary["id"] for summary in snapshots if summary["date"] <= when]
+        if not candidates:
+            raise KeyError(f"No snapshot at or before: {when}")
+        return candidates[-1]
+
+    def _tool_rows(self, manifest: dict, tool=None) -> list:
+        if tool is None:
+            return manifest["rows"]
+        return [pair for pair in manifest["rows"] if pair[0].split("|", 1)[0] == tool]
+
+    def as_of(self, when, tool=None) -> pd.DataFrame:
+        '''MASTER(or rows of a single tool) as it was at given date/snapshot id'''
+        manifest = self.get_manifest(self.resolve(when))
+        pairs = self._tool_rows(manifest, tool)
+        rows = self._read_rows(row_hash for _, row_hash in pairs)
+        return pd.DataFrame([rows[row_hash] for _, row_hash in pairs], columns=manifest["columns"])
+
+    def diff(self, old, new, tool=None) -> dict:
+        '''
+        Compare two snapshots(date or snapshot id) by row key(see setup_upsert.KEY_COLUMNS)
+        Returns dict of dataframes: 'added', 'removed'(old rows), 'modified'(new rows)
+        '''
+        old_pairs = dict(self._tool_rows(self.get_manifest(self.resolve(old)), tool))
+        new_manifest = self.get_manifest(self.resolve(new))
+        new_pairs = dict(self._tool_rows(new_manifest, tool))
+        diff = diff_row_index(old_pairs, new_pairs)
+        wanted = [new_pairs[key] for key in diff["added"] + diff["modified"]] + [old_pairs[key] for key in diff["removed"]]
+        rows = self._read_rows(wanted)
+        columns = new_manifest["columns"]
+        return {
+            "added": pd.DataFrame([rows[new_pairs[key]] for key in diff["added"]], columns=columns),
+            "removed": pd.DataFrame([rows[old_pairs[key]] for key in diff["removed"]], columns=columns),
+            "modified": pd.DataFrame([rows[new_pairs[key]] for key in diff["modified"]], columns=columns)
+        }
+
+def snapshot_dir(pac_db_dir):
+    return os.path.join(pac_db_dir, "snapshots")
+
+'''
+# Use for unit testing
+if __name__ == "__main__":
+    import tempfile
+    store = SnapshotStore(tempfile.mkdtemp())
+    v1 = pd.DataFrame({"Open-source Tool": ["KICS", "Trivy"], "ID": ["a", "b"], "IaC Framework": ["TF", "TF"], "Title": ["A", "B"]})
+    v2 = pd.DataFrame({"Open-source Tool": ["KICS", "Trivy"], "ID": ["a", "c"], "IaC Framework": ["TF", "TF"], "Title": ["A2", "C"]})
+    store.record(v1, "v1", {"KICS": "x"}, datetime.datetime(2025, 1, 1))
+    store.record(v2, "v2", {"KICS": "y"}, datetime.datetime(2025, 2, 1))
+    print(store.as_of("2025-01-15"))
+    print(store.as_of("2025-02-01", tool="Trivy"))
+    print(store.diff("2025-01-01", "2025-02-01"))
+    print(os.path.getsize(store.pack_path), len(store.index))  # 4 unique rows
+'''
@@ -0,0 +1,330 @@
+'''
+File that stores all functions related to streaming database files to disk
+Every writer consumes dataframe chunks one at a time, so peak memory is bounded by the chunk size:
+- csv: header once, rows appended per chunk
+- json: single JSON array written chunk by chunk; same indented layout as DataFrame.to_json(orient="records", indent=2)
+- ndjson: newline-delimited JSON, one record per line
+- xlsx: xlsxwriter in constant-memory mode, written row by row
+- sql: replace/append per chunk; if incremental, only inserts, updates and deletes are applied
+All requested formats are written from a single pass over the data(see FormatWriter, write_formats).
+'''
+import os
+
+import pandas as pd
+import xlsxwriter
+from sqlalchemy import create_engine, inspect, text
+
+from .setup_upsert import ROW_KEY, ROW_HASH, build_row_index, diff_row_index, ChangeLogWriter
+
+# Default number of rows per chunk
+CHUNK_SIZE = 2000
+# Max number of parameters per DELETE batch; keeps SQLite under its variable limit
+DELETE_CHUNK = 500
+
+class _FileWriter:
+    '''Base writer; writes into a temp file which replaces the output file only on close'''
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.columns = None
+
+    def _align(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        '''Fix columns at first chunk; later chunks are aligned to them'''
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            return chunk
+        extra = [col for col in chunk.columns if col not in self.columns]
+        if extra:
+            print(f"❗ Columns not in first chunk are dropped from {self.path}: {extra}")
+        return chunk.reindex(columns=self.columns)
+
+    def close(self):
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class CsvWriter(_FileWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.f = open(self.tmp_path, "w", encoding="utf-8", newline="")
+
+    def write(self, chunk):
+        first = self.columns is None
+        self._align(chunk).to_csv(self.f, header=first, index=False)
+
+    def close(self):
+        self.f.close()
+        super().close()
+
+    def abort(self):
+        self.f.close()
+        super().abort()
+
+class JsonWriter(_FileWriter):
+    '''Writes a single JSON array of records without building the whole document in memory'''
+    def __init__(self, path):
+        super().__init__(path)
+        self.f = open(self.tmp_path, "w", encoding="utf-8")
+        self.f.write("[")
+        self.empty = True
+
+    def write(self, chunk):
+        chunk = self._align(chunk)
+        if chunk.empty:
+            return
+        # Records of chunk without the enclosing '[\n' and '\n]'
+        records = chunk.to_json(orient="records", indent=2)[2:-2]
+        self.f.write(("\n" if self.empty else ",\n") + records)
+        self.empty = False
+
+    def close(self):
+        self.f.write("]" if self.empty else "\n]")
+        self.f.close()
+        super().close()
+
+    def abort(self):
+        self.f.close()
+        super().abort()
+
+class NdjsonWriter(_FileWriter):
+    '''Writes newline-delimited JSON; one record per line'''
+    def __init__(self, path):
+        super().__init__(path)
+        self.f = open(self.tmp_path, "w", encoding="utf-8")
+
+    def write(self, chunk):
+        chunk = self._align(chunk)
+        if chunk.empty:
+            return
+        lines = chunk.to_json(orient="records", lines=True)
+        self.f.write(lines if lines.endswith("\n") else lines + "\n")
+
+    def close(self):
+        self.f.close()
+        super().close()
+
+    def abort(self):
+        self.f.close()
+        super().abort()
+
+class XlsxWriter(_FileWriter):
+    '''Writes xlsx row by row in xlsxwriter's constant-memory mode'''
+    def __init__(self, path):
+        super().__init__(path)
+        self.workbook = xlsxwriter.Workbook(self.tmp_path, {"constant_memory": True, "strings_to_urls": False, "nan_inf_to_errors": True})
+        self.sheet = self.workbook.add_worksheet()
+        self.header_format = self.workbook.add_format({"bold": True, "border": 1})
+        self.row = 0
+
+    def write(self, chunk):
+        first = self.columns is None
+        chunk = self._align(chunk)
+        if first:
+            self.sheet.write_row(0, 0, self.columns, self.header_format)
+            self.row = 1
+        # Rows must be written in order in constant-memory mode
+        for values in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            self.sheet.write_row(self.row, 0, values)
+            self.row += 1
+
+    def close(self):
+        self.workbook.close()
+        super().close()
+
+    def abort(self):
+        try:
+            self.workbook.close()
+        finally:
+            super().abort()
+
+class SqlWriter:
+    '''
+    Writes chunks into a SQLite table within a single transaction
+    If incremental=True, rows get stable keys/content hashes(see setup_upsert) and only changed rows are
+    inserted/replaced; rows not seen in any chunk are deleted on close.
+    A full rebuild is done when the table does not exist yet or its columns changed.
+    '''
+    def __init__(self, path, table_name="table_name", incremental=False):
+        self.path = path
+        self.table_name = table_name
+        self.incremental = incremental
+        self.columns = None
+        self.replace = True
+        self.old_rows = {}
+        self.new_rows = {}
+        self.key_counts = {}
+        self.diff = None
+        self.conn = create_engine("sqlite:///" + path).connect()
+        self.trans = self.conn.begin()
+
+    def _start(self, chunk):
+        '''Check existing table; decides between full rebuild and incremental update'''
+        self.columns = list(chunk.columns)
+        if not self.incremental:
+            return
+        insp = inspect(self.conn)
+        if insp.has_table(self.table_name):
+            old_cols = {col["name"] for col in insp.get_columns(self.table_name)}
+            if {ROW_KEY, ROW_HASH} <= old_cols:
+                old = pd.read_sql(text(f'SELECT "{ROW_KEY}", "{ROW_HASH}" FROM "{self.table_name}"'), self.conn)
+                self.old_rows = dict(zip(old[ROW_KEY], old[ROW_HASH]))
+            # New columns(e.g. schema change) require a rebuild
+            self.replace = old_cols != set(self.columns) | {ROW_KEY, ROW_HASH}
+
+    def _delete(self, keys):
+        for i in range(0, len(keys), DELETE_CHUNK):
+            self.conn.execute(
+                text(f'DELETE FROM "{self.table_name}" WHERE "{ROW_KEY}" = :key'),
+                [{"key": key} for key in keys[i:i + DELETE_CHUNK]]
+            )
+
+    def write(self, chunk):
+        first = self.columns is None
+        if first:
+            self._start(chunk)
+        else:
+            chunk = chunk.reindex(columns=self.columns)
+        if not self.incremental:
+            chunk.to_sql(self.table_name, self.conn, if_exists="replace" if first else "append", index=False)
+            return
+        index = build_row_index(chunk, self.key_counts)
+        out = chunk.assign(**{ROW_KEY: index[ROW_KEY], ROW_HASH: index[ROW_HASH]})
+        self.new_rows.update(zip(index[ROW_KEY], index[ROW_HASH]))
+        if self.replace:
+            out.to_sql(self.table_name, self.conn, if_exists="replace" if first else "append", index=False)
+            return
+        changed = [key for key, row_hash in zip(index[ROW_KEY], index[ROW_HASH]) if self.old_rows.get(key) != row_hash]
+        self._delete([key for key in changed if key in self.old_rows])
+        if changed:
+            out[out[ROW_KEY].isin(changed)].to_sql(self.table_name, self.conn, if_exists="append", index=False)
+
+    def close(self):
+        if self.incremental:
+            if self.replace:
+                self.conn.execute(text(f'CREATE UNIQUE INDEX IF NOT EXISTS "ix_{self.table_name}{ROW_KEY}" ON "{self.table_name}" ("{ROW_KEY}")'))
+            else:
+                self._delete([key for key in self.old_rows if key not in self.new_rows])
+            self.diff = diff_row_index(self.old_rows, self.new_rows)
+        self.trans.commit()
+        self.conn.close()
+
+    def abort(self):
+        self.trans.rollback()
+        self.conn.close()
+
+def open_writer(db_dir, tool_name: str, file_type: str, incremental: bool = False):
+    '''Create writer for '<tool_name>_db.<file_type>' within db_dir'''
+    os.makedirs(db_dir, exist_ok=True)
+    output_path = os.path.join(db_dir, f"{tool_name}_db.{file_type}")
+    writers = {
+        "sql": lambda path: SqlWriter(path, "table_name", incremental),
+        "csv": CsvWriter,
+        "json": JsonWriter,
+        "ndjson": NdjsonWriter,
+        "xlsx": XlsxWriter
+    }
+    return writers[file_type](output_path)
+
+def read_csv_chunks(path, chunk_size: int = CHUNK_SIZE, columns=None):
+    '''
+    Yield chunks of a saved .csv file as object dtype
+    If chunk_size is None, the whole file is yielded as a single frame
+    Empty files(written by older runs for tools without any record) yield a single empty frame of columns
+    '''
+    if os.path.getsize(path) == 0:
+        yield pd.DataFrame(columns=list(columns or []), dtype=object)
+    elif chunk_size is None:
+        yield pd.read_csv(path, dtype=object)
+    else:
+        yield from pd.read_csv(path, dtype=object, chunksize=chunk_size)
+
+def iter_chunks(data, chunk_size: int = CHUNK_SIZE):
+    '''Yield dataframe chunks of a dataframe or pass through an iterable of dataframes'''
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+    else:
+        yield from data
+
+class FormatWriter:
+    '''
+    Writes chunks into all file_types of a single tool at once
+    Can be kept open while chunks arrive from a parser; nothing is replaced until close.
+    If change_log=True, a change log(see setup_upsert.ChangeLogWriter) is also written on close.
+    If columns is given and no chunk arrived, an empty frame of columns is written on close(e.g. .csv keeps its header).
+    '''
+    def __init__(self, db_dir, tool_name: str, file_types, incremental: bool = False, change_log: bool = False, columns=None):
+        self.db_dir = db_dir
+        self.tool_name = tool_name
+        self.file_types = list(file_types)
+        self.columns = list(columns) if columns is not None else None
+        self.written = False
+        self.rows = 0
+        self.writers = {}
+        try:
+            for file_type in self.file_types:
+                self.writers[file_type] = open_writer(db_dir, tool_name, file_type, incremental)
+        except BaseException:
+            self.abort()
+            raise
+        if change_log:
+            self.writers["change_log"] = ChangeLogWriter(db_dir, tool_name)
+
+    def write(self, chunk: pd.DataFrame):
+        try:
+            for writer in self.writers.values():
+                writer.write(chunk)
+        except BaseException:
+            self.abort()
+            raise
+        self.rows += len(chunk)
+        self.written = True
+
+    def close(self) -> dict:
+        '''
+        Replace all output files
+        Returns {file type: output path}; SQL diff(if incremental) is stored in result["sql_diff"],
+        change log diff in result["change_log"]
+        '''
+        if not self.written and self.columns is not None:
+            # Tool without any record; output files still get their schema
+            self.write(pd.DataFrame(columns=self.columns, dtype=object))
+        result = {}
+        for file_type, writer in self.writers.items():
+            writer.close()
+            if file_type == "change_log":
+                result["change_log"] = writer.diff
+                continue
+            result[file_type] = writer.path
+            if file_type == "sql" and writer.diff is not None:
+                result["sql_diff"] = writer.diff
+        self.writers = {}
+        if self.tool_name == "MASTER":
+            print(f"✅ MASTER files saved in formats: {self.file_types}\n")
+        else:
+            print(f"✅ Database files for - '{self.tool_name}' - in formats - {self.file_types} saved at: {self.db_dir}\n")
+        return result
+
+    def abort(self):
+        for writer in self.writers.values():
+            writer.abort()
+        self.writers = {}
+
+def write_formats(db_dir, data, tool_name: str, file_types, incremental: bool = False, change_log: bool = False, chunk_size: int = CHUNK_SIZE, columns=None):
+    '''
+    Write data(dataframe or iterable of dataframe chunks) into all file_types in a single pass
+    Output files are only replaced once every chunk is written; nothing is replaced on failure.
+    Returns result of FormatWriter.close
+    '''
+    if columns is None and isinstance(data, pd.DataFrame):
+        columns = data.columns
+    writer = FormatWriter(db_dir, tool_name, file_types, incremental, change_log, columns)
+    try:
+        for chunk in iter_chunks(data, chunk_size):
+            writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
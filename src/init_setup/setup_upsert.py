@@ -0,0 +1,120 @@
+'''
+File that stores all functions related to incrementally updating database files
+Each row gets a stable key('Open-source Tool' + 'ID' + 'IaC Framework') and a content hash.
+Keys/hashes are compared against the previous build so only inserts, updates and deletes are applied(see setup_stream_write.SqlWriter).
+'''
+import datetime
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# Columns that identify a single policy across builds
+KEY_COLUMNS = ["Open-source Tool", "ID", "IaC Framework"]
+# Bookkeeping columns added to database tables
+ROW_KEY = "_row_key"
+ROW_HASH = "_row_hash"
+
+def build_row_index(df: pd.DataFrame, key_counts: dict = None) -> pd.DataFrame:
+    '''
+    Create stable row key and content hash for every row of given df
+    Rows sharing the same key(e.g. duplicated IDs) are numbered in order of appearance.
+    If df is one chunk of a stream, pass the same key_counts dict for every chunk so numbering continues.
+    Returns df with columns [ROW_KEY, ROW_HASH] aligned with the index of given df
+    '''
+    if df.empty:
+        return pd.DataFrame({ROW_KEY: pd.Series(dtype="string"), ROW_HASH: pd.Series(dtype="string")}, index=df.index)
+    key_parts = df.reindex(columns=KEY_COLUMNS).astype("string").fillna("")
+    base_key = key_parts[KEY_COLUMNS[0]].str.cat([key_parts[col] for col in KEY_COLUMNS[1:]], sep="|")
+    dup_count = base_key.groupby(base_key).cumcount()
+    if key_counts is not None:
+        dup_count = dup_count + base_key.map(key_counts).fillna(0).astype(int)
+        for key, count in base_key.value_counts().items():
+            key_counts[key] = key_counts.get(key, 0) + int(count)
+    row_key = base_key.where(dup_count == 0, base_key + "#" + dup_count.astype("string"))
+    # Hash all content columns; column names are included so moved values also count as changes
+    content_cols = sorted(col for col in df.columns if col not in (ROW_KEY, ROW_HASH))
+    content = df[content_cols].astype("string").fillna("")
+    row_hash = [
+        hashlib.sha256("\x1f".join(f"{col}={val}" for col, val in zip(content_cols, values)).encode("utf-8")).hexdigest()[:16]
+        for values in content.itertuples(index=False, name=None)
+    ]
+    return pd.DataFrame({ROW_KEY: row_key, ROW_HASH: row_hash}, index=df.index)
+
+def diff_row_index(old_rows: dict, new_rows: dict) -> dict:
+    '''
+    Compare two {row key: content hash} mappings
+    Returns dict of sorted key lists: 'added', 'removed', 'modified'
+    '''
+    old_keys = set(old_rows)
+    new_keys = set(new_rows)
+    return {
+        "added": sorted(new_keys - old_keys),
+        "removed": sorted(old_keys - new_keys),
+        "modified": sorted(k for k in old_keys & new_keys if old_rows[k] != new_rows[k])
+    }
+
+def record_change_log(db_dir, new_rows: dict, tool_name: str) -> dict:
+    '''
+    Diff {row key: content hash} of the current build against the row manifest of the previous build
+    and append result to change log
+    Files(within db_dir):
+    1) <tool>_rows.json: {row key: content hash} of the latest build
+    2) <tool>_changelog.jsonl: one compact line per run with added/removed/modified row keys
+    Returns diff dict(see diff_row_index)
+    '''
+    os.makedirs(db_dir, exist_ok=True)
+    manifest_path = os.path.join(db_dir, f"{tool_name}_rows.json")
+    log_path = os.path.join(db_dir, f"{tool_name}_changelog.jsonl")
+    old_rows = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                old_rows = json.load(f)
+        except json.JSONDecodeError:
+            print(f"❗ Row manifest is corrupt, treating all rows as new: {manifest_path}")
+    diff = diff_row_index(old_rows, new_rows)
+    entry = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "total": len(new_rows),
+        **{kind: len(keys) for kind, keys in diff.items()},
+        "changes": diff
+    }
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(new_rows, f)
+    print(f"✅ Change log for - '{tool_name}' - added: {len(diff['added'])}, removed: {len(diff['removed'])}, modified: {len(diff['modified'])}\n")
+    return diff
+
+def update_change_log(db_dir, df: pd.DataFrame, tool_name: str) -> dict:
+    '''
+    Diff given df against the row manifest of the previous build and append result to change log
+    Returns diff dict(see diff_row_index)
+    '''
+    index = build_row_index(df)
+    return record_change_log(db_dir, dict(zip(index[ROW_KEY], index[ROW_HASH])), tool_name)
+
+class ChangeLogWriter:
+    '''
+    Streaming counterpart of update_change_log; only row keys/hashes are kept in memory
+    Same interface as the database file writers(see setup_stream_write)
+    '''
+    def __init__(self, db_dir, tool_name: str):
+        self.db_dir = db_dir
+        self.tool_name = tool_name
+        self.path = os.path.join(db_dir, f"{tool_name}_changelog.jsonl")
+        self.new_rows = {}
+        self.key_counts = {}
+        self.diff = None
+
+    def write(self, chunk: pd.DataFrame):
+        index = build_row_index(chunk, self.key_counts)
+        self.new_rows.update(zip(index[ROW_KEY], index[ROW_HASH]))
+
+    def close(self):
+        self.diff = record_change_log(self.db_dir, self.new_rows, self.tool_name)
+
+    def abort(self):
+        self.new_rows = {}
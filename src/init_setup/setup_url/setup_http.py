@@ -0,0 +1,124 @@
+'''
+Functions related to downloading PaC files of URL based tools over plain HTTP
+- Single pooled keep-alive session(with retries and timeouts) shared by all fetches
+- Conditional requests(ETag/If-Modified-Since); unchanged responses(304) are served from disk cache
+- Parallel downloads of several URLs
+'''
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds
+TIMEOUT = (5, 30)
+POOL_SIZE = 8
+MAX_WORKERS = 8
+USER_AGENT = "pac-extract"
+
+def http_cache_dir():
+    '''HTTP cache directory; kept outside 'pac_raw' so integrity checks are not affected'''
+    return os.path.join(os.getcwd(), ".pac_cache", "http")
+
+class HttpFetcher:
+    '''
+    Pooled HTTP client with on-disk conditional request cache
+    Each URL is cached as '<hash>.json'(validators) and '<hash>.body'(content).
+    '''
+    def __init__(self, cache_dir=None, timeout=TIMEOUT, pool_size: int = POOL_SIZE):
+        self.cache_dir = cache_dir or http_cache_dir()
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET", "HEAD"])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    def _load_meta(self, meta_path, body_path):
+        if not os.path.exists(body_path):
+            return {}
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _store(self, url, response, meta_path, body_path):
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(body_path + tmp_suffix, "wb") as f:
+            f.write(response.content)
+        os.replace(body_path + tmp_suffix, body_path)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type")
+        }
+        with open(meta_path + tmp_suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + tmp_suffix, meta_path)
+
+    def fetch(self, url):
+        '''
+        GET url; uses cached body if server reports it unchanged
+        Returns:
+        1) content: response body as bytes
+        2) from_cache: True if body was not modified since last fetch
+        '''
+        meta_path, body_path = self._paths(url)
+        meta = self._load_meta(meta_path, body_path)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and meta:
+            with open(body_path, "rb") as f:
+                return f.read(), True
+        response.raise_for_status()
+        self._store(url, response, meta_path, body_path)
+        return response.content, False
+
+    def fetch_text(self, url, encoding="utf-8") -> str:
+        content, _ = self.fetch(url)
+        return content.decode(encoding, errors="replace")
+
+    def fetch_many(self, urls, max_workers: int = MAX_WORKERS) -> dict:
+        '''
+        Fetch all urls in parallel over the shared pool
+        Returns {url: content bytes}; failed urls map to the raised exception
+        '''
+        def fetch_one(url):
+            try:
+                return self.fetch(url)[0]
+            except (requests.RequestException, OSError) as e:
+                return e
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=max(min(max_workers, len(urls)), 1)) as pool:
+            return dict(zip(urls, pool.map(fetch_one, urls)))
+
+    def close(self):
+        self.session.close()
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher() -> HttpFetcher:
+    '''Process wide fetcher so every URL tool reuses the same connection pool'''
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+        return _fetcher
+
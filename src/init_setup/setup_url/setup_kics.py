@@ -1,21 +1,91 @@
 '''
 Function that downloads KICS PaC query doc from official URL
-KICS provides its combined query CSV via a JavaScript function within its doc website
-Thus, using Selenium to run script similar to one written in website to download query
+KICS provides its combined query CSV via a JavaScript function within its doc website, which exports the query table of the page.
+Thus, the same table is read straight from the page HTML over plain HTTP(see setup_http);
+Selenium running the website's own script is only used as a fallback if the table cannot be read.
 '''
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from tqdm import tqdm
+import csv
 import os
-import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from .setup_http import get_fetcher
+
+FILE_NAME = "all_queries.csv"
+
+class TableParser(HTMLParser):
+    '''
+    Collects every <table> of a HTML page as list of rows(list of cell values)
+    Cells with a link are saved as absolute link URL, like the CSV export of the website
+    '''
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.tables = []
+        self.row = None
+        self.cell = None
+        self.href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self.tables.append([])
+        elif tag == "tr" and self.tables:
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+            self.href = None
+        elif tag == "a" and self.cell is not None and self.href is None:
+            href = dict(attrs).get("href")
+            self.href = urljoin(self.base_url, href) if href else None
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self.cell is not None:
+            self.row.append(self.href or " ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            if self.row:
+                self.tables[-1].append(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+def extract_query_table(html: str, base_url: str):
+    '''Returns rows(header first) of the largest table within html; empty list if none'''
+    parser = TableParser(base_url)
+    parser.feed(html)
+    parser.close()
+    return max(parser.tables, key=len) if parser.tables else []
+
+def get_kics_queries_http(url, dest):
+    '''Pure HTTP extractor; raises ValueError if page has no query table'''
+    rows = extract_query_table(get_fetcher().fetch_text(url), url)
+    if len(rows) < 2:
+        raise ValueError(f"No query table found at: {url}")
+    os.makedirs(dest, exist_ok=True)
+    with open(os.path.join(dest, FILE_NAME), "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows)
+    print(f"✅ PaC data download from URL complete of tool:  KICS({len(rows) - 1} queries)\n")
 
 def get_kics_queries(url, dest):
+    '''Download KICS query CSV; plain HTTP first, headless browser only as fallback'''
+    try:
+        get_kics_queries_http(url, dest)
+    except Exception as e:
+        print(f"❗ HTTP download of KICS queries failed, falling back to browser: {e}")
+        get_kics_queries_browser(url, dest)
+
+def get_kics_queries_browser(url, dest):
+    # Imported only when needed; starting a browser is slow and memory heavy
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from tqdm import tqdm
     # Variables
-    file_name = "all_queries.csv"
-    save_dir = os.path.join(dest, file_name)
+    save_dir = os.path.join(dest, FILE_NAME)
     # Create dest dir
     os.makedirs(dest, exist_ok=True)
     # Step descriptions
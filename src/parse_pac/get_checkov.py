@@ -2,75 +2,62 @@
 Functions related to getting relevant Checkov PaCs
 '''
 import pandas as pd
+from .normalize import MISSING
+from .parse_stream import BATCH_SIZE, record_batches, collect
 
-# Correctly parses code into provider name
-id_to_provider = {
-    "ADO": "Azure DevOps",
-    "ALI": "Alibaba Cloud",
-    "ANSIBLE": "Ansible",
-    "ARGO": "argo",
-    "AWS": "AWS",
-    "AZURE": "Azure",
-    "AZUREPIPELINES": "Azure Pipelines",
-    "BCW": "Bridgecrew Cloud",
-    "BITBUCKET": "Bitbucket",
-    "BITBUCKETPIPELINES": "Bitbucket Pipelines",
-    "CIRCLECIPIPELINES": "CircleCI Pipelines",
-    "DIO": "DigitalOcean",
-    "DOCKER": "Docker",
-    "GCP": "Google Cloud Platform",
-    "GHA": "GitHub Actions",
-    "GIT": "GitHub",
-    "GITHUB": "GitHub Configuration",
-    "GITLAB": "GitLab",
-    "GITLABCI": "GitLab CI",
-    "GLB": "GitLab Branch",
-    "IBM": "IBM Cloud",
-    "K8S": "Kubernetes",
-    "LIN": "Linode",
-    "NCP": "Naver Cloud",
-    "OCI": "Oracle Cloud Infrastructure",
-    "OPENAPI": "OpenAPI",
-    "OPENSTACK": "OpenStack",
-    "PAN": "PAN-OS",
-    "SECRET": "Secrets",
-    "TC": "Tencent Cloud",
-    "TF": "Terraform",
-    "YC": "Yandex Cloud"
-}
-    
-def get_checkov_pac(file_path):
+# Output columns in order; used by streaming writers
+COLUMNS = ["Open-source Tool", "ID", "Title", "Description", "IaC Framework", "Category", "Provider", "Severity", "Query Document", "Related Document"]
+
+def iter_checkov_rows(file_path):
     '''
-    Creates final pandas df for Checkov
+    Read markdown table line by line and yield each row as dict(header: cell)
     '''
-    # Read markdown table as raw text and manually parse
+    headers = None
+    separator_skipped = False
     with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    # Strip lines and ignore separators
-    lines = [line.strip() for line in lines if line.strip() and line.startswith('|')]
-    # Parse header
-    headers = [h.strip() for h in lines[0].split('|')[1:-1]]
-    # Parse rows
-    data = []
-    for line in lines[2:]:
-        row = [cell.strip() for cell in line.split('|')[1:-1]]
-        data.append(row)
-    df = pd.DataFrame(data, columns=headers)
-    # Patch DF to common format
-    # Tool-ID-Title-Description-IaC-Category-Provider-Severity-Query Document-Related Document
+        for line in f:
+            # Ignore non-table lines
+            if not line.strip() or not line.startswith('|'):
+                continue
+            cells = [cell.strip() for cell in line.strip().split('|')[1:-1]]
+            if headers is None:
+                headers = cells
+            elif not separator_skipped:
+                separator_skipped = True
+            else:
+                yield dict(zip(headers, cells))
+
+def to_common_format(df):
+    '''
+    Patch raw markdown table df to common format
+    Tool-ID-Title-Description-IaC-Category-Provider-Severity-Query Document-Related Document
+    '''
     result = pd.DataFrame()
     result["Open-source Tool"] = ["Checkov"] * len(df)
     result["ID"] = df["Id"]
     result["Title"] = df["Policy"]
-    result["Description"] = pd.Series([pd.NA] * len(df))
+    result["Description"] = pd.Series([MISSING] * len(df))
     result["IaC Framework"] = df["IaC"]
-    result["Category"] = pd.Series([pd.NA] * len(df))
+    result["Category"] = pd.Series([MISSING] * len(df))
     name_ptn = r"([^_]+)_([^_]+)_([^_]+)"
-    result["Provider"] = df["Id"].str.extract(name_ptn)[1].map(id_to_provider)
-    result["Severity"] = pd.Series([pd.NA] * len(df))
+    # Raw provider code; mapped by the shared normalization stage(see mappings.json)
+    result["Provider"] = df["Id"].str.extract(name_ptn)[1]
+    result["Severity"] = pd.Series([MISSING] * len(df))
     result["Query Document"] = df["Resource Link"]
-    result["Related Document"] = pd.Series([pd.NA] * len(df))
-    return result.drop_duplicates()
+    result["Related Document"] = pd.Series([MISSING] * len(df))
+    return result
+
+def iter_checkov_pac(file_path, batch_size=BATCH_SIZE):
+    '''
+    Yields normalized pandas df batches for Checkov
+    '''
+    yield from record_batches(iter_checkov_rows(file_path), to_common_format, batch_size, dedupe=True, tool="Checkov")
+
+def get_checkov_pac(file_path):
+    '''
+    Creates final pandas df for Checkov
+    '''
+    return collect(iter_checkov_pac(file_path))
 
 '''
 # Use for single dataset clone unit testing
@@ -5,8 +5,16 @@ import os
 import re
 import pandas as pd
 import json
+from .parse_stream import BATCH_SIZE, record_batches, collect
+from .parse_discover import discover_files
+from .parse_memo import ParseMemo
 
-def parse_kics_md(filepath, subcategory="Unknown"):
+# Bump whenever parsed output changes; invalidates parse cache
+PARSER_VERSION = 1
+# Output columns in order, excluding dynamic code example columns; used by streaming writers
+COLUMNS = ["ID", "Title", "IaC Framework", "Severity", "Category", "CWE", "Query Document", "Related Document", "Subcategory", "Description", "Open-source Tool"]
+
+def parse_kics_record(filepath, subcategory="Unknown"):
     """
     Parse the markdown security-query document and return a structured dict.
     Keys returned:
@@ -31,8 +39,13 @@ def parse_kics_md(filepath, subcategory="Unknown"):
         "Related Document": r"\[Documentation\]\s*\((.+)\)",
     }
     
-    metadata = {key: re.search(pattern, md_content, re.MULTILINE).group(1).strip() 
-            for key, pattern in metadata_patterns.items()}
+    metadata = {}
+    for key, pattern in metadata_patterns.items():
+        match = re.search(pattern, md_content, re.MULTILINE)
+        if match is None:
+            # Malformed document; file is quarantined by the caller(see parse_quarantine)
+            raise ValueError(f"Metadata field '{key}' not found")
+        metadata[key] = match.group(1).strip()
     # 2. Extract description
     desc_match = re.search(r"### Description\s*(.+?)<", md_content, re.DOTALL)
     description = desc_match.group(1).strip() if desc_match else ""
@@ -87,37 +100,59 @@ def parse_kics_md(filepath, subcategory="Unknown"):
         else:
             row[f"Insecure Code Line {i}"] = lines
 
-    df = pd.DataFrame([row])
-    df["Open-source Tool"] = ["KICS"] * len(df)
-    # print(df.columns.to_list())
-    return df
+    row["Open-source Tool"] = "KICS"
+    return row
+
+def parse_kics_md(filepath, subcategory="Unknown"):
+    """
+    Parse the markdown security-query document into a single-row pandas df
+    """
+    return pd.DataFrame([parse_kics_record(filepath, subcategory)])
+
+def parse_kics_records(filepath, subcategory="Unknown"):
+    """
+    List version of parse_kics_record; used for per-file parse cache
+    """
+    return [parse_kics_record(filepath, subcategory)]
+
+def get_subcategory(rel_path):
+    """
+    Get Subcategory of a query document from its path relative to queries/
+    """
+    parts = rel_path.split(os.sep)
+    if len(parts) == 2:
+        # Case: queries/provider-queries/file.md
+        return parts[0]
+    elif len(parts) == 3:
+        # Case: queries/provider-queries/service/file.md
+        return parts[1]
+    else:
+        # Edge case; unknown
+        return "Unknown"
+
+def iter_kics_records(rootdir, workers=None, report_dir=None):
+    """
+    Yield record of each KICS query document
+    Unchanged files are read from parse cache instead of being parsed again; others are parsed by workers processes if given
+    """
+    memo = ParseMemo("KICS", PARSER_VERSION, report_dir=report_dir)
+    # Only .md files within subfolders; files directly within queries/ are skipped(see DISCOVERY_RULES)
+    items = ((entry.path, (get_subcategory(entry.rel_path),)) for entry in discover_files("KICS", rootdir))
+    for records in memo.map(items, parse_kics_records, workers):
+        yield from records
+    memo.close()
+
+def iter_kics_pac(rootdir, batch_size=BATCH_SIZE, workers=None, report_dir=None):
+    """
+    Yields normalized pandas df batches for KICS
+    """
+    yield from record_batches(iter_kics_records(rootdir, workers, report_dir), batch_size=batch_size, tool="KICS")
 
 def get_kics_pac(rootdir):
     """
     Creates final pandas df for KICS
     """
-    all_records = []
-    for root, dirs, files in os.walk(rootdir):
-        for file in files:
-            if file.lower().endswith(".md"):  # ensure only .md files
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, rootdir)
-                parts = rel_path.split(os.sep)
-                if len(parts) == 1:
-                    # Case: queries/file.md
-                    continue
-                elif len(parts) == 2:
-                    # Case: queries/provider-queries/file.md
-                    subcategory = parts[0]
-                elif len(parts) == 3:
-                    # Case: queries/provider-queries/service/file.md
-                    subcategory = parts[1]
-                else:
-                    # Edge case; unknown
-                    subcategory = "Unknown"
-                file_result = parse_kics_md(file_path, subcategory)
-                all_records.append(file_result)
-    return pd.concat(all_records, ignore_index=True) if all_records else pd.DataFrame()
+    return collect(iter_kics_pac(rootdir))
 
 '''
 # Use for single dataset clone unit testing
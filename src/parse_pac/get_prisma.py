@@ -5,24 +5,11 @@ import os
 import pandas as pd
 import re
 import json
+from .normalize import MISSING
+from .parse_stream import BATCH_SIZE, record_batches, collect
+from .parse_discover import discover_files
+from .parse_memo import ParseMemo
 
-# Correctly parses policy folder name to provider
-id_to_provider = {
-    "alibaba": "Alibaba Cloud",
-    "ansible": "Ansible",
-    "api": "API",
-    "aws": "AWS",
-    "azure": "Azure",
-    "docker": "Docker",
-    "google-cloud": "Google Cloud Platform",
-    "ibm": "IBM Cloud",
-    "kubernetes": "Kubernetes",
-    "license": "License",
-    "oci": "Oracle Cloud Infrastructure",
-    "openstack": "OpenStack",
-    "panos": "PAN-OS",
-    "secrets": "Secrets",
-}
 # Correctly parses policies with general policy folder name to provider
 general_folder_names = [
     "build-integrity",
@@ -33,17 +20,174 @@ general_folder_names = [
 ]
 
 
-severity_unify = {
-    "CRITICAL": "Critical",
-    "HIGH": "High",
-    "MEDIUM": "Medium",
-    "LOW": "Low",
-    "INFO": "Info"
+# Bump whenever parsed output changes; invalidates parse cache
+PARSER_VERSION = 3
+# Output columns in order, excluding dynamic code example columns; used by streaming writers
+COLUMNS = ["Open-source Tool", "ID", "CheckovID", "Title", "Severity", "Subcategory", "IaC Framework", "Description", "Query Document", "Category"]
+
+def clean(s):
+    """Strip value and leading list bullets('*') of each line"""
+    if s is None:
+        return MISSING
+    return re.sub(r'^[ \t]*\*+[ \t]*', '', s, flags=re.MULTILINE).strip()
+
+# Metadata table keys(lowercase) used per record
+TABLE_KEYS = {
+    "prisma cloud policy id": "prisma_id",
+    "checkov id": "checkov",
+    "checkov check id": "checkov",
+    "severity": "severity",
+    "subtype": "subtype"
 }
+# Line-anchored patterns only; each is applied to a single line so parsing stays linear
+FRAMEWORK_PTN = re.compile(r"\*(\w+)\*")
+CHECKOV_ID_PTN = re.compile(r"[A-Za-z0-9_]+")
 
-def parse_prisma_checkov(text: str) -> pd.DataFrame:
+def _heading(line):
+    """
+    Returns (level, title) if line is a section heading(e.g. '=== Description'), else None
+    A space and a non-empty title must follow the '=' run; bare '====' lines are example block delimiters
+    """
+    stripped = line.strip()
+    level = len(stripped) - len(stripped.lstrip("="))
+    title = stripped[level:].strip()
+    if level < 2 or not title or not stripped[level].isspace():
+        return None
+    return level, title
+
+def _is_fence(stripped):
+    """Listing block delimiter('----')"""
+    return len(stripped) >= 4 and stripped.strip("-") == ""
+
+def _is_example(stripped):
+    """Example block delimiter('====')"""
+    return len(stripped) >= 4 and stripped.strip("=") == ""
+
+def _table_values(cells):
+    """Pair metadata table cells as key/value; first occurrence of each key is kept"""
+    values = {}
+    for i in range(0, len(cells) - 1, 2):
+        key = TABLE_KEYS.get(cells[i].strip().lower())
+        if key and key not in values:
+            values[key] = cells[i + 1].strip()
+    return values
+
+def _split_checkov(value):
+    """Split Checkov ID cell('<query document url>[<Checkov ID>]') into (checkov id, query document)"""
+    if value is None:
+        return None, None
+    left = value.find("[")
+    right = value.find("]", left + 1)
+    if left != -1 and right != -1:
+        return value[left + 1:right].strip() or None, value[:left].strip() or None
+    match = CHECKOV_ID_PTN.match(value)
+    return (match.group(0) if match else None), None
+
+def tokenize_prisma_adoc(text: str) -> dict:
+    """
+    Single pass over lines of a Prisma policy reference .adoc; linear in file size, no backtracking.
+    Returns dict of:
+    1) title: document title('== Title')
+    2) table: values of first metadata table(see TABLE_KEYS)
+    3) description: body of 'Description' section until next heading
+    4) frameworks: list of (framework, [code blocks]) of 'Fix - Buildtime' section, in order
+    """
+    title = None
+    cells = []
+    table_state = "before"  # before -> open -> done
+    section = None
+    buildtime_level = None
+    description = []
+    frameworks = []
+    in_fence = False
+    fence = None
+    block = []
+    attribute = None
+    example = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        # Listing blocks(code); headings/tables inside are not parsed
+        if in_fence:
+            block.append(line.rstrip())
+            if stripped == fence:
+                in_fence = False
+                if section == "buildtime" and frameworks:
+                    frameworks[-1][1].append("\n".join(block).strip())
+            elif section == "description":
+                description.append(line)
+            continue
+        if _is_fence(stripped):
+            in_fence = True
+            fence = stripped
+            block = [attribute, stripped] if attribute else [stripped]
+            attribute = None
+            if section == "description":
+                description.append(line)
+            continue
+        # Comments
+        if stripped.startswith("//"):
+            continue
+        # Metadata table
+        if stripped.startswith("|==="):
+            if table_state == "before":
+                table_state = "open"
+            elif table_state == "open":
+                table_state = "done"
+            continue
+        if table_state == "open":
+            if stripped.startswith("|"):
+                cells.extend(stripped[1:].split("|"))
+            elif stripped and cells:
+                cells[-1] = f"{cells[-1]} {stripped}"
+            continue
+        # Example blocks; delimiters and headings inside belong to the current section
+        if _is_example(stripped):
+            example = None if example == stripped else (example or stripped)
+            if section == "description":
+                description.append(line)
+            continue
+        # Sections
+        heading = None if example else _heading(line)
+        if heading:
+            level, name = heading
+            if title is None:
+                title = name
+            if section == "buildtime" and level > buildtime_level:
+                continue
+            name = name.lower()
+            if name.startswith("description"):
+                section = "description"
+            elif name.startswith("fix - buildtime"):
+                section = "buildtime"
+                buildtime_level = level
+            else:
+                section = None
+            attribute = None
+            continue
+        if section == "description":
+            description.append(line)
+        elif section == "buildtime":
+            framework = FRAMEWORK_PTN.match(stripped)
+            if framework:
+                frameworks.append((framework.group(1), []))
+                attribute = None
+            elif stripped.startswith("["):
+                attribute = stripped
+    # Unclosed listing block at end of file
+    if in_fence and section == "buildtime" and frameworks:
+        frameworks[-1][1].append("\n".join(block).strip())
+
+    return {
+        "title": title,
+        "table": _table_values(cells),
+        "description": "\n".join(description).strip() or None,
+        "frameworks": frameworks
+    }
+
+def parse_prisma_records(text: str) -> list:
     """
-    Parse Prisma/Checkov policy doc into a DataFrame.
+    Parse Prisma/Checkov policy doc into a list of records.
     Get List of Frameworks, find if there are examples related to it.
     Create separate rule per framework within rule if there is an example.
     If not, empty out example and create barebone row.
@@ -51,137 +195,100 @@ def parse_prisma_checkov(text: str) -> pd.DataFrame:
     ID(Prisma Cloud ID), CheckovID, Title, Severity, Subcategory, Framework(Divide each framework to single row), Description,
     Query Document, Related Document, Insecure Code Example 1
     """
-    
-    def grab(pattern):
-        m = re.search(pattern, text, re.IGNORECASE)
-        return m.group(1).strip() if m else None
-
-    # Metadata
-    title = grab(r'^\s*(?:==\s*)([^\n]*)')
-    prisma_id = grab(r'Prisma Cloud Policy ID\s*\|\s*(.+)')
-    query_document = grab(r'Checkov ID\s*\|\s*(.*)\[.+\]')
-    checkov_id = grab(r'Checkov(?: Check)? ID\s*\|\s*(?:[^\[\n]*\[)?([A-Z0-9_]+)(?:\])?')
-    severity = grab(r'Severity\s*\|\s*(.+)')
-    subtype = grab(r'Subtype\s*\|\s*(.+)')
-
-    # Description
-    desc_m = re.search(r'Description\s+([\s\S]*?)(?=[/=])',
-                       text, re.MULTILINE | re.IGNORECASE)
-    description = desc_m.group(1).strip() if desc_m else None
-
-    # Fix section
-    # Ignore "Fix - Runtime"; CLI fixes, not relevant
-    fix_total_block = re.search(r'Fix - Buildtime[\s\S]*(\*[\s\S]*)', text, re.IGNORECASE)
+    tokens = tokenize_prisma_adoc(text)
+    table = tokens["table"]
+    checkov_id, query_document = _split_checkov(table.get("checkov"))
+    severity = clean(table.get("severity"))
     records = []
+    # Fix section; ignore "Fix - Runtime", CLI fixes, not relevant
+    for framework, code_final in tokens["frameworks"]:
+        # Create row per framework
+        records.append({
+            "Open-source Tool": "Prisma",
+            "ID": clean(table.get("prisma_id")),
+            "CheckovID": clean(checkov_id),
+            "Title": clean(tokens["title"]),
+            # Raw severity; mapped by the shared normalization stage(see mappings.json)
+            "Severity": severity,
+            "Subcategory": clean(table.get("subtype")),
+            "IaC Framework": clean(framework),
+            "Description": clean(tokens["description"]),
+            "Query Document": clean(query_document),
+            "Insecure Code Example 1": json.dumps([code_final]) if len(code_final) != 0 else MISSING
+        })
 
-    def clean(s):
-        if s is None:
-            return pd.NA
-        return re.sub(r'^\s*\*+\s*', '', s, flags=re.MULTILINE).strip()
-    
-    if fix_total_block:
-        fix_text = fix_total_block.group(0)
-        framework_sections = re.split(r"\*(\w+)\*", fix_text)
-
-        for i in range(1, len(framework_sections), 2):
-            framework = framework_sections[i]
-            body = framework_sections[i+1]
-
-            '''
-            # Resource and Argument
-            # Removed for better unification between other open-source tools, enable if necessary
-            resource = re.search(r"\* *Resource:\* *([^\n]+)", body)
-            argument = re.search(r"\* *Argument:\* *([^\n]+)", body)
-            '''
-            
-            # Code block(s)
-            code_blocks = re.findall(r"(\[[^*]*)", body, re.S)
-            code_final = [code.strip() for code in code_blocks]
-
-            # Create row per framework
-            '''
-            # Removed for better unification between other open-source tools, enable if necessary
-            "Resource": resource.group(1) if resource else None,
-            "Argument": argument.group(1) if argument else None,
-            '''
-            records.append({
-                "Open-source Tool": "Prisma",
-                "ID": clean(prisma_id),
-                "CheckovID": clean(checkov_id),
-                "Title": clean(title),
-                "Severity": severity_unify[clean(severity)] if clean(severity) in severity_unify.keys() else clean(severity),
-                "Subcategory": clean(subtype),
-                "IaC Framework": clean(framework),
-                "Description": clean(description),
-                "Query Document": clean(query_document),
-                "Insecure Code Example 1": json.dumps([code_final]) if len(code_final) != 0 else pd.NA
-            })
-
-    return pd.DataFrame(records)
+    return records
 
-def parse_policy_adoc(filepath):
-    """Decide parser based on content."""
+def parse_prisma_checkov(text: str) -> pd.DataFrame:
+    """Parse Prisma/Checkov policy doc into a DataFrame."""
+    return pd.DataFrame(parse_prisma_records(text))
+
+def parse_policy_adoc_records(filepath) -> list:
+    """Decide parser based on content; returns list of records."""
     with open(filepath, encoding="utf-8") as f:
         text = f.read()
 
-    # If file is "empty summary" just return empty df
+    # If file is "empty summary" just return no records
     lines = text.splitlines()
     if len(lines) == 1 and lines[0].startswith("=="):
-        return pd.DataFrame()
+        return []
     else:
-        return parse_prisma_checkov(text)
-    
-def get_prisma_pac(rootdir):
+        return parse_prisma_records(text)
+
+def parse_policy_adoc(filepath):
+    """Decide parser based on content."""
+    return pd.DataFrame(parse_policy_adoc_records(filepath))
+
+def get_category(rootdir, dirpath):
     """
-    Creates final pandas df for Prisma
+    Get Category of all policies within dirpath from its folder names
     """
-    all_records = []
-
-    for dirpath, _, files in os.walk(rootdir):
-        dirname = os.path.basename(dirpath)
-        summary_file = f"{dirname}.adoc"
-
-        detail_records = []
-        for f in files:
-            if f.endswith(".adoc") and f != summary_file:
-                filepath = os.path.join(dirpath, f)
-                parsed = parse_policy_adoc(filepath)
-                # parse_policy_adoc returns a DataFrame, extract dict(s)
-                if isinstance(parsed, pd.DataFrame):
-                    detail_records.extend(parsed.to_dict(orient="records"))
-                else:
-                    # fallback in case parse_policy_adoc returns dict
-                    detail_records.append(parsed)
-
-        if not detail_records:
-            continue
+    relpath = os.path.relpath(dirpath, rootdir)
+    parts = relpath.split(os.sep)
+    def clean_name(name):
+        if not name:
+            return None
+        return name.replace("-policies", "")
 
-        result = pd.DataFrame(detail_records)
+    parent_folder_name = clean_name(parts[0]) if len(parts) > 0 else None
 
-        # Add Category
-        relpath = os.path.relpath(dirpath, rootdir)
-        parts = relpath.split(os.sep)
-        def clean_name(name):
-            if not name:
-                return None
-            return name.replace("-policies", "")
+    # Check if parent folder needs to use subfolder name as Category
+    # Raw folder name; mapped by the shared normalization stage(see mappings.json)
+    if parent_folder_name in general_folder_names:
+        return clean_name(parts[1]) if len(parts) > 1 else None
+    else:
+        return clean_name(parts[1]) if len(parts) > 1 else None
 
-        parent_folder_name = clean_name(parts[0]) if len(parts) > 0 else None
+def iter_prisma_records(rootdir, workers=None, report_dir=None):
+    """
+    Yield record of each policy(per framework) within Prisma policy reference
+    """
+    # Summary files('<folder name>.adoc') are excluded(see DISCOVERY_RULES)
+    # Unchanged files are read from parse cache instead of being parsed again; others are parsed by workers processes if given
+    memo = ParseMemo("Prisma", PARSER_VERSION, report_dir=report_dir)
+    categories = {}
+    entries = list(discover_files("Prisma", rootdir))
+    for entry, records in zip(entries, memo.map(((entry.path, ()) for entry in entries), parse_policy_adoc_records, workers)):
+        dirpath = os.path.dirname(entry.path)
+        for record in records:
+            if dirpath not in categories:
+                categories[dirpath] = get_category(rootdir, dirpath)
+            record["Category"] = categories[dirpath]
+            yield record
+    memo.close()
 
-        # Check if parent folder needs to use subfolder name as Category
-        if parent_folder_name in general_folder_names:
-            category = clean_name(parts[1]) if len(parts) > 1 else None
-            result["Category"] = id_to_provider[category] if category in id_to_provider.keys() else category 
-        else:
-            category = clean_name(parts[1]) if len(parts) > 1 else None
-            result["Category"] = id_to_provider[category] if category in id_to_provider.keys() else category
+def iter_prisma_pac(rootdir, batch_size=BATCH_SIZE, workers=None, report_dir=None):
+    """
+    Yields normalized pandas df batches for Prisma
+    """
+    yield from record_batches(iter_prisma_records(rootdir, workers, report_dir), batch_size=batch_size, tool="Prisma")
 
-        all_records.append(result)
 
-    if all_records:
-        return pd.concat(all_records, ignore_index=True)
-    else:
-        return pd.DataFrame()
+def get_prisma_pac(rootdir):
+    """
+    Creates final pandas df for Prisma
+    """
+    return collect(iter_prisma_pac(rootdir))
 
 '''
 # Use for single dataset clone unit testing
@@ -203,4 +310,4 @@ if __name__ == "__main__":
     print(df.head())
     print(df.shape)
     df.to_csv("prisma.csv")
-'''
\ No newline at end of file
+'''
@@ -4,62 +4,74 @@ Functions related to getting relevant Terrascan PaCs
 import os
 import json
 import pandas as pd
+from .normalize import MISSING
+from .parse_stream import BATCH_SIZE, record_batches, collect
+from .parse_discover import discover_files
+from .parse_memo import ParseMemo
 
-# Correctly parses code into provider name
-# ['aws' 'azure' 'docker' 'gcp' 'github' 'k8s']
-id_to_provider = {
-    "aws": "AWS",
-    "azure": "Azure",
-    "docker": "Docker",
-    "gcp": "Google Cloud Platform",
-    "github": "GitHub Configuration",
-    "k8s": "Kubernetes"
-}
-severity_unify = {
-    "HIGH": "High",
-    "MEDIUM": "Medium",
-    "LOW": "Low"
-}
+# Bump whenever parsed output changes; invalidates parse cache
+PARSER_VERSION = 2
+# Output columns in order; used by streaming writers
+COLUMNS = ["Open-source Tool", "ID", "Title", "Description", "IaC Framework", "Category", "Provider", "Severity", "Query Document", "Related Document"]
 
-def get_terrascan_pac(folder_path):
+def parse_terrascan_records(file_path, folder_name):
     '''
-    Creates final pandas df for Terrascan
+    Raw record of a single Terrascan policy .json file as a list, with its folder name added
+    Invalid files raise; they are quarantined by the caller(see parse_quarantine)
+    '''
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Policy is not a JSON object: {type(data).__name__}")
+    # Extract desired fields; here extracting all top-level keys, adding folder name
+    record = data.copy()
+    record['folder_name'] = folder_name
+    return [record]
+
+def iter_terrascan_records(folder_path, workers=None, report_dir=None):
+    '''
+    Yield raw record of each Terrascan policy .json file, with its folder name added
+    Unchanged files are read from parse cache instead of being parsed again; others are parsed by workers processes if given
+    '''
+    memo = ParseMemo("Terrascan", PARSER_VERSION, report_dir=report_dir)
+    items = ((entry.path, (os.path.basename(os.path.dirname(entry.path)),)) for entry in discover_files("Terrascan", folder_path))
+    for records in memo.map(items, parse_terrascan_records, workers):
+        yield from records
+    memo.close()
+
+def to_common_format(df):
+    '''
+    Patch raw record df to common format
+    Index(['name', 'file', 'policy_type', 'resource_type', 'template_args',
+      'severity', 'description', 'reference_id', 'category', 'version', 'id',
+      'folder_name'],
+    Tool-ID-Title-Description-IaC-Category-Provider-Severity-Query Document-Related Document
     '''
-    records = []
-    for root, dirs, files in os.walk(folder_path):
-        folder_name = os.path.basename(root)
-        for file in files:
-            if file.endswith('.json'):
-                folder_path = os.path.join(root, file)
-                try:
-                    with open(folder_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    # Extract desired fields; here extracting all top-level keys, adding folder name
-                    record = data.copy()
-                    record['folder_name'] = folder_name
-                    records.append(record)
-                except Exception as e:
-                    print(f"Failed to parse {folder_path}: {e}")
-    # Create temporary dataframe
-    df = pd.DataFrame(records)
-    # Patch DF to common format
-    # Index(['name', 'file', 'policy_type', 'resource_type', 'template_args',       
-    #   'severity', 'description', 'reference_id', 'category', 'version', 'id',
-    #   'folder_name'],
-    # Tool-ID-Title-Description-IaC-Category-Provider-Severity-Query Document-Related Document
     result = pd.DataFrame()
     result["Open-source Tool"] = ["Terrascan"] * len(df)
     result["ID"] = df["id"]
     result["Title"] = df["description"]
-    result["Description"] = pd.Series([pd.NA] * len(df))
+    result["Description"] = pd.Series([MISSING] * len(df))
     result["IaC Framework"] = ["Terraform"] * len(df)
     result["Category"] =  df["category"]
-    result["Provider"] = df["policy_type"].map(id_to_provider)
-    result["Severity"] = df["severity"].map(severity_unify)
-    result["Query Document"] = pd.Series([pd.NA] * len(df))
-    result["Related Document"] = pd.Series([pd.NA] * len(df))
-    
-    return result.drop_duplicates()
+    # Raw provider/severity codes; mapped by the shared normalization stage(see mappings.json)
+    result["Provider"] = df["policy_type"]
+    result["Severity"] = df["severity"]
+    result["Query Document"] = pd.Series([MISSING] * len(df))
+    result["Related Document"] = pd.Series([MISSING] * len(df))
+    return result
+
+def iter_terrascan_pac(folder_path, batch_size=BATCH_SIZE, workers=None, report_dir=None):
+    '''
+    Yields normalized pandas df batches for Terrascan
+    '''
+    yield from record_batches(iter_terrascan_records(folder_path, workers, report_dir), to_common_format, batch_size, dedupe=True, tool="Terrascan")
+
+def get_terrascan_pac(folder_path):
+    '''
+    Creates final pandas df for Terrascan
+    '''
+    return collect(iter_terrascan_pac(folder_path))
 
 '''
 if __name__ == '__main__':
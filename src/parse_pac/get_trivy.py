@@ -3,32 +3,15 @@ Functions related to getting relevant Trivy PaCs
 '''
 import os
 import yaml
-import pandas as pd
-import numpy as np
-
-# Correctly parses code into provider name
-# ['aws' 'azure' 'cloudstack' 'digitalocean' 'github' 'google' 'kubernetes'
-# 'nifcloud' 'openstack' 'oracle' '']
-id_to_provider = {
-    "aws": "AWS",
-    "azure": "Azure",
-    "cloudstack": "CloudStack",
-    "digitalocean": "DigitalOcean",
-    "docker": "Docker",
-    "github": "GitHub",
-    "google": "Google Cloud Platform",
-    "kubernetes": "Kubernetes",
-    "nifcloud": "Nifcloud",
-    "openstack": "OpenStack",
-    "oracle": "Oracle Cloud Infrastructure",
-    'NaN': "NaN"
-}
-severity_unify = {
-    "CRITICAL": "Critical",
-    "HIGH": "High",
-    "MEDIUM": "Medium",
-    "LOW": "Low"
-}
+from .normalize import MISSING
+from .parse_stream import BATCH_SIZE, record_batches, collect
+from .parse_discover import discover_files
+from .parse_memo import ParseMemo
+
+# Bump whenever parsed output changes; invalidates parse cache
+PARSER_VERSION = 3
+# Output columns in order; used by streaming writers
+COLUMNS = ["Open-source Tool", "ID", "Title", "Description", "IaC Framework", "Category", "Provider", "Severity", "Query Document", "Related Document"]
 
 def extract_metadata_from_rego(filepath):
     '''
@@ -70,12 +53,12 @@ def extract_metadata_from_rego(filepath):
     yaml_str = '\n'.join(metadata_lines)
     try:
         metadata = yaml.safe_load(yaml_str)
-        return metadata
-    except Exception as e:
-        print(f"YAML parse error in {filepath}: {e}")
-        print("Problematic YAML snippet:")
-        print(yaml_str)
-        return None
+    except yaml.YAMLError as e:
+        # File is quarantined by the caller(see parse_quarantine)
+        raise ValueError(f"YAML parse error in metadata: {e}") from e
+    if not isinstance(metadata, dict):
+        raise ValueError(f"Metadata is not a mapping: {type(metadata).__name__}")
+    return metadata
 
 def extract_fields(metadata, filepath):
     '''
@@ -85,12 +68,9 @@ def extract_fields(metadata, filepath):
         return None
 
     # Safely get nested fields with defaults
-    title = metadata.get('title')
-    if title == '': title = "NaN"
-    description = metadata.get('description')
-    if description == '': description = "NaN"
-    related_resources = metadata.get('related_resources')
-    if related_resources == '': related_resources = "NaN"
+    title = metadata.get('title') or MISSING
+    description = metadata.get('description') or MISSING
+    related_resources = metadata.get('related_resources') or MISSING
     if isinstance(related_resources, list):
         related_resources = ", ".join(map(str, related_resources))
     input_data = metadata.get('custom', {}).get('input', {})
@@ -103,9 +83,6 @@ def extract_fields(metadata, filepath):
             subtypes = selector[0].get('subtypes', [])
             if subtypes and isinstance(subtypes, list):
                 provider_value = subtypes[0].get('provider')
-    if type_value is None: type_value = "NaN"
-    if provider_value is None: provider_value = "NaN"
-    
     # Docker and Kubernetes specific; change values accordingly
     if type_value == "dockerfile":
         type_value = "container"
@@ -125,31 +102,44 @@ def extract_fields(metadata, filepath):
         "Title": title,
         "Description": description,
         "IaC Framework": "Multiple",
-        "Category": np.nan,
-        "Provider": id_to_provider[provider_value],
-        "Severity": severity_unify[custom.get('severity', "")],
-        "Query Document": np.nan,
+        "Category": MISSING,
+        # Raw provider/severity codes; mapped by the shared normalization stage(see mappings.json)
+        "Provider": provider_value or MISSING,
+        "Severity": custom.get('severity') or MISSING,
+        "Query Document": MISSING,
         "Related Document": related_resources
     }
 
+def parse_trivy_records(filepath):
+    '''
+    Common format record of a single Trivy .rego file as a list; empty if file has no metadata
+    '''
+    record = extract_fields(extract_metadata_from_rego(filepath), filepath)
+    return [record] if record else []
+
+def iter_trivy_records(folder_path, workers=None, report_dir=None):
+    '''
+    Yield common format record of each Trivy .rego file
+    Unchanged files are read from parse cache instead of being parsed again; others are parsed by workers processes if given
+    '''
+    memo = ParseMemo("Trivy", PARSER_VERSION, report_dir=report_dir)
+    # Test .rego files are excluded(see DISCOVERY_RULES)
+    items = ((entry.path, ()) for entry in discover_files("Trivy", folder_path))
+    for records in memo.map(items, parse_trivy_records, workers):
+        yield from records
+    memo.close()
+
+def iter_trivy_pac(folder_path, batch_size=BATCH_SIZE, workers=None, report_dir=None):
+    '''
+    Yields normalized pandas df batches for Trivy
+    '''
+    yield from record_batches(iter_trivy_records(folder_path, workers, report_dir), batch_size=batch_size, dedupe=True, tool="Trivy")
+
 def get_trivy_pac(folder_path):
     '''
     Combined final parser for Trivy PaC files
     '''
-    records = []
-    for dirpath, _, filenames in os.walk(folder_path):
-        for file in filenames:
-            if not file.endswith('.rego'):
-                continue
-            # Exclude test.rego files
-            if file.endswith('_test.rego'):
-                continue
-            filepath = os.path.join(dirpath, file)
-            metadata = extract_metadata_from_rego(filepath)
-            record = extract_fields(metadata, filepath)
-            if record:
-                records.append(record)
-    return pd.DataFrame(records).drop_duplicates()
+    return collect(iter_trivy_pac(folder_path))
 
 '''
 if __name__ == '__main__':
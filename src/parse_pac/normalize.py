@@ -0,0 +1,193 @@
+'''
+Functions related to normalizing parsed PaC dataframes into a single, compact representation
+All parsers in parse_pac apply the same missing-value convention(pd.NA) before returning.
+Raw provider/severity/framework/category codes are mapped by declarative tables in 'mappings.json'(plus optional
+'pac_mappings.json' in project root), applied per batch as vectorized categorical remaps(see apply_mappings).
+'''
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Single missing-value convention for all parsers
+MISSING = pd.NA
+# Placeholder strings that are treated as missing values
+MISSING_TOKENS = ["", "NaN", "nan", "None", "<NA>"]
+
+# Fixed vocabularies; order of SEVERITY_ORDER is used for range comparisons
+TOOL_VOCAB = ["Checkov", "KICS", "Terrascan", "Trivy", "Prisma"]
+SEVERITY_ORDER = ["Info", "Low", "Medium", "High", "Critical"]
+# Columns stored as categorical dtype in compact representation
+CATEGORY_COLUMNS = ["Open-source Tool", "Severity", "Provider", "IaC Framework", "Category"]
+# Built-in mapping tables, and project specific additions/overrides of them
+MAPPINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mappings.json")
+USER_MAPPINGS_FILE = "pac_mappings.json"
+
+_mappings = None
+# (tool, column, raw value): number of rows left unmapped since last reset
+_unmapped = Counter()
+
+def _string_dtype():
+    '''Arrow-backed strings if pyarrow is available, else pandas' default string dtype'''
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype("pyarrow")
+    except ImportError:
+        return pd.StringDtype()
+
+STRING_DTYPE = _string_dtype()
+
+def normalize_missing(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Replace every missing-value variant(None, np.nan, "NaN", "" etc.) within text columns with pd.NA
+    '''
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            series = df[col]
+            df[col] = series.where(series.notna() & ~series.isin(MISSING_TOKENS), MISSING)
+    return df
+
+def _read_mappings(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in mapping file {path}: {e}") from e
+
+def load_mappings(reload: bool = False) -> dict:
+    '''
+    Mapping tables as {column: {tool or "*": {"values": {raw: canonical}, "unmapped": "keep" or "missing"}}}
+    Tables of 'pac_mappings.json'(project root) are merged into built-in tables, so new values can be added as data.
+    '''
+    global _mappings
+    if _mappings is None or reload:
+        mappings = _read_mappings(MAPPINGS_FILE)
+        for col, tables in _read_mappings(os.path.join(os.getcwd(), USER_MAPPINGS_FILE)).items():
+            for tool, table in tables.items():
+                base = mappings.setdefault(col, {}).setdefault(tool, {})
+                base["values"] = {**base.get("values", {}), **table.get("values", {})}
+                if "unmapped" in table:
+                    base["unmapped"] = table["unmapped"]
+        _mappings = mappings
+    return _mappings
+
+def _remap(series: pd.Series, table: dict):
+    '''
+    Map series through table once per distinct value, then broadcast to rows through factorized codes
+    Matching ignores case/surrounding whitespace; values that already are canonical are kept.
+    Returns:
+    1) mapped: Mapped series
+    2) unmapped: {raw value: row count} of values not within table
+    '''
+    values = table.get("values", {})
+    lookup = {str(raw).strip().lower(): canonical for raw, canonical in values.items()}
+    canonical = set(values.values())
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    mapped = []
+    unmapped = {}
+    for value, count in zip(uniques, counts):
+        value = str(value)
+        if value in canonical:
+            mapped.append(value)
+        elif value.strip().lower() in lookup:
+            mapped.append(lookup[value.strip().lower()])
+        else:
+            unmapped[value] = int(count)
+            mapped.append(MISSING if table.get("unmapped") == "missing" else value)
+    # Last slot is picked by missing values(code -1)
+    result = np.array(mapped + [MISSING], dtype=object)[codes]
+    return pd.Series(result, index=series.index, dtype=object), unmapped
+
+def apply_mappings(df: pd.DataFrame, tool: str) -> pd.DataFrame:
+    '''
+    Map raw codes of every mapped column of df into canonical values
+    Table of given tool is used if it exists, else the "*" table of the column. Unmapped values are kept
+    (or set missing, if the table says so) and counted instead of raising; see unmapped_report.
+    '''
+    df = df.copy()
+    for col, tables in load_mappings().items():
+        table = tables.get(tool, tables.get("*"))
+        if not table or col not in df.columns:
+            continue
+        df[col], unmapped = _remap(df[col], table)
+        for value, count in unmapped.items():
+            _unmapped[(tool, col, value)] += count
+    return df
+
+def unmapped_report(reset: bool = False) -> list:
+    '''
+    Values without a mapping seen since last reset, most frequent first
+    Returns list of {"tool", "column", "value", "rows"}
+    '''
+    report = [
+        {"tool": tool, "column": col, "value": value, "rows": count}
+        for (tool, col, value), count in _unmapped.most_common()
+    ]
+    if reset:
+        _unmapped.clear()
+    return report
+
+def _category_dtype(col: str, series: pd.Series) -> pd.CategoricalDtype:
+    '''
+    Get categorical dtype of given column
+    Tool and Severity use fixed vocabularies; values outside of them are appended and reported.
+    Severity is NOT an ordered categorical: appended values(e.g. 'Trace', 'UNKNOWN') have no rank,
+    so range comparisons must rank values by their position within SEVERITY_ORDER(see search_query).
+    '''
+    values = pd.Series(series.dropna().unique(), dtype=object).astype(str)
+    if col == "Open-source Tool":
+        vocab = TOOL_VOCAB
+    elif col == "Severity":
+        vocab = SEVERITY_ORDER
+    else:
+        return pd.CategoricalDtype(sorted(values))
+    extra = sorted(set(values) - set(vocab))
+    if extra:
+        print(f"❗ Values outside of fixed '{col}' vocabulary: {extra}")
+    return pd.CategoricalDtype(vocab + extra)
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Convert df into canonical compact representation:
+    1) All missing values as pd.NA
+    2) CATEGORY_COLUMNS as categorical dtype(Severity categories start with SEVERITY_ORDER)
+    3) Remaining text columns as Arrow-backed strings
+    '''
+    df = normalize_missing(df)
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype(_category_dtype(col, df[col]))
+        elif df[col].dtype == object:
+            df[col] = df[col].astype(STRING_DTYPE)
+    return df
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Compare deep memory usage per column of two dataframes
+    Returns df with columns: Column, Dtype(before), Dtype(after), Before(MB), After(MB), Saved(%)
+    '''
+    before_mem = before.memory_usage(deep=True, index=False)
+    after_mem = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "Column": before_mem.index,
+        "Dtype(before)": [str(before[col].dtype) for col in before_mem.index],
+        "Dtype(after)": [str(after[col].dtype) if col in after else "-" for col in before_mem.index],
+        "Before(MB)": before_mem.values / 2**20,
+        "After(MB)": after_mem.reindex(before_mem.index).fillna(0).values / 2**20
+    })
+    total = pd.DataFrame([{
+        "Column": "TOTAL",
+        "Dtype(before)": "-",
+        "Dtype(after)": "-",
+        "Before(MB)": report["Before(MB)"].sum(),
+        "After(MB)": report["After(MB)"].sum()
+    }])
+    report = pd.concat([report, total], ignore_index=True)
+    report["Saved(%)"] = (1 - report["After(MB)"] / report["Before(MB)"].where(report["Before(MB)"] > 0)) * 100
+    return report.round(3)
@@ -0,0 +1,146 @@
+'''
+Functions related to discovering raw PaC files of each tool
+All parsers share a single os.scandir based walker driven by declarative per-tool rules.
+The listing is saved next to the raw data as '.<folder>_listing.json' and reused while
+no directory of the tree has changed(directory mtimes), so unchanged trees are not re-walked.
+In-place edits do not change directory mtimes; size/mtime of reused entries are therefore always taken from a fresh stat.
+'''
+import fnmatch
+import json
+import os
+from typing import NamedTuple
+
+# Declarative discovery rules per tool
+# include/exclude: filename patterns(fnmatch); '{dirname}' is replaced with the name of the file's folder
+# min_depth/max_depth: number of folders between root and file(0 = files directly within root); None = no limit
+# case_sensitive: whether patterns match filename case
+DISCOVERY_RULES = {
+    "KICS": {"include": ["*.md"], "exclude": [], "min_depth": 1, "max_depth": None, "case_sensitive": False},
+    "Prisma": {"include": ["*.adoc"], "exclude": ["{dirname}.adoc"], "min_depth": 0, "max_depth": None, "case_sensitive": True},
+    "Trivy": {"include": ["*.rego"], "exclude": ["*_test.rego"], "min_depth": 0, "max_depth": None, "case_sensitive": True},
+    "Terrascan": {"include": ["*.json"], "exclude": [], "min_depth": 0, "max_depth": None, "case_sensitive": True}
+}
+# Bump when listing file layout changes
+LISTING_VERSION = 1
+
+class FileEntry(NamedTuple):
+    '''Discovered file; stat info is taken while walking'''
+    path: str
+    rel_path: str
+    size: int
+    mtime_ns: int
+
+def _matches(name, patterns, dirname, case_sensitive):
+    if not case_sensitive:
+        name = name.lower()
+    for pattern in patterns:
+        pattern = pattern.replace("{dirname}", dirname)
+        if not case_sensitive:
+            pattern = pattern.lower()
+        if fnmatch.fnmatchcase(name, pattern):
+            return True
+    return False
+
+def scan_files(root, rule: dict):
+    '''
+    Walk root once with os.scandir following given rule
+    Returns:
+    1) entries: list of FileEntry, in sorted pre-order
+    2) dirs: {relative folder path: mtime_ns} of every walked folder, used to validate saved listings
+    '''
+    entries = []
+    dirs = {}
+    min_depth = rule.get("min_depth") or 0
+    max_depth = rule.get("max_depth")
+    case_sensitive = rule.get("case_sensitive", True)
+    # (folder path, depth)
+    stack = [(root, 0)]
+    while stack:
+        dir_path, depth = stack.pop()
+        try:
+            dirs[os.path.relpath(dir_path, root)] = os.stat(dir_path).st_mtime_ns
+            with os.scandir(dir_path) as it:
+                children = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"❗ Failed to scan {dir_path}: {e}")
+            continue
+        dirname = os.path.basename(dir_path)
+        subdirs = []
+        for entry in children:
+            if entry.is_dir(follow_symlinks=False):
+                if max_depth is None or depth < max_depth:
+                    subdirs.append((entry.path, depth + 1))
+                continue
+            if depth < min_depth or not entry.is_file():
+                continue
+            if not _matches(entry.name, rule.get("include", ["*"]), dirname, case_sensitive):
+                continue
+            if _matches(entry.name, rule.get("exclude", []), dirname, case_sensitive):
+                continue
+            stat = entry.stat()
+            entries.append(FileEntry(entry.path, os.path.relpath(entry.path, root), stat.st_size, stat.st_mtime_ns))
+        # Reversed so folders are popped in sorted order
+        stack.extend(reversed(subdirs))
+    return entries, dirs
+
+def listing_path(root):
+    '''Listing file of root; saved in parent folder so it is not part of the walked tree'''
+    root = os.path.abspath(root)
+    return os.path.join(os.path.dirname(root), f".{os.path.basename(root)}_listing.json")
+
+def _load_listing(root, rule: dict):
+    '''
+    Returns saved entries if listing exists, was built with same rule and no folder changed since; else None
+    Every reused file is stat'ed again, so entries reflect in-place edits; a missing file invalidates the listing
+    '''
+    try:
+        with open(listing_path(root), "r", encoding="utf-8") as f:
+            listing = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return None
+    if listing.get("version") != LISTING_VERSION or listing.get("rule") != rule:
+        return None
+    for rel_dir, mtime_ns in listing["dirs"].items():
+        try:
+            if os.stat(os.path.join(root, rel_dir)).st_mtime_ns != mtime_ns:
+                return None
+        except OSError:
+            return None
+    entries = []
+    for rel_path, _, _ in listing["files"]:
+        path = os.path.join(root, rel_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entries.append(FileEntry(path, rel_path, stat.st_size, stat.st_mtime_ns))
+    return entries
+
+def _save_listing(root, rule: dict, entries, dirs):
+    path = listing_path(root)
+    listing = {
+        "version": LISTING_VERSION,
+        "rule": rule,
+        "dirs": dirs,
+        "files": [[entry.rel_path, entry.size, entry.mtime_ns] for entry in entries]
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(listing, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"❗ Failed to save file listing {path}: {e}")
+
+def discover_files(tool_name: str, root, use_cache: bool = True):
+    '''
+    Yield FileEntry of every raw PaC file of given tool within root, following DISCOVERY_RULES
+    Saved listing is reused if still valid; otherwise root is walked and listing is saved again
+    '''
+    rule = DISCOVERY_RULES[tool_name]
+    entries = _load_listing(root, rule) if use_cache else None
+    if entries is None:
+        entries, dirs = scan_files(root, rule)
+        if use_cache:
+            _save_listing(root, rule, entries, dirs)
+    yield from entries
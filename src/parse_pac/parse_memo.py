@@ -0,0 +1,192 @@
+'''
+Functions related to memoizing parsed records per raw PaC file across runs
+Records are stored on disk under a key of file content hash + parser version + parser arguments,
+so after a fetch only files whose content changed are parsed again.
+The cache is bounded in size; least recently used entries are evicted first.
+Files whose parse raises are quarantined(see parse_quarantine) instead of aborting the tool; they are never cached.
+'''
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .parse_quarantine import Quarantine, error_info
+
+# Total size limit of the parse cache
+MAX_BYTES = 256 * 1024 * 1024
+# Number of files looked up/parsed at once when parsing in parallel; bounds memory
+WINDOW = 256
+
+def memo_dir():
+    '''Parse cache directory; kept outside 'pac_raw' so integrity checks are not affected'''
+    return os.path.join(os.getcwd(), ".pac_cache", "parse")
+
+def _file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ParseMemo:
+    '''
+    Memo cache of a single parser
+    parse functions must return a JSON serializable list of record dicts(missing values are stored as null)
+    Bump parser version of the tool whenever its output changes; old entries are then never hit and evicted over time.
+    '''
+    def __init__(self, tool_name: str, parser_version, cache_dir=None, max_bytes: int = MAX_BYTES, report_dir=None):
+        self.tool_name = tool_name
+        self.parser_version = parser_version
+        self.cache_dir = os.path.join(cache_dir or memo_dir(), tool_name)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Quarantine report is saved within report_dir if given(see parse_quarantine.quarantine_dir)
+        self.quarantine = Quarantine(tool_name, parser_version, report_dir)
+
+    def _key(self, path, args) -> str:
+        payload = json.dumps([self.tool_name, self.parser_version, _file_hash(path), args], default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load(self, entry_path):
+        '''Cached records; None if not cached'''
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            # Mark as recently used for eviction
+            os.utime(entry_path)
+            self.hits += 1
+            return records
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+
+    def records(self, path, parse, *args) -> list:
+        '''
+        Returns parse(path, *args), read from cache if the same file content was parsed before
+        If parse raises, path is quarantined and an empty list is returned
+        '''
+        entry_path = self._entry_path(self._key(path, args))
+        records = self._load(entry_path)
+        if records is None:
+            try:
+                records = parse(path, *args)
+            except Exception as e:
+                self.quarantine.add(path, args, error_info(e))
+                return []
+            self.misses += 1
+            self._store(entry_path, records)
+        self.quarantine.resolve(path)
+        return records
+
+    def map(self, items, parse, workers: int = None):
+        '''
+        Yield records of each (path, args) item in order
+        If workers > 1, cache misses are parsed in a process pool; parse must be a module level function
+        '''
+        if not workers or workers < 2:
+            for path, args in items:
+                yield self.records(path, parse, *args)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = []
+            for item in items:
+                window.append(item)
+                if len(window) >= WINDOW:
+                    yield from self._map_window(window, parse, pool)
+                    window = []
+            if window:
+                yield from self._map_window(window, parse, pool)
+
+    def _map_window(self, window, parse, pool):
+        entry_paths = [self._entry_path(self._key(path, args)) for path, args in window]
+        results = [self._load(entry_path) for entry_path in entry_paths]
+        misses = [i for i, records in enumerate(results) if records is None]
+        tasks = [(parse, window[i][0], window[i][1]) for i in misses]
+        failed = set()
+        for i, (ok, result) in zip(misses, pool.map(_call, tasks, chunksize=8)):
+            if not ok:
+                self.quarantine.add(window[i][0], window[i][1], result)
+                results[i] = []
+                failed.add(i)
+                continue
+            results[i] = result
+            self.misses += 1
+            self._store(entry_paths[i], result)
+        for i, (path, _) in enumerate(window):
+            if i not in failed:
+                self.quarantine.resolve(path)
+        return results
+
+    def _store(self, entry_path, records):
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False, default=_to_json)
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"❗ Failed to cache parsed records of {entry_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def close(self):
+        '''Evict least recently used entries over the size limit, save quarantine report and report hit counts'''
+        prune_memo(os.path.dirname(self.cache_dir), self.max_bytes)
+        # Files removed upstream no longer need a retry
+        for path in [path for path in self.quarantine.entries if not os.path.exists(path)]:
+            self.quarantine.resolve(path)
+        self.quarantine.save()
+        print(f"✅ Parse cache for - '{self.tool_name}' - reused: {self.hits}, parsed: {self.misses}, quarantined: {len(self.quarantine.entries)}\n")
+
+def _call(task):
+    '''
+    Runs in worker process
+    Returns (True, records), or (False, error info) if parse raised
+    '''
+    parse, path, args = task
+    try:
+        return True, parse(path, *args)
+    except Exception as e:
+        return False, error_info(e)
+
+def _to_json(value):
+    '''Missing values(pd.NA etc.) are stored as null; anything else as str'''
+    if value is None or str(value) in ("<NA>", "nan", "NaT"):
+        return None
+    return str(value)
+
+def prune_memo(cache_dir=None, max_bytes: int = MAX_BYTES) -> int:
+    '''
+    Delete least recently used cache entries until the whole cache fits within max_bytes
+    Returns number of deleted entries
+    '''
+    cache_dir = cache_dir or memo_dir()
+    entries = []
+    total = 0
+    stack = [cache_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            continue
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            deleted += 1
+        except OSError:
+            pass
+    return deleted
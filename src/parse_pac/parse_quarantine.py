@@ -0,0 +1,88 @@
+'''
+Functions related to quarantining raw PaC files that fail to parse
+A failing file no longer aborts its tool's parse; it is recorded with a structured error and skipped.
+Failures are persisted per tool as '<pac_db_dir>/quarantine/<tool>_quarantine.json'. Failed files are never cached,
+so the next run re-parses exactly those files(all others are parse cache hits), and retry_quarantine re-parses
+only the quarantined files without a full run.
+'''
+import datetime
+import json
+import os
+import traceback
+
+# Number of traceback lines kept per failure
+TRACEBACK_LINES = 8
+
+def quarantine_dir(pac_db_dir):
+    return os.path.join(pac_db_dir, "quarantine")
+
+def _report_path(tool_name: str, report_dir):
+    return os.path.join(report_dir, f"{tool_name}_quarantine.json")
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+def error_info(e: BaseException) -> dict:
+    '''Structured, JSON serializable description of an exception'''
+    lines = traceback.format_exception(type(e), e, e.__traceback__)
+    return {
+        "error": type(e).__name__,
+        "message": str(e),
+        "traceback": "".join(lines).splitlines()[-TRACEBACK_LINES:]
+    }
+
+class Quarantine:
+    '''
+    Failure report of a single tool; entries are keyed by file path
+    Report is only persisted if report_dir(see quarantine_dir) is given; else failures are only printed
+    '''
+    def __init__(self, tool_name: str, parser_version=None, report_dir=None):
+        self.tool_name = tool_name
+        self.parser_version = parser_version
+        self.path = _report_path(tool_name, report_dir) if report_dir else None
+        self.entries = load_quarantine(tool_name, report_dir) if report_dir else {}
+        self.failed = 0
+        self.recovered = 0
+        self.changed = False
+
+    def add(self, path, args, info: dict):
+        '''Record failure of path; repeated failures keep first_seen and count attempts'''
+        previous = self.entries.get(path, {})
+        self.entries[path] = {
+            "path": path,
+            "args": list(args),
+            "parser_version": self.parser_version,
+            **info,
+            "first_seen": previous.get("first_seen", _now()),
+            "last_seen": _now(),
+            "attempts": previous.get("attempts", 0) + 1
+        }
+        self.failed += 1
+        self.changed = True
+        print(f"❗ Quarantined file of - '{self.tool_name}' - {path}: {info['error']}: {info['message']}")
+
+    def resolve(self, path):
+        '''Drop path from report after a successful parse'''
+        if self.entries.pop(path, None) is not None:
+            self.recovered += 1
+            self.changed = True
+
+    def save(self):
+        if not self.changed or self.path is None:
+            return
+        if not self.entries and not os.path.exists(self.path):
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"tool": self.tool_name, "updated": _now(), "files": list(self.entries.values())}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+def load_quarantine(tool_name: str, report_dir) -> dict:
+    '''{path: failure entry} of tool within report_dir; empty if nothing is quarantined'''
+    try:
+        with open(_report_path(tool_name, report_dir), "r", encoding="utf-8") as f:
+            return {entry["path"]: entry for entry in json.load(f)["files"]}
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return {}
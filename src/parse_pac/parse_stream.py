@@ -0,0 +1,51 @@
+'''
+Functions related to streaming parsed PaC records in batches
+Parsers yield normalized dataframe batches instead of materializing the whole corpus;
+peak memory is bounded by the batch size.
+'''
+import pandas as pd
+from .normalize import normalize_missing, apply_mappings
+
+# Default number of records per batch
+BATCH_SIZE = 500
+
+def batched(iterable, batch_size: int = BATCH_SIZE):
+    '''Yield lists of up to batch_size items'''
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def record_batches(records, finalize=None, batch_size: int = BATCH_SIZE, dedupe: bool = False, tool: str = None):
+    '''
+    Turn an iterable of record dicts into normalized dataframe batches
+    1) finalize: Optional function applied to each raw batch df(e.g. patching to common format)
+    2) dedupe: Drop duplicated rows across all batches, not only within a batch
+    3) tool: If given, raw codes are mapped through the tool's mapping tables(see normalize.apply_mappings)
+    '''
+    seen = set()
+    for batch in batched(records, batch_size):
+        df = pd.DataFrame(batch)
+        if finalize is not None:
+            df = finalize(df)
+        df = normalize_missing(df)
+        if tool is not None:
+            df = apply_mappings(df, tool)
+        if dedupe:
+            hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+            keep = []
+            for row_hash in hashes:
+                keep.append(row_hash not in seen)
+                seen.add(row_hash)
+            df = df[keep]
+        if not df.empty:
+            yield df.reset_index(drop=True)
+
+def collect(batches) -> pd.DataFrame:
+    '''Materialize batches into a single dataframe; used by the DataFrame-returning get_* functions'''
+    batches = list(batches)
+    return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
@@ -1,26 +1,179 @@
-from .get_checkov import get_checkov_pac
-from .get_kics import get_kics_pac
-from .get_terrascan import get_terrascan_pac
-from .get_trivy import get_trivy_pac
-from .get_prisma import get_prisma_pac
-
-# Dictionary used for dispatch
-TOOLS = {
-    "Checkov": get_checkov_pac,
-    "KICS": get_kics_pac,
-    "Terrascan": get_terrascan_pac,
-    "Trivy": get_trivy_pac,
-    "Prisma": get_prisma_pac
+'''
+Parser registry; each tool's parser module is only imported when the tool is first used
+Every parser declares its capabilities, used to pick the fastest execution strategy per tool:
+- stream: yields normalized df batches(iter function)
+- parallel: per file parse function can run in worker processes
+- incremental: parsed records are memoized per raw file(see parse_memo)
+- schema_version: version of the tool's output schema
+Declarations can be overridden per tool with a "parser" entry of the tool within 'version_info.json',
+and parsers of new tools can be added through the 'pac_extract.parsers' entry point group(value: dict of the same fields).
+'''
+import importlib
+import json
+import os
+from importlib.metadata import entry_points
+
+from .parse_discover import DISCOVERY_RULES, discover_files
+from .parse_memo import ParseMemo
+from .parse_quarantine import load_quarantine, quarantine_dir
+
+ENTRY_POINT_GROUP = "pac_extract.parsers"
+# Min number of raw files before parsing in worker processes pays off
+PARALLEL_MIN_FILES = 200
+MAX_WORKERS = 8
+
+# Built-in parser declarations; 'module' is imported relative to this package
+# 'parse' is the per file parse function of incremental parsers(used for retrying quarantined files)
+PARSERS = {
+    "Checkov": {
+        "module": ".get_checkov", "get": "get_checkov_pac", "iter": "iter_checkov_pac", "columns": "COLUMNS",
+        "code_examples": False, "stream": True, "parallel": False, "incremental": False, "schema_version": 1
+    },
+    "KICS": {
+        "module": ".get_kics", "get": "get_kics_pac", "iter": "iter_kics_pac", "columns": "COLUMNS", "parse": "parse_kics_records",
+        "code_examples": True, "stream": True, "parallel": True, "incremental": True, "schema_version": 1
+    },
+    "Terrascan": {
+        "module": ".get_terrascan", "get": "get_terrascan_pac", "iter": "iter_terrascan_pac", "columns": "COLUMNS", "parse": "parse_terrascan_records",
+        "code_examples": False, "stream": True, "parallel": True, "incremental": True, "schema_version": 1
+    },
+    "Trivy": {
+        "module": ".get_trivy", "get": "get_trivy_pac", "iter": "iter_trivy_pac", "columns": "COLUMNS", "parse": "parse_trivy_records",
+        "code_examples": False, "stream": True, "parallel": True, "incremental": True, "schema_version": 1
+    },
+    "Prisma": {
+        "module": ".get_prisma", "get": "get_prisma_pac", "iter": "iter_prisma_pac", "columns": "COLUMNS", "parse": "parse_policy_adoc_records",
+        "code_examples": True, "stream": True, "parallel": True, "incremental": True, "schema_version": 1
+    }
 }
 
+_registry = None
+_modules = {}
+
+def _declared_overrides():
+    '''"parser" entries of tools within 'version_info.json' of current project'''
+    try:
+        with open(os.path.join(os.getcwd(), "version_info.json"), "r", encoding="utf-8") as f:
+            tool_info = json.load(f).get("tool_info", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return {tool: info["parser"] for tool, info in tool_info.items() if isinstance(info.get("parser"), dict)}
+
+def get_registry() -> dict:
+    '''
+    Parser declarations of all tools; built-ins, then entry points, then 'version_info.json' overrides
+    Only declarations are read; no parser module is imported here
+    '''
+    global _registry
+    if _registry is None:
+        registry = {tool: dict(spec) for tool, spec in PARSERS.items()}
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                registry[ep.name] = {**registry.get(ep.name, {}), **ep.load()}
+            except Exception as e:
+                print(f"❗ Failed to load parser entry point - '{ep.name}': {e}")
+        for tool, override in _declared_overrides().items():
+            registry[tool] = {**registry.get(tool, {}), **override}
+        _registry = registry
+    return _registry
+
+def _load(name: str):
+    '''Import parser module of given tool on first use'''
+    if name not in _modules:
+        module = get_registry()[name]["module"]
+        _modules[name] = importlib.import_module(module, __package__ if module.startswith(".") else None)
+    return _modules[name]
+
+def get_capabilities(name: str) -> dict:
+    '''Declared capabilities of given tool's parser'''
+    spec = get_registry()[name]
+    return {key: spec.get(key, False) for key in ("stream", "parallel", "incremental", "code_examples")} | {"schema_version": spec.get("schema_version", 1)}
+
+def choose_strategy(name: str, root=None):
+    '''
+    Fastest execution strategy for given tool
+    Returns:
+    1) strategy: one of 'parallel', 'stream', 'eager'
+    2) workers: number of worker processes(only for 'parallel')
+    '''
+    caps = get_capabilities(name)
+    cpus = os.cpu_count() or 1
+    # Parallel parsing needs per file parse functions and enough files to amortize process startup
+    if caps["parallel"] and caps["incremental"] and cpus > 1 and root is not None and name in DISCOVERY_RULES:
+        count = sum(1 for _ in discover_files(name, root))
+        if count >= PARALLEL_MIN_FILES:
+            return "parallel", min(cpus, MAX_WORKERS)
+    if caps["stream"]:
+        return "stream", None
+    return "eager", None
+
 def get_pac_of_tool(name: str, /, *args, **kwargs):
     '''
     Directs which function to call based on given tool name.
     Assumes ALL tool names given are VALID(supported, no typos etc).
     '''
-    return TOOLS[name](*args, **kwargs)
+    return getattr(_load(name), get_registry()[name]["get"])(*args, **kwargs)
+
+def iter_pac_of_tool(name: str, /, *args, **kwargs):
+    '''
+    Streaming version of get_pac_of_tool; yields normalized df batches of given tool.
+    Execution strategy is chosen from the parser's declared capabilities(see choose_strategy).
+    If pac_db_dir is given, files that fail to parse are reported within it(see parse_quarantine).
+    Assumes ALL tool names given are VALID(supported, no typos etc).
+    '''
+    pac_db_dir = kwargs.pop("pac_db_dir", None)
+    strategy, workers = choose_strategy(name, args[0] if args else None)
+    print(f"✅ Parsing tool - '{name}' - with strategy: {strategy}" + (f"({workers} workers)" if workers else ""))
+    spec = get_registry()[name]
+    if strategy == "eager":
+        # Whole df at once; yielded as a single batch
+        return iter([get_pac_of_tool(name, *args, **kwargs)])
+    if strategy == "parallel":
+        kwargs.setdefault("workers", workers)
+    if pac_db_dir is not None and spec.get("incremental"):
+        kwargs.setdefault("report_dir", quarantine_dir(pac_db_dir))
+    return getattr(_load(name), spec["iter"])(*args, **kwargs)
+
+def retry_quarantine(name: str, pac_db_dir) -> dict:
+    '''
+    Re-parse only the quarantined files of given tool(e.g. after fixing its parser or upstream content)
+    Recovered records are stored in the parse cache, so the next run reuses them without parsing again.
+    Returns dict of: recovered, failed(number of files)
+    '''
+    report_dir = quarantine_dir(pac_db_dir)
+    entries = load_quarantine(name, report_dir)
+    spec = get_registry()[name]
+    if not entries or not spec.get("parse"):
+        return {"recovered": 0, "failed": len(entries)}
+    module = _load(name)
+    memo = ParseMemo(name, getattr(module, "PARSER_VERSION", spec.get("schema_version", 1)), report_dir=report_dir)
+    parse = getattr(module, spec["parse"])
+    for path, entry in entries.items():
+        if os.path.exists(path):
+            memo.records(path, parse, *entry.get("args", []))
+    memo.close()
+    return {"recovered": memo.quarantine.recovered, "failed": len(memo.quarantine.entries)}
+
+def get_columns(name: str, code_column: str = None):
+    '''
+    Fixed output schema of given tool
+    If code_column is given, it is appended for tools with code examples(e.g. externalized code references)
+    '''
+    columns = list(getattr(_load(name), get_registry()[name]["columns"]))
+    if code_column and get_capabilities(name)["code_examples"]:
+        columns.append(code_column)
+    return columns
+
+def get_master_columns(code_column: str = None):
+    '''Fixed output schema of MASTER; union of all tool schemas in registry order'''
+    columns = []
+    for name in get_registry():
+        columns += [col for col in get_columns(name, code_column) if col not in columns]
+    return columns
 
 '''
 if __name__ == "__main__":
+    for name in get_registry():
+        print(name, get_capabilities(name), choose_strategy(name))
     get_pac_of_tool("Prisma")
-'''
\ No newline at end of file
+'''
@@ -0,0 +1,359 @@
+'''
+Read-only JSON query API over MASTER and its search indexes
+Serves the same shared MASTER(memory-mapped, see setup_shared_master) and saved indexes as the Streamlit app, either
+alongside it(PAC_API_PORT environment variable) or on its own: 'PYTHONPATH=src python -m search_pac.search_api [port]'
+from project root.
+Endpoints(GET):
+- /api/version: MASTER version and row count
+- /api/policies: ?q=<search query>&tool=..&severity=..&provider=..&framework=..&category=..
+                 &fields=ID,Title&sort=Severity&order=desc&page=1&page_size=100
+- /api/policies/<row>: single policy(?code=1 adds code example bodies)
+- /api/policies/<row>/equivalents, /api/policies/<row>/similar
+- /api/facets: value counts of each facet column under the same filters as /api/policies
+- /api/snapshots: recorded builds(see setup_snapshot); /api/snapshots/<id or date>?tool=..: policies as of a snapshot
+- /api/snapshots/diff?old=<id or date>&new=<id or date>&tool=..: added/removed/modified policies
+Every response carries an ETag of MASTER version + request; matching If-None-Match gets '304 Not Modified'.
+Answers are cached per MASTER version, so repeated requests skip evaluation entirely.
+Snapshot answers are also keyed by the snapshot catalog, so newly recorded snapshots are never served stale.
+'''
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+import numpy as np
+
+from init_setup.setup_shared_master import read_master_pointer, map_master
+from init_setup.setup_load_master import load_master
+from init_setup.setup_save_master import read_master_version
+from init_setup.setup_code_store import CODE_REFS, load_code_examples
+from init_setup.setup_snapshot import SnapshotStore, snapshot_dir
+from .search_query import QueryError, resolve_field
+from .search_cache import QueryCache
+from .search_page import ROW_ID, get_page
+from .search_facet import FACET_COLUMNS, build_facet_index, load_facet_index, facet_positions, facet_counts
+from .search_equiv import build_equivalence, load_equivalence, build_lookup, counterparts
+from .search_similar import build_similarity_index, load_similarity_index, find_similar
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Max number of cached responses
+MAX_RESPONSES = 512
+# Seconds between checks for a rebuilt MASTER
+RELOAD_INTERVAL = 2
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class MasterStore:
+    '''
+    Loaded MASTER and its indexes; swapped as a whole once a rebuilt MASTER is published
+    Equivalence and similarity indexes are loaded on first use.
+    '''
+    def __init__(self, master_db_dir):
+        self.master_db_dir = master_db_dir
+        self.master_df_csv = os.path.join(master_db_dir, "MASTER_db.csv")
+        self.code_store_dir = os.path.join(os.path.dirname(master_db_dir), "code_store")
+        self.lock = threading.Lock()
+        self.state = None
+        self.checked = 0
+        self.queries = QueryCache()
+        self.snapshots = SnapshotStore(snapshot_dir(os.path.dirname(master_db_dir)))
+
+    def _key(self):
+        pointer = read_master_pointer(self.master_db_dir)
+        if pointer is not None:
+            return pointer["version"]
+        if os.path.exists(self.master_df_csv):
+            return (read_master_version(self.master_db_dir) or {}).get("version", str(os.path.getmtime(self.master_df_csv)))
+        return None
+
+    def get(self) -> dict:
+        '''Current state: {version, df, facets, equiv, similarity}; raises ApiError(503) if MASTER is missing'''
+        with self.lock:
+            if self.state is None or time.monotonic() - self.checked > RELOAD_INTERVAL:
+                self.checked = time.monotonic()
+                key = self._key()
+                if key is None:
+                    raise ApiError(503, "MASTER database not found; run a download first")
+                if self.state is None or self.state["version"] != key:
+                    df, _ = map_master(self.master_db_dir)
+                    if df is None:
+                        df, _ = load_master(self.master_df_csv)
+                    facets = load_facet_index(self.master_db_dir, key, len(df))
+                    self.state = {
+                        "version": key,
+                        "df": df,
+                        "facets": facets if facets is not None else build_facet_index(df),
+                        "equiv": None,
+                        "similarity": None
+                    }
+            return self.state
+
+    def equivalence(self, state):
+        with self.lock:
+            if state["equiv"] is None:
+                equiv_df = load_equivalence(self.master_db_dir, state["version"], len(state["df"]))
+                state["equiv"] = build_lookup(equiv_df if equiv_df is not None else build_equivalence(state["df"]))
+            return state["equiv"]
+
+    def similarity(self, state):
+        with self.lock:
+            if state["similarity"] is None:
+                index = load_similarity_index(self.master_db_dir, state["df"], state["version"])
+                state["similarity"] = index if index is not None else build_similarity_index(state["df"])
+            return state["similarity"]
+
+def _records(df) -> list:
+    '''JSON ready rows; missing values become null'''
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+def _first(params: dict, name: str, default=None):
+    values = params.get(name)
+    return values[0] if values else default
+
+def _int_param(params: dict, name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(_first(params, name, default))
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    return min(max(value, low), high)
+
+def _row_param(df, value) -> int:
+    try:
+        row = int(value)
+    except ValueError:
+        raise ApiError(400, "Row must be an integer")
+    if not 0 <= row < len(df):
+        raise ApiError(404, f"No policy at row {row}")
+    return row
+
+def _selections(params: dict) -> dict:
+    '''Facet filters of params({column: [values]}); values may be repeated or comma separated'''
+    selections = {}
+    for name, values in params.items():
+        column = resolve_field(name, FACET_COLUMNS)
+        if column is not None:
+            selections[column] = [value for item in values for value in item.split(",") if value]
+    return selections
+
+def _query_positions(store: MasterStore, state: dict, params: dict):
+    '''Row positions matching 'q'; None if not given'''
+    query = _first(params, "q", "")
+    if not query:
+        return None
+    try:
+        return store.queries.search(state["df"], state["version"], query)
+    except QueryError as e:
+        raise ApiError(400, f"Invalid search query: {e}")
+
+def _intersect(positions, other):
+    if other is None:
+        return positions
+    return other if positions is None else np.intersect1d(positions, other, assume_unique=True)
+
+def _paged(result, params: dict, row_ids: bool = True) -> dict:
+    '''Sorted, projected page of result based on 'fields', 'sort', 'order', 'page' and 'page_size' params'''
+    columns = [col for col in result.columns if col != CODE_REFS]
+    fields = _first(params, "fields")
+    if fields:
+        columns = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [col for col in columns if col not in result.columns]
+        if unknown:
+            raise ApiError(400, f"Unknown fields: {unknown}")
+    sort_col = _first(params, "sort")
+    if sort_col and sort_col not in result.columns:
+        raise ApiError(400, f"Unknown sort field: '{sort_col}'")
+    page_size = _int_param(params, "page_size", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+    page = _int_param(params, "page", 1, 1, sys.maxsize)
+    ascending = _first(params, "order", "asc").lower() != "desc"
+    page_df, total_pages, page = get_page(result, page, page_size, sort_col, ascending, columns)
+    if row_ids:
+        # MASTER row position of each row; used by per-policy endpoints
+        page_df = page_df.assign(**{ROW_ID: page_df.index})
+    return {
+        "total": len(result),
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "items": _records(page_df)
+    }
+
+def list_policies(store: MasterStore, state: dict, params: dict) -> dict:
+    df = state["df"]
+    positions = _intersect(facet_positions(state["facets"], _selections(params)), _query_positions(store, state, params))
+    result = df if positions is None else df.iloc[positions]
+    return {"version": state["version"], **_paged(result, params)}
+
+def get_snapshot(store: MasterStore, when: str, params: dict) -> dict:
+    '''Policies as of given snapshot id/date; ?tool= limits rows to a single tool'''
+    try:
+        snapshot_id = store.snapshots.resolve(when)
+        result = store.snapshots.as_of(snapshot_id, _first(params, "tool"))
+    except KeyError as e:
+        raise ApiError(404, str(e.args[0]))
+    return {"snapshot": snapshot_id, **_paged(result, params, row_ids=False)}
+
+def diff_snapshots(store: MasterStore, params: dict) -> dict:
+    '''Added/removed/modified policies between snapshots ?old= and ?new=(ids or dates; new defaults to latest)'''
+    snapshots = store.snapshots.list_snapshots()
+    old = _first(params, "old")
+    new = _first(params, "new") or (snapshots[-1]["id"] if snapshots else None)
+    if not old or not new:
+        raise ApiError(400, "'old' snapshot is required")
+    try:
+        old, new = store.snapshots.resolve(old), store.snapshots.resolve(new)
+        diff = store.snapshots.diff(old, new, _first(params, "tool"))
+    except KeyError as e:
+        raise ApiError(404, str(e.args[0]))
+    fields = _first(params, "fields")
+    columns = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    return {
+        "old": old,
+        "new": new,
+        **{kind: _records(df[[col for col in columns if col in df.columns]] if columns else df.drop(columns=[CODE_REFS], errors="ignore")) for kind, df in diff.items()}
+    }
+
+def get_policy(store: MasterStore, state: dict, row: int, params: dict) -> dict:
+    df = state["df"]
+    item = _records(df.iloc[[row]].drop(columns=[CODE_REFS], errors="ignore"))[0]
+    item[ROW_ID] = row
+    if _first(params, "code") == "1" and CODE_REFS in df.columns:
+        item["code_examples"] = load_code_examples(df[CODE_REFS].iloc[row], store.code_store_dir)
+    return {"version": state["version"], "item": item}
+
+def _related(state: dict, rows, scores=None) -> dict:
+    df = state["df"]
+    items = _records(df.iloc[list(rows)][["Open-source Tool", "ID", "Title", "IaC Framework"]]) if rows else []
+    for i, row in enumerate(rows):
+        items[i][ROW_ID] = int(row)
+        if scores is not None:
+            items[i]["score"] = scores[i]
+    return {"version": state["version"], "items": items}
+
+def get_facets(store: MasterStore, state: dict, params: dict) -> dict:
+    '''Counts of each facet value given the filters of all other facet columns'''
+    selections = _selections(params)
+    query_positions = _query_positions(store, state, params)
+    counts = {}
+    for col in state["facets"]:
+        base = _intersect(facet_positions(state["facets"], selections, exclude=col), query_positions)
+        col_counts = facet_counts(state["facets"], {}, col) if base is None else {
+            value: int(np.intersect1d(pos, base, assume_unique=True).size) for value, pos in state["facets"][col].items()
+        }
+        counts[col] = dict(sorted(col_counts.items(), key=lambda item: (-item[1], item[0])))
+    return {"version": state["version"], "facets": counts}
+
+def route(store: MasterStore, path: str, params: dict) -> dict:
+    '''Dispatch request path to its endpoint'''
+    parts = [part for part in path.split("/") if part]
+    if parts[:1] != ["api"]:
+        raise ApiError(404, f"Unknown endpoint: {path}")
+    state = store.get()
+    if parts == ["api", "version"]:
+        return {"version": state["version"], "rows": len(state["df"])}
+    if parts == ["api", "policies"]:
+        return list_policies(store, state, params)
+    if parts == ["api", "facets"]:
+        return get_facets(store, state, params)
+    if parts == ["api", "snapshots"]:
+        return {"snapshots": store.snapshots.list_snapshots()}
+    if parts == ["api", "snapshots", "diff"]:
+        return diff_snapshots(store, params)
+    if len(parts) == 3 and parts[1] == "snapshots":
+        return get_snapshot(store, parts[2], params)
+    if len(parts) in (3, 4) and parts[1] == "policies":
+        row = _row_param(state["df"], parts[2])
+        if len(parts) == 3:
+            return get_policy(store, state, row, params)
+        if parts[3] == "equivalents":
+            return _related(state, counterparts(store.equivalence(state), row))
+        if parts[3] == "similar":
+            similar = find_similar(store.similarity(state), row)
+            return _related(state, [other for other, _ in similar], [score for _, score in similar])
+    raise ApiError(404, f"Unknown endpoint: {path}")
+
+class ApiHandler(BaseHTTPRequestHandler):
+    '''Request handler; server holds 'store' and LRU 'responses' cache'''
+    server_version = "pac-extract-api"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        try:
+            version = self.server.store.get()["version"]
+        except ApiError as e:
+            return self._send(e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+        if [part for part in url.path.split("/") if part][:2] == ["api", "snapshots"]:
+            size, mtime = self.server.store.snapshots.catalog_stamp()
+            version = f"{version}-{size:x}.{mtime:x}"
+        # Params are sorted so equivalent requests share one cache entry/ETag
+        request_key = f"{url.path}?{urlencode(sorted((key, value) for key, values in params.items() for value in values))}"
+        etag = f'"{version}-{hashlib.sha256(request_key.encode("utf-8")).hexdigest()[:16]}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            return self._send(304, None, etag)
+        cache = self.server.responses
+        cache_key = (version, request_key)
+        with self.server.responses_lock:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                cache.move_to_end(cache_key)
+        if cached is None:
+            try:
+                status, body = 200, json.dumps(route(self.server.store, url.path, params), ensure_ascii=False).encode("utf-8")
+            except ApiError as e:
+                status, body = e.status, json.dumps({"error": str(e)}).encode("utf-8")
+            if status != 200:
+                return self._send(status, body)
+            with self.server.responses_lock:
+                cache[cache_key] = body
+                while len(cache) > MAX_RESPONSES:
+                    cache.popitem(last=False)
+            cached = body
+        self._send(200, cached, etag)
+
+    def _send(self, status: int, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def create_api_server(master_db_dir, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.store = MasterStore(master_db_dir)
+    server.responses = OrderedDict()
+    server.responses_lock = threading.Lock()
+    return server
+
+def start_api_server(master_db_dir, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    '''Serve API in a background daemon thread; used when running alongside the Streamlit app'''
+    server = create_api_server(master_db_dir, host, port)
+    threading.Thread(target=server.serve_forever, name="pac-query-api", daemon=True).start()
+    print(f"✅ Query API serving at: http://{host}:{server.server_address[1]}/api")
+    return server
+
+if __name__ == "__main__":
+    # Run from src/ within project root; MASTER is read from 'pac_database/MASTER'
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.environ.get("PAC_API_PORT", DEFAULT_PORT))
+    server = create_api_server(os.path.join(os.getcwd(), "pac_database", "MASTER"), os.environ.get("PAC_API_HOST", DEFAULT_HOST), port)
+    print(f"✅ Query API serving at: http://{server.server_address[0]}:{server.server_address[1]}/api")
+    server.serve_forever()
@@ -0,0 +1,122 @@
+'''
+Functions related to caching search query results
+Results are stored as sorted MASTER row positions in a bounded LRU cache keyed by MASTER version and parsed query.
+A query that only narrows a cached one(e.g. "s3" -> "s3 b", "tool:K" -> "tool:KICS") is evaluated over the cached rows only,
+so each keystroke costs time proportional to the current result size instead of the full MASTER.
+'''
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .search_query import parse_query, evaluate_query
+
+MAX_ENTRIES = 64
+# Max number of row positions held by the whole cache(8 bytes each)
+MAX_POSITIONS = 4_000_000
+# Ops whose match is a substring match; a longer value then matches a subset of rows
+SUBSTRING_OPS = (None, ":")
+
+def _conjuncts(tree) -> list:
+    '''AND-ed parts of predicate tree'''
+    if tree is None:
+        return []
+    return list(tree[1]) if tree[0] == "and" else [tree]
+
+def _implies(node, base) -> bool:
+    '''True if rows matching node are always a subset of rows matching base'''
+    if node == base:
+        return True
+    if node[0] != "term" or base[0] != "term":
+        return False
+    _, field, op, value = node
+    _, base_field, base_op, base_value = base
+    return (
+        op in SUBSTRING_OPS and op == base_op
+        and (field or "").lower() == (base_field or "").lower()
+        and base_value.lower() in value.lower()
+    )
+
+def refines(tree, base_tree) -> bool:
+    '''True if query tree only narrows base_tree; every part of base is implied by some part of tree'''
+    parts = _conjuncts(tree)
+    return all(any(_implies(part, base) for part in parts) for base in _conjuncts(base_tree))
+
+class QueryCache:
+    '''
+    Bounded LRU cache of {(MASTER version, repr of query tree): (query tree, sorted row positions)}
+    Trees hold lists, so their repr is used as key; the tree itself is kept for refinement checks
+    Shared by all sessions; thread safe
+    '''
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_positions: int = MAX_POSITIONS):
+        self.max_entries = max_entries
+        self.max_positions = max_positions
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.refined = 0
+        self.misses = 0
+
+    def _base(self, version, tree):
+        '''Smallest cached result of a query that tree refines; None if there is none'''
+        best = None
+        for (entry_version, _), (entry_tree, positions) in self.entries.items():
+            if entry_version == version and refines(tree, entry_tree):
+                if best is None or len(positions) < len(best):
+                    best = positions
+        return best
+
+    def _put(self, key, tree, positions):
+        self.entries[key] = (tree, positions)
+        self.size += len(positions)
+        while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_positions):
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def search(self, df: pd.DataFrame, version, query: str):
+        '''
+        Sorted row positions of df matching query; None for an empty query(= all rows)
+        df must be the MASTER of given version; positions refer to df rows
+        '''
+        tree = parse_query(query)
+        if tree is None:
+            return None
+        key = (version, repr(tree))
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][1]
+            # Drop results of older MASTER versions
+            for old_key in [k for k in self.entries if k[0] != version]:
+                self.size -= len(self.entries.pop(old_key)[1])
+            base = self._base(version, tree)
+        if base is None:
+            positions = np.flatnonzero(evaluate_query(df, tree))
+        else:
+            positions = base[evaluate_query(df.iloc[base], tree)]
+        with self.lock:
+            if base is None:
+                self.misses += 1
+            else:
+                self.refined += 1
+            self._put(key, tree, positions)
+        return positions
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "positions": self.size, "hits": self.hits, "refined": self.refined, "misses": self.misses}
+
+'''
+# Use for unit testing
+if __name__ == "__main__":
+    import time
+    df = pd.DataFrame({"Title": pd.array([f"s3 bucket {i}" if i % 7 else f"gcs {i}" for i in range(500_000)], dtype="string")})
+    cache = QueryCache()
+    for query in ["s", "s3", "s3 b", "s3 bucket 1", "s3 bucket 12"]:
+        start = time.perf_counter()
+        positions = cache.search(df, "v1", query)
+        print(f"{query!r}: {len(positions)} rows in {time.perf_counter() - start:.4f}s")
+    print(cache.stats())
+'''
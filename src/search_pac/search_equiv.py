@@ -0,0 +1,105 @@
+'''
+Functions related to cross-tool policy equivalence mapping
+Rows of different tools that reference each other's IDs(e.g. Prisma 'CheckovID' -> Checkov 'ID') are joined
+on normalized IDs and grouped. Index is built when MASTER is written and stored as 'MASTER_equiv.json'.
+'''
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Declarative links between tools: (source tool, source column, target tool, target column)
+LINK_RULES = [
+    ("Prisma", "CheckovID", "Checkov", "ID"),
+]
+EQUIV_FILE = "MASTER_equiv.json"
+
+def normalize_id(series: pd.Series) -> pd.Series:
+    '''Normalize IDs for joining: strip, remove inner whitespace, uppercase'''
+    return series.astype("string").str.replace(r"\s+", "", regex=True).str.upper().replace("", pd.NA)
+
+def _link_pairs(df: pd.DataFrame, src_tool, src_col, tgt_tool, tgt_col) -> pd.DataFrame:
+    '''Hash join of source/target rows of a single link rule; returns df of (src_row, tgt_row, key)'''
+    tools = df["Open-source Tool"].astype("string").fillna("").to_numpy()
+    src_mask = tools == src_tool
+    tgt_mask = tools == tgt_tool
+    src = pd.DataFrame({
+        "src_row": np.flatnonzero(src_mask),
+        "key": normalize_id(df[src_col]).to_numpy()[src_mask]
+    }).dropna()
+    tgt = pd.DataFrame({
+        "tgt_row": np.flatnonzero(tgt_mask),
+        "key": normalize_id(df[tgt_col]).to_numpy()[tgt_mask]
+    }).dropna()
+    return src.merge(tgt, on="key", how="inner")
+
+def build_equivalence(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Build cross-tool equivalence table of df(MASTER)
+    Rows linked directly or transitively share the same group; group is named after its smallest join key.
+    Returns df with columns: Group, Row(MASTER row position), Open-source Tool, ID
+    '''
+    pairs = [
+        _link_pairs(df, *rule) for rule in LINK_RULES
+        if "Open-source Tool" in df.columns and rule[1] in df.columns and rule[3] in df.columns
+    ]
+    pairs = pd.concat(pairs, ignore_index=True) if pairs else pd.DataFrame(columns=["src_row", "tgt_row", "key"])
+    # Union-find over linked rows
+    parent = {}
+    def find(row):
+        parent.setdefault(row, row)
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+    for src_row, tgt_row in zip(pairs["src_row"], pairs["tgt_row"]):
+        parent[find(src_row)] = find(tgt_row)
+    group_name = {}
+    for key, row in zip(pairs["key"], pairs["src_row"]):
+        root = find(row)
+        group_name[root] = min(group_name.get(root, key), key)
+    rows = sorted(parent)
+    return pd.DataFrame({
+        "Group": [group_name[find(row)] for row in rows],
+        "Row": rows,
+        "Open-source Tool": df["Open-source Tool"].astype("string").to_numpy()[rows] if rows else [],
+        "ID": df["ID"].astype("string").to_numpy()[rows] if rows else []
+    })
+
+def build_lookup(equiv_df: pd.DataFrame) -> dict:
+    '''
+    Build constant-time lookup tables of equivalence table
+    Returns {"row_to_group": {row: group}, "group_to_rows": {group: [rows]}}
+    '''
+    row_to_group = dict(zip(equiv_df["Row"].astype(int), equiv_df["Group"]))
+    group_to_rows = {group: rows.astype(int).tolist() for group, rows in equiv_df.groupby("Group")["Row"]}
+    return {"row_to_group": row_to_group, "group_to_rows": group_to_rows}
+
+def counterparts(lookup: dict, row: int):
+    '''Get MASTER row positions equivalent to given row, excluding itself'''
+    if row is None or pd.isna(row):
+        return []
+    group = lookup["row_to_group"].get(int(row))
+    if group is None:
+        return []
+    return [other for other in lookup["group_to_rows"][group] if other != int(row)]
+
+def save_equivalence(master_db_dir, df: pd.DataFrame, version: str) -> pd.DataFrame:
+    '''Build equivalence table of MASTER and save it alongside MASTER database files'''
+    equiv_df = build_equivalence(df)
+    os.makedirs(master_db_dir, exist_ok=True)
+    with open(os.path.join(master_db_dir, EQUIV_FILE), "w", encoding="utf-8") as f:
+        json.dump({"version": version, "rows": len(df), "table": equiv_df.astype(object).where(equiv_df.notna(), None).to_dict(orient="list")}, f)
+    return equiv_df
+
+def load_equivalence(master_db_dir, version: str, rows: int):
+    '''Load saved equivalence table; returns None if missing or not built from given MASTER version/row count'''
+    try:
+        with open(os.path.join(master_db_dir, EQUIV_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if data.get("version") != version or data.get("rows") != rows:
+        return None
+    return pd.DataFrame(data["table"])
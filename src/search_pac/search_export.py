@@ -0,0 +1,43 @@
+'''
+Functions related to exporting search results as downloadable files
+Exports are built only when requested and cached by a key of search/filter state and MASTER version.
+'''
+import hashlib
+import io
+import json
+
+import pandas as pd
+
+def to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode('utf-8')
+
+def to_excel(df: pd.DataFrame) -> bytes:
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='FilteredData')
+    return output.getvalue()
+
+def to_parquet(df: pd.DataFrame) -> bytes:
+    output = io.BytesIO()
+    df.to_parquet(output, index=False)
+    return output.getvalue()
+
+def to_ndjson(df: pd.DataFrame) -> bytes:
+    return df.to_json(orient="records", lines=True, force_ascii=False).encode('utf-8')
+
+# Supported export formats: {file type: (label, mime type, converter)}
+EXPORT_FORMATS = {
+    "csv": ("CSV", "text/csv", to_csv),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", to_excel),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", to_parquet),
+    "ndjson": ("NDJSON", "application/x-ndjson", to_ndjson)
+}
+
+def export_key(master_version, search_term, state: dict) -> str:
+    '''Cache key of an export; state holds every setting that changes exported rows/columns'''
+    payload = json.dumps({"version": master_version, "search": search_term, "state": state}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def export_bytes(df: pd.DataFrame, file_type: str) -> bytes:
+    '''Convert df into bytes of given export format'''
+    return EXPORT_FORMATS[file_type][2](df)
@@ -0,0 +1,80 @@
+'''
+Functions related to precomputed facet indexes of MASTER
+Each facet value maps to a sorted array of MASTER row positions; combining filters intersects those arrays.
+Index is built when MASTER is written and stored as 'MASTER_facets.json'.
+'''
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from parse_pac.normalize import CATEGORY_COLUMNS
+
+FACET_COLUMNS = CATEGORY_COLUMNS
+FACET_FILE = "MASTER_facets.json"
+_EMPTY = np.array([], dtype=np.int64)
+
+def build_facet_index(df: pd.DataFrame) -> dict:
+    '''
+    Build {column: {value: sorted row positions}} for all FACET_COLUMNS of df
+    Missing values are not indexed.
+    '''
+    facets = {}
+    positions = pd.RangeIndex(len(df))
+    for col in FACET_COLUMNS:
+        if col not in df.columns:
+            continue
+        groups = pd.Series(positions, index=df.index).groupby(df[col].astype(object).to_numpy(), dropna=True).indices
+        facets[col] = {str(value): np.asarray(pos, dtype=np.int64) for value, pos in groups.items()}
+    return facets
+
+def save_facet_index(master_db_dir, df: pd.DataFrame, version: str) -> dict:
+    '''Build facet index of MASTER and save it alongside MASTER database files'''
+    facets = build_facet_index(df)
+    os.makedirs(master_db_dir, exist_ok=True)
+    with open(os.path.join(master_db_dir, FACET_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": version,
+            "rows": len(df),
+            "facets": {col: {value: pos.tolist() for value, pos in values.items()} for col, values in facets.items()}
+        }, f)
+    return facets
+
+def load_facet_index(master_db_dir, version: str, rows: int):
+    '''
+    Load saved facet index; returns None if missing or not built from given MASTER version/row count
+    '''
+    try:
+        with open(os.path.join(master_db_dir, FACET_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if data.get("version") != version or data.get("rows") != rows:
+        return None
+    return {col: {value: np.asarray(pos, dtype=np.int64) for value, pos in values.items()} for col, values in data["facets"].items()}
+
+def facet_positions(facets: dict, selections: dict, exclude=None):
+    '''
+    Get sorted row positions matching all selections({column: [values]})
+    Values within a column are OR-ed, columns are AND-ed.
+    Returns None if nothing is selected(= all rows)
+    '''
+    result = None
+    for col, values in selections.items():
+        if not values or col == exclude or col not in facets:
+            continue
+        matched = np.unique(np.concatenate([facets[col].get(str(value), _EMPTY) for value in values]))
+        result = matched if result is None else np.intersect1d(result, matched, assume_unique=True)
+    return result
+
+def facet_counts(facets: dict, selections: dict, col: str) -> dict:
+    '''
+    Live counts of each value of col given the selections of all other columns
+    Returns {value: row count}
+    '''
+    base = facet_positions(facets, selections, exclude=col)
+    counts = {}
+    for value, pos in facets.get(col, {}).items():
+        counts[value] = len(pos) if base is None else np.intersect1d(pos, base, assume_unique=True).size
+    return counts
@@ -0,0 +1,53 @@
+'''
+Functions related to server-side paging of search results
+Sorting, filtering and slicing run on the backend so only the current page is sent to the browser.
+'''
+import math
+
+import numpy as np
+import pandas as pd
+
+from .search_text import text_mask
+
+# Hidden grid column holding MASTER row position of each row
+ROW_ID = "_row"
+
+def filter_column(df: pd.DataFrame, column, value) -> pd.DataFrame:
+    '''Case-insensitive substring filter on a single column'''
+    if not column or not value or column not in df.columns:
+        return df
+    return df[text_mask(df[[column]], value)]
+
+def sort_positions(df: pd.DataFrame, sort_col=None, ascending=True) -> np.ndarray:
+    '''
+    Get row positions of df in sorted order; missing values are always placed last
+    Ordered categoricals(e.g. Severity) sort by category order instead of alphabetically.
+    '''
+    if not sort_col or sort_col not in df.columns:
+        return np.arange(len(df))
+    ordered = df[sort_col].reset_index(drop=True).sort_values(ascending=ascending, na_position="last", kind="stable")
+    return ordered.index.to_numpy()
+
+def get_page(df: pd.DataFrame, page: int, page_size: int, sort_col=None, ascending=True, columns=None):
+    '''
+    Get a single page of df
+    Returns:
+    1) page_df: Rows of requested page, projected to given columns
+    2) total_pages: Total number of pages(at least 1)
+    3) page: Requested page clamped into [1, total_pages]
+    '''
+    total_pages = max(1, math.ceil(len(df) / page_size))
+    page = min(max(1, int(page)), total_pages)
+    start = (page - 1) * page_size
+    positions = sort_positions(df, sort_col, ascending)[start:start + page_size]
+    page_df = df.iloc[positions]
+    if columns:
+        page_df = page_df[[col for col in columns if col in page_df.columns]]
+    return page_df, total_pages, page
+
+def get_sorted(df: pd.DataFrame, sort_col=None, ascending=True, columns=None) -> pd.DataFrame:
+    '''Get full result in the same order/projection as its pages; used for exports'''
+    result = df.iloc[sort_positions(df, sort_col, ascending)]
+    if columns:
+        result = result[[col for col in columns if col in result.columns]]
+    return result
@@ -0,0 +1,206 @@
+'''
+Functions related to the structured search query language of MASTER
+Example: tool:KICS severity>=High provider:AWS "s3 bucket" -deprecated
+- word / "quoted phrase": case-insensitive substring match across all columns
+- field:value: substring match within a single column, field=value: exact(case-insensitive) match
+- field>=value, >, <=, <: range comparison on ordered columns(e.g. Severity: Info < Low < Medium < High < Critical)
+- -term: negation; terms are AND-ed, 'OR' and parentheses group terms
+Queries are parsed into a predicate tree; every leaf is evaluated as a vectorized column operation and
+leaves are combined as boolean numpy arrays, so no per-row Python code runs.
+'''
+import re
+
+import numpy as np
+import pandas as pd
+
+from parse_pac.normalize import SEVERITY_ORDER
+from .search_text import text_mask
+
+# Short field names; any column name(case and non-alphanumerics ignored) can be used as well
+FIELD_ALIASES = {
+    "tool": "Open-source Tool",
+    "sev": "Severity",
+    "framework": "IaC Framework",
+    "iac": "IaC Framework",
+    "desc": "Description",
+    "doc": "Query Document",
+    "checkov": "CheckovID"
+}
+# Value order of columns used for range comparisons; values outside of the order never match a range
+ORDERED_FIELDS = {"Severity": SEVERITY_ORDER}
+RANGE_OPS = (">=", "<=", ">", "<")
+
+TOKEN_PTN = re.compile(r'''\s*(?:
+    (?P<neg_open>-)?(?P<open>\()
+  | (?P<close>\))
+  | (?P<neg>-)?(?:(?P<field>[A-Za-z][\w-]*)(?P<op>>=|<=|:|=|>|<))?(?P<value>"[^"]*"?|[^\s()"]+)
+)''', re.X)
+
+class QueryError(ValueError):
+    '''Raised for queries that cannot be parsed or evaluated'''
+
+def _field_key(name: str) -> str:
+    return re.sub(r"[^0-9a-z]", "", name.lower())
+
+def resolve_field(field: str, columns):
+    '''Get column of df for given query field; None if unknown'''
+    by_key = {_field_key(col): col for col in columns}
+    column = FIELD_ALIASES.get(field.lower())
+    if column in columns:
+        return column
+    return by_key.get(_field_key(field))
+
+def tokenize_query(query: str) -> list:
+    '''
+    Split query into tokens
+    Returns list of: ("(", negated), (")",), ("or",), ("term", negated, field, op, value)
+    '''
+    tokens = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        m = TOKEN_PTN.match(query, pos)
+        if m is None or m.end() == pos:
+            raise QueryError(f"Invalid query near: '{query[pos:]}'")
+        pos = m.end()
+        if m.group("open"):
+            tokens.append(("(", bool(m.group("neg_open"))))
+        elif m.group("close"):
+            tokens.append((")",))
+        else:
+            value = m.group("value")
+            quoted = value.startswith('"')
+            if quoted:
+                value = value.strip('"')
+            if value == "OR" and not quoted and not m.group("field") and not m.group("neg"):
+                tokens.append(("or",))
+            elif value:
+                tokens.append(("term", bool(m.group("neg")), m.group("field"), m.group("op"), value))
+    return tokens
+
+def parse_query(query: str):
+    '''
+    Parse query into a predicate tree of nodes:
+    ("and", [nodes]), ("or", [nodes]), ("not", node), ("term", field, op, value)
+    Returns None for an empty query(= all rows)
+    Unclosed parentheses are closed at the end, so partially typed queries still parse.
+    '''
+    tokens = tokenize_query(query)
+    pos = 0
+
+    def parse_or():
+        nonlocal pos
+        nodes = [parse_and()]
+        while pos < len(tokens) and tokens[pos][0] == "or":
+            pos += 1
+            nodes.append(parse_and())
+        nodes = [node for node in nodes if node is not None]
+        if not nodes:
+            return None
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and():
+        nonlocal pos
+        nodes = []
+        while pos < len(tokens) and tokens[pos][0] not in ("or", ")"):
+            token = tokens[pos]
+            pos += 1
+            if token[0] == "(":
+                node = parse_or()
+                if pos < len(tokens) and tokens[pos][0] == ")":
+                    pos += 1
+                if node is None:
+                    continue
+                nodes.append(("not", node) if token[1] else node)
+            else:
+                _, negated, field, op, value = token
+                node = ("term", field, op, value)
+                nodes.append(("not", node) if negated else node)
+        if not nodes:
+            return None
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    tree = parse_or()
+    if pos < len(tokens):
+        raise QueryError("Unbalanced ')' in query")
+    return tree
+
+def _value_order(series: pd.Series, column: str) -> list:
+    '''Value order used for range comparisons of column'''
+    if column in ORDERED_FIELDS:
+        return list(ORDERED_FIELDS[column])
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.cat.ordered:
+        return [str(cat) for cat in series.cat.categories]
+    raise QueryError(f"Range comparison is not supported for column '{column}'")
+
+def _ranks(series: pd.Series, order: list) -> np.ndarray:
+    '''
+    Position of each value within order(case-insensitive)
+    Missing values and values outside of order(e.g. Severity 'Trace', 'UNKNOWN') get -1
+    '''
+    rank = {str(value).lower(): pos for pos, value in enumerate(order)}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Rank once per category; code -1(missing) picks the trailing -1
+        category_ranks = np.array([rank.get(str(cat).lower(), -1) for cat in series.cat.categories] + [-1], dtype=np.int64)
+        return category_ranks[series.cat.codes.to_numpy()]
+    return series.astype("string").str.lower().map(rank).fillna(-1).to_numpy(dtype=np.int64)
+
+def _category_hits(series: pd.Series, match) -> np.ndarray:
+    '''Evaluate match once per category, then broadcast to rows through category codes'''
+    hits = np.flatnonzero(match(series.cat.categories.astype(str).str.lower()))
+    return np.isin(series.cat.codes.to_numpy(), hits)
+
+def _term_mask(df: pd.DataFrame, field, op, value: str) -> np.ndarray:
+    column = resolve_field(field, df.columns) if field else None
+    if column is None:
+        # Free text; unknown fields(e.g. 'https://...') are matched as plain text
+        return text_mask(df, f"{field}{op}{value}" if field else value)
+    series = df[column]
+    lowered = value.lower()
+    if op in RANGE_OPS:
+        order = _value_order(series, column)
+        lowered_order = [str(item).lower() for item in order]
+        if lowered not in lowered_order:
+            raise QueryError(f"Unknown value '{value}' for '{column}'; expected one of: {order}")
+        ranks = _ranks(series, order)
+        bound = lowered_order.index(lowered)
+        compare = {">=": np.greater_equal, "<=": np.less_equal, ">": np.greater, "<": np.less}[op]
+        return compare(ranks, bound) & (ranks != -1)
+    if op == "=":
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return _category_hits(series, lambda cats: cats == lowered)
+        return (series.astype("string").str.lower() == lowered).fillna(False).to_numpy(dtype=bool)
+    return text_mask(df[[column]], value)
+
+def evaluate_query(df: pd.DataFrame, tree) -> np.ndarray:
+    '''
+    Evaluate predicate tree over df
+    Returns boolean numpy array aligned with df rows
+    '''
+    if tree is None:
+        return np.ones(len(df), dtype=bool)
+    kind = tree[0]
+    if kind == "term":
+        return _term_mask(df, *tree[1:])
+    if kind == "not":
+        return ~evaluate_query(df, tree[1])
+    masks = [evaluate_query(df, node) for node in tree[1]]
+    return np.logical_and.reduce(masks) if kind == "and" else np.logical_or.reduce(masks)
+
+def query_mask(df: pd.DataFrame, query: str) -> np.ndarray:
+    '''Parse and evaluate query over df in one call'''
+    return evaluate_query(df, parse_query(query))
+
+'''
+# Use for unit testing
+if __name__ == "__main__":
+    df = pd.DataFrame({
+        "Open-source Tool": pd.Categorical(["KICS", "Trivy", "KICS"]),
+        "Severity": pd.Categorical(["High", "Low", "Critical"], categories=SEVERITY_ORDER),
+        "Provider": pd.Categorical(["AWS", "AWS", "GCP"]),
+        "Title": pd.array(["S3 Bucket Public", "Deprecated S3 bucket", "GCS bucket"], dtype="string")
+    })
+    print(parse_query('tool:KICS severity>=High provider:AWS "s3 bucket" -deprecated'))
+    print(query_mask(df, 'tool:KICS severity>=High provider:AWS "s3 bucket" -deprecated'))  # [True, False, False]
+    print(query_mask(df, "(provider=gcp OR sev<medium) -tool:trivy"))  # [False, False, True]
+'''
@@ -0,0 +1,181 @@
+'''
+Functions related to near-duplicate policy detection across tools
+Normalized Title/Description text is shingled, summarized into MinHash signatures and bucketed with
+locality-sensitive hashing(LSH) so only rows sharing a bucket are compared, instead of every pair.
+Signatures are built when MASTER is written and stored as 'MASTER_minhash.npz'.
+'''
+import os
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Text columns used for similarity
+TEXT_COLUMNS = ["Title", "Description"]
+# Character shingle length
+SHINGLE_SIZE = 5
+# MinHash/LSH parameters; BANDS * BAND_ROWS must equal NUM_PERM
+# Candidate threshold is roughly (1 / BANDS) ** (1 / BAND_ROWS) ~ 0.5
+NUM_PERM = 64
+BANDS = 16
+BAND_ROWS = 4
+# Largest prime below 2^32; keeps signatures in uint32
+_PRIME = np.uint64(4294967291)
+_rng = np.random.default_rng(20250916)
+_A = _rng.integers(1, 2**31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**31, size=NUM_PERM, dtype=np.uint64)
+_EMPTY = np.uint32(np.iinfo(np.uint32).max)
+# Buckets larger than this are skipped for cluster reports(e.g. boilerplate titles)
+MAX_BUCKET = 200
+MINHASH_FILE = "MASTER_minhash.npz"
+
+def normalize_text(text) -> str:
+    '''Lowercase, keep only alphanumerics, collapse whitespace'''
+    if text is None or pd.isna(text):
+        return ""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(text).lower()).split())
+
+def shingles(text: str) -> np.ndarray:
+    '''Hash all character shingles of text into unique uint64 values'''
+    if len(text) < SHINGLE_SIZE:
+        grams = {text} if text else set()
+    else:
+        grams = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    '''MinHash signature(NUM_PERM,) of a single shingle set'''
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _EMPTY, dtype=np.uint32)
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+def build_signatures(df: pd.DataFrame) -> np.ndarray:
+    '''Build MinHash signatures(rows x NUM_PERM) over normalized TEXT_COLUMNS of df'''
+    cols = [col for col in TEXT_COLUMNS if col in df.columns]
+    texts = df[cols].astype("string").fillna("").agg(" ".join, axis=1) if cols else pd.Series([""] * len(df))
+    signatures = np.empty((len(df), NUM_PERM), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        signatures[i] = minhash(shingles(normalize_text(text)))
+    return signatures
+
+def build_buckets(signatures: np.ndarray) -> dict:
+    '''LSH buckets: {(band, band signature bytes): [rows]}; rows without text are not bucketed'''
+    buckets = defaultdict(list)
+    has_text = signatures[:, 0] != _EMPTY
+    for band in range(BANDS):
+        band_sig = np.ascontiguousarray(signatures[:, band * BAND_ROWS:(band + 1) * BAND_ROWS])
+        for row in np.flatnonzero(has_text):
+            buckets[(band, band_sig[row].tobytes())].append(int(row))
+    return dict(buckets)
+
+def build_similarity_index(df: pd.DataFrame) -> dict:
+    '''Build full similarity index of df(MASTER)'''
+    signatures = build_signatures(df)
+    return {
+        "signatures": signatures,
+        "buckets": build_buckets(signatures),
+        "tools": df["Open-source Tool"].astype("string").fillna("").to_numpy()
+    }
+
+def save_similarity_index(master_db_dir, df: pd.DataFrame, version: str) -> dict:
+    '''Build similarity index of MASTER and save its signatures alongside MASTER database files'''
+    index = build_similarity_index(df)
+    os.makedirs(master_db_dir, exist_ok=True)
+    np.savez_compressed(
+        os.path.join(master_db_dir, MINHASH_FILE),
+        signatures=index["signatures"],
+        version=np.array(version),
+        rows=np.array(len(df))
+    )
+    return index
+
+def load_similarity_index(master_db_dir, df: pd.DataFrame, version: str):
+    '''Load saved signatures and rebuild buckets; returns None if missing or not built from given MASTER version'''
+    try:
+        data = np.load(os.path.join(master_db_dir, MINHASH_FILE))
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+    if str(data["version"]) != str(version) or int(data["rows"]) != len(df):
+        return None
+    signatures = data["signatures"]
+    return {
+        "signatures": signatures,
+        "buckets": build_buckets(signatures),
+        "tools": df["Open-source Tool"].astype("string").fillna("").to_numpy()
+    }
+
+def _candidates(index: dict, row: int) -> set:
+    '''All rows sharing at least one LSH bucket with given row'''
+    signature = index["signatures"][row]
+    found = set()
+    for band in range(BANDS):
+        found.update(index["buckets"].get((band, signature[band * BAND_ROWS:(band + 1) * BAND_ROWS].tobytes()), ()))
+    found.discard(row)
+    return found
+
+def find_similar(index: dict, row: int, threshold: float = 0.5, limit: int = 10):
+    '''
+    Find policies of other tools similar to given MASTER row
+    Returns list of (row, estimated Jaccard similarity), most similar first
+    '''
+    if row is None or pd.isna(row):
+        return []
+    row = int(row)
+    signatures = index["signatures"]
+    tools = index["tools"]
+    others = [other for other in _candidates(index, row) if tools[other] != tools[row]]
+    if not others:
+        return []
+    scores = (signatures[others] == signatures[row]).mean(axis=1)
+    result = [(other, float(score)) for other, score in zip(others, scores) if score >= threshold]
+    return sorted(result, key=lambda item: -item[1])[:limit]
+
+def similarity_clusters(df: pd.DataFrame, index: dict, threshold: float = 0.7) -> pd.DataFrame:
+    '''
+    Group cross-tool near-duplicates whose estimated similarity is at least threshold
+    Only rows sharing an LSH bucket are compared, so cost grows near-linearly with rule count.
+    Returns df with columns: Cluster, Row, Open-source Tool, ID, Title
+    '''
+    signatures = index["signatures"]
+    tools = index["tools"]
+    parent = {}
+    def find(row):
+        parent.setdefault(row, row)
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+    checked = set()
+    for rows in index["buckets"].values():
+        if len(rows) < 2 or len(rows) > MAX_BUCKET:
+            continue
+        for i, left in enumerate(rows):
+            for right in rows[i + 1:]:
+                if tools[left] == tools[right] or (left, right) in checked:
+                    continue
+                checked.add((left, right))
+                if (signatures[left] == signatures[right]).mean() >= threshold:
+                    parent[find(left)] = find(right)
+    clusters = defaultdict(list)
+    for row in parent:
+        clusters[find(row)].append(row)
+    records = []
+    for num, rows in enumerate(sorted(clusters.values(), key=lambda rows: (-len(rows), min(rows))), start=1):
+        for row in sorted(rows):
+            records.append({
+                "Cluster": num,
+                "Row": row,
+                "Open-source Tool": tools[row],
+                "ID": df["ID"].iat[row],
+                "Title": df["Title"].iat[row]
+            })
+    return pd.DataFrame(records, columns=["Cluster", "Row", "Open-source Tool", "ID", "Title"])
+
+def save_similarity_report(master_db_dir, df: pd.DataFrame, index: dict, threshold: float = 0.7) -> str:
+    '''Write cluster report of near-duplicate policies as 'MASTER_similar.csv'; returns its path'''
+    report_path = os.path.join(master_db_dir, "MASTER_similar.csv")
+    similarity_clusters(df, index, threshold).to_csv(report_path, index=False)
+    return report_path
@@ -0,0 +1,21 @@
+'''
+Functions related to free-text search over the MASTER dataframe
+'''
+import numpy as np
+import pandas as pd
+
+def text_mask(df: pd.DataFrame, term: str) -> np.ndarray:
+    '''
+    Case-insensitive substring match of term across all columns, evaluated column by column
+    Categorical columns are matched once per category instead of once per row.
+    Returns boolean numpy array aligned with df rows
+    '''
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            hits = series.cat.categories.astype(str).str.contains(term, case=False, regex=False)
+            mask |= np.isin(series.cat.codes.to_numpy(), np.flatnonzero(hits))
+        else:
+            mask |= series.astype("string").str.contains(term, case=False, regex=False, na=False).to_numpy(dtype=bool)
+    return mask
@@ -0,0 +1,26 @@
+'''
+Shared pytest setup; modules import each other with 'src' as root(same as running 'streamlit run src/app.py')
+'''
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", default=False, help="Also run wall-clock benchmark tests")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock timing test; skipped unless --benchmark is given")
+
+def pytest_collection_modifyitems(config, items):
+    '''Timing depends on the runner, so benchmarks only run on request'''
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,28 @@
+'''
+Tests of parse_pac.normalize
+'''
+import pandas as pd
+
+from parse_pac.normalize import SEVERITY_ORDER, apply_mappings, compact_frame
+
+def test_unknown_severity_is_kept_without_rank():
+    df = compact_frame(pd.DataFrame({"Severity": ["High", "Trace", "UNKNOWN", None]}))
+    dtype = df["Severity"].dtype
+    assert isinstance(dtype, pd.CategoricalDtype)
+    # Values outside SEVERITY_ORDER are kept, but never ranked above(or below) known severities
+    assert not dtype.ordered
+    assert list(dtype.categories[:len(SEVERITY_ORDER)]) == SEVERITY_ORDER
+    assert df["Severity"].astype(object).tolist()[:3] == ["High", "Trace", "UNKNOWN"]
+    assert df["Severity"].isna().tolist() == [False, False, False, True]
+
+def test_severity_table_only_maps_tools_that_need_it():
+    raw = pd.DataFrame({"Severity": ["HIGH", "Trace"]})
+    assert apply_mappings(raw, "Trivy")["Severity"].tolist() == ["High", "Trace"]
+    # KICS and Checkov severities are emitted as-is
+    assert apply_mappings(raw, "KICS")["Severity"].tolist() == ["HIGH", "Trace"]
+
+def test_framework_spellings_are_unified_across_tools():
+    checkov = apply_mappings(pd.DataFrame({"IaC Framework": ["terraform", "arm", "github_actions"]}), "Checkov")
+    kics = apply_mappings(pd.DataFrame({"IaC Framework": ["Terraform", "AzureResourceManager", "ServerlessFW"]}), "KICS")
+    assert checkov["IaC Framework"].tolist() == ["Terraform", "Azure Resource Manager", "GitHub Actions"]
+    assert kics["IaC Framework"].tolist() == ["Terraform", "Azure Resource Manager", "Serverless Framework"]
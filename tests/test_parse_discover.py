@@ -0,0 +1,43 @@
+'''
+Tests of parse_pac.parse_discover
+'''
+import os
+
+from parse_pac.parse_discover import discover_files, listing_path
+
+def _tree(tmp_path):
+    root = tmp_path / "checks"
+    (root / "aws").mkdir(parents=True)
+    (root / "aws" / "a.rego").write_text("package a\n")
+    (root / "aws" / "a_test.rego").write_text("package a_test\n")
+    (root / "b.rego").write_text("package b\n")
+    return root
+
+def test_listing_is_saved_and_reused(tmp_path):
+    root = _tree(tmp_path)
+    first = list(discover_files("Trivy", root))
+    assert [entry.rel_path for entry in first] == ["b.rego", os.path.join("aws", "a.rego")]
+    assert os.path.exists(listing_path(root))
+    assert list(discover_files("Trivy", root)) == first
+
+def test_in_place_edit_is_seen_through_saved_listing(tmp_path):
+    root = _tree(tmp_path)
+    list(discover_files("Trivy", root))
+    folder = root / "aws"
+    folder_stat = os.stat(folder)
+    target = folder / "a.rego"
+    target.write_text("package a\n\ndeny { true }\n")
+    os.utime(target, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns + 10**9))
+    # In-place edits(or editors preserving folder mtimes) leave directory mtimes unchanged
+    os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+    entry = next(entry for entry in discover_files("Trivy", root) if entry.rel_path.endswith("a.rego"))
+    stat = os.stat(target)
+    assert (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+def test_removed_file_invalidates_listing(tmp_path):
+    root = _tree(tmp_path)
+    list(discover_files("Trivy", root))
+    folder_stat = os.stat(root / "aws")
+    (root / "aws" / "a.rego").unlink()
+    os.utime(root / "aws", ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+    assert [entry.rel_path for entry in discover_files("Trivy", root)] == ["b.rego"]
@@ -0,0 +1,40 @@
+'''
+Tests of parse_pac.parse_quarantine and its use by the parse cache
+'''
+import json
+import os
+
+from parse_pac.get_terrascan import iter_terrascan_records
+from parse_pac.parse_quarantine import load_quarantine, quarantine_dir
+from parse_pac.parse_tool import retry_quarantine
+
+def _policies(tmp_path):
+    root = tmp_path / "pac_raw" / "Terrascan" / "rego" / "aws"
+    root.mkdir(parents=True)
+    (root / "good.json").write_text(json.dumps({"id": "AC_AWS_1", "severity": "HIGH"}))
+    (root / "bad.json").write_text("{not json")
+    return root.parent
+
+def test_failed_file_is_quarantined_within_pac_db_dir(tmp_path, monkeypatch):
+    rego = _policies(tmp_path)
+    pac_db_dir = tmp_path / "pac_database"
+    # Run from another folder; report location must not depend on cwd
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    records = list(iter_terrascan_records(rego, report_dir=quarantine_dir(pac_db_dir)))
+    assert [record["id"] for record in records] == ["AC_AWS_1"]
+    entries = load_quarantine("Terrascan", quarantine_dir(pac_db_dir))
+    assert list(entries) == [os.path.join(rego, "aws", "bad.json")]
+    assert entries[os.path.join(rego, "aws", "bad.json")]["error"] == "JSONDecodeError"
+    assert not (elsewhere / "pac_database").exists()
+
+def test_retry_recovers_fixed_file(tmp_path, monkeypatch):
+    rego = _policies(tmp_path)
+    pac_db_dir = tmp_path / "pac_database"
+    monkeypatch.chdir(tmp_path)
+    list(iter_terrascan_records(rego, report_dir=quarantine_dir(pac_db_dir)))
+    assert retry_quarantine("Terrascan", pac_db_dir) == {"recovered": 0, "failed": 1}
+    (rego / "aws" / "bad.json").write_text(json.dumps({"id": "AC_AWS_2", "severity": "LOW"}))
+    assert retry_quarantine("Terrascan", pac_db_dir) == {"recovered": 1, "failed": 0}
+    assert load_quarantine("Terrascan", quarantine_dir(pac_db_dir)) == {}
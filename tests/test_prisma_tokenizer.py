@@ -0,0 +1,81 @@
+'''
+Tests of the Prisma policy reference tokenizer(parse_pac.get_prisma)
+Equivalence is checked against the previous regex parser(not_used/get_prisma_regex.py) on fixture documents
+'''
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+from parse_pac.get_prisma import _heading, parse_policy_adoc_records, parse_prisma_records, tokenize_prisma_adoc
+from parse_pac.normalize import apply_mappings
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "tests", "fixtures", "prisma")
+sys.path.insert(0, os.path.join(ROOT_DIR, "not_used"))
+from get_prisma_regex import parse_prisma_records_regex  # noqa: E402
+
+# Documents without the regex parser's known differences('/' or '=' within descriptions)
+EQUIVALENT_FIXTURES = ["bc-aws-s3-14.adoc", "bc-k8s-21.adoc", "bc-gcp-general-4.adoc", "aws-policies.adoc"]
+# Regex parser cut code blocks at the first '*'; compared separately
+CODE_COLUMN = "Insecure Code Example 1"
+
+def _fixture(name):
+    path = os.path.join(FIXTURE_DIR, name)
+    with open(path, encoding="utf-8") as f:
+        return path, f.read()
+
+@pytest.mark.parametrize("name", EQUIVALENT_FIXTURES)
+def test_equivalent_to_regex_parser(name):
+    path, text = _fixture(name)
+    # Tokenizer emits raw severity; mapped by the shared normalization stage like in the pipeline
+    new = pd.DataFrame(parse_policy_adoc_records(path))
+    if not new.empty:
+        new = apply_mappings(new, "Prisma")
+    old = pd.DataFrame(parse_prisma_records_regex(text))
+    assert len(new) == len(old)
+    if new.empty:
+        return
+    cols = [col for col in new.columns if col != CODE_COLUMN]
+    assert new[cols].fillna("").astype(str).equals(old.reindex(columns=cols).fillna("").astype(str))
+
+def test_records_per_framework_with_code_examples():
+    path, _ = _fixture("bc-aws-s3-14.adoc")
+    records = parse_policy_adoc_records(path)
+    assert [record["IaC Framework"] for record in records] == ["Terraform", "CloudFormation"]
+    assert records[0]["CheckovID"] == "CKV_AWS_19"
+    assert records[0]["Query Document"].endswith("S3BucketEncryption.py")
+    code = json.loads(records[0][CODE_COLUMN])[0]
+    assert len(code) == 1
+    # Lines with '*' are kept(regex parser cut them off)
+    assert code[0].startswith("[source,go]") and 'sse_algorithm = "AES256"' in code[0] and code[0].endswith("----")
+
+def test_example_block_delimiter_is_not_a_heading():
+    assert _heading("====") is None
+    assert _heading("==Title") is None
+    assert _heading("== ") is None
+    assert _heading("=== Description") == (3, "Description")
+    tokens = tokenize_prisma_adoc("== T\n=== Description\nline one\n====\nexample\n====\nafter")
+    assert tokens["description"] == "line one\n====\nexample\n====\nafter"
+
+def test_example_block_fixture():
+    path, _ = _fixture("malformed-example-block.adoc")
+    records = parse_policy_adoc_records(path)
+    assert len(records) == 1
+    assert records[0]["Description"].endswith("after")
+    assert records[0]["Severity"] == "HIGH"
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("malformed", [
+    "== T\n=== Fix - Buildtime\n" + "*" * 200000,
+    "== T\n=== Description\n" + "=" * 200000 + "\n" + "/ = [\n" * 50000,
+    "== T\n|===\n" + "|Severity|" * 50000,
+    "== T\n=== Fix - Buildtime\n" + "*Terraform*\n[x\n" * 20000,
+])
+def test_linear_time_on_malformed_input(malformed):
+    start = time.perf_counter()
+    parse_prisma_records(malformed)
+    assert time.perf_counter() - start < 2.0
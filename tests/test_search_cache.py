@@ -0,0 +1,43 @@
+'''
+Tests of search_pac.search_cache
+'''
+import numpy as np
+import pandas as pd
+
+from search_pac.search_cache import QueryCache, refines
+from search_pac.search_query import parse_query, query_mask
+
+def _frame(rows: int = 1000) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Title": pd.array([f"s3 bucket {i}" if i % 7 else f"gcs {i}" for i in range(rows)], dtype="string"),
+        "Tool": pd.array(["KICS" if i % 3 else "Trivy" for i in range(rows)], dtype="string"),
+    })
+
+def test_refines_parsed_trees():
+    assert refines(parse_query("s3 b"), parse_query("s3"))
+    assert refines(parse_query("tool:KICS s3"), parse_query("tool:K"))
+    assert not refines(parse_query("s3"), parse_query("s3 b"))
+    assert not refines(parse_query("gcs"), parse_query("s3"))
+
+def test_narrowing_queries_refine_cached_results():
+    df = _frame()
+    cache = QueryCache()
+    queries = ["s", "s3", "s3 b", "s3 bucket 1", "tool:K s3 bucket 1"]
+    for query in queries:
+        positions = cache.search(df, "v1", query)
+        np.testing.assert_array_equal(positions, np.flatnonzero(query_mask(df, query)))
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["refined"] == len(queries) - 1
+
+def test_repeat_query_hits_and_new_version_misses():
+    df = _frame()
+    cache = QueryCache()
+    cache.search(df, "v1", "s3")
+    cache.search(df, "v1", "s3")
+    positions = cache.search(df, "v2", "s3 b")
+    # Results of v1 are dropped, so v2 is not refined from them
+    assert cache.stats() == {"entries": 1, "positions": len(positions), "hits": 1, "refined": 0, "misses": 2}
+
+def test_empty_query_is_all_rows():
+    assert QueryCache().search(_frame(), "v1", "  ") is None
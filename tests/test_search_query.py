@@ -0,0 +1,35 @@
+'''
+Tests of search_pac.search_query
+'''
+import pandas as pd
+import pytest
+
+from parse_pac.normalize import SEVERITY_ORDER, compact_frame
+from search_pac.search_query import QueryError, query_mask
+
+SEVERITIES = ["High", "Trace", "UNKNOWN", "Critical", "Low", None]
+
+@pytest.fixture(params=["compact", "categorical_ordered", "text"])
+def df(request):
+    '''Same severities as compact MASTER, as an ordered categorical with unknowns appended(older builds) and as plain text'''
+    if request.param == "compact":
+        return compact_frame(pd.DataFrame({"Severity": SEVERITIES}))
+    if request.param == "categorical_ordered":
+        dtype = pd.CategoricalDtype(SEVERITY_ORDER + ["Trace", "UNKNOWN"], ordered=True)
+        return pd.DataFrame({"Severity": pd.Series(SEVERITIES, dtype=dtype)})
+    return pd.DataFrame({"Severity": pd.Series(SEVERITIES, dtype="string")})
+
+@pytest.mark.parametrize("query, expected", [
+    ("severity>=High", [True, False, False, True, False, False]),
+    ("severity>Critical", [False] * 6),
+    ("severity>High", [False, False, False, True, False, False]),
+    ("severity<Medium", [False, False, False, False, True, False]),
+    ("severity<=info", [False] * 6),
+    ("-severity>=High", [False, True, True, False, True, True]),
+])
+def test_range_ignores_unknown_severities(df, query, expected):
+    assert query_mask(df, query).tolist() == expected
+
+def test_range_bound_must_be_known(df):
+    with pytest.raises(QueryError):
+        query_mask(df, "severity>=Trace")
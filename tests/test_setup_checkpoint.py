@@ -0,0 +1,96 @@
+'''
+Tests of init_setup.setup_checkpoint and the resume related parts of setup_base
+'''
+import json
+
+import pytest
+
+from init_setup.setup_base import dir_update
+from init_setup.setup_checkpoint import CHECKPOINT_FILE, Checkpoint
+from init_setup.setup_remote import SHA_FILE
+
+INFO = {"version": "1", "date": "20250101", "tool_info": {"KICS": {"url": "x"}, "Trivy": {"url": "y"}}}
+
+def test_journal_survives_restart(tmp_path):
+    checkpoint = Checkpoint(tmp_path, INFO)
+    assert not checkpoint.resumed
+    checkpoint.mark("KICS", "fetched", "abc")
+    checkpoint.mark("KICS", "parsed", {"rows": 3})
+    resumed = Checkpoint(tmp_path, INFO)
+    assert resumed.resumed
+    assert resumed.get("KICS", "fetched") == "abc"
+    assert resumed.summary() == {"KICS": ["fetched", "parsed"]}
+    assert resumed.fetched_tools() == ["KICS"]
+
+@pytest.mark.parametrize("change", [
+    {"version": "2"},
+    {"date": "20250102"},
+    {"tool_info": {"KICS": {"url": "z"}}},
+])
+def test_journal_of_other_version_info_is_ignored(tmp_path, change):
+    Checkpoint(tmp_path, INFO).mark("KICS", "fetched", "abc")
+    checkpoint = Checkpoint(tmp_path, {**INFO, **change})
+    assert not checkpoint.resumed
+    assert checkpoint.fetched_tools() == []
+    assert not checkpoint.done("KICS", "fetched")
+
+def test_corrupt_journal_starts_over(tmp_path):
+    (tmp_path / CHECKPOINT_FILE).write_text("{broken", encoding="utf-8")
+    assert not Checkpoint(tmp_path, INFO).resumed
+
+def test_mark_saved_only_adds_missing_formats(tmp_path):
+    checkpoint = Checkpoint(tmp_path, INFO)
+    checkpoint.mark_saved("KICS", ["csv", "json"])
+    checkpoint.mark_saved("KICS", ["json", "xlsx", "csv"])
+    checkpoint.mark_saved("KICS", ["csv"], stage="master")
+    resumed = Checkpoint(tmp_path, INFO)
+    assert resumed.get("KICS", "saved") == ["csv", "json", "xlsx"]
+    assert resumed.get("KICS", "master") == ["csv"]
+
+def test_mark_rejects_unknown_stage(tmp_path):
+    with pytest.raises(ValueError):
+        Checkpoint(tmp_path, INFO).mark("KICS", "uploaded")
+
+def test_reset_drops_stages(tmp_path):
+    checkpoint = Checkpoint(tmp_path, INFO)
+    checkpoint.mark("KICS", "fetched", "abc")
+    checkpoint.mark("KICS", "parsed", {"rows": 3})
+    checkpoint.reset("KICS", ("parsed",))
+    assert Checkpoint(tmp_path, INFO).summary() == {"KICS": ["fetched"]}
+    checkpoint.reset("KICS")
+    assert Checkpoint(tmp_path, INFO).summary() == {}
+
+def test_clear_removes_journal(tmp_path):
+    checkpoint = Checkpoint(tmp_path, INFO)
+    checkpoint.mark("KICS", "fetched", "abc")
+    assert (tmp_path / CHECKPOINT_FILE).exists()
+    checkpoint.clear()
+    assert not (tmp_path / CHECKPOINT_FILE).exists()
+    assert (checkpoint.tools, checkpoint.resumed) == ({}, False)
+    assert not Checkpoint(tmp_path, INFO).resumed
+    # Clearing without a journal is a no-op
+    checkpoint.clear()
+
+def test_dir_update_keeps_fetched_raw_dirs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw_dir = tmp_path / "pac_raw"
+    for tool in ("KICS", "Trivy"):
+        (raw_dir / tool).mkdir(parents=True)
+        (raw_dir / tool / "policy.json").write_text("{}", encoding="utf-8")
+    (raw_dir / SHA_FILE).write_text(json.dumps({"KICS": {"sha": "abc"}}), encoding="utf-8")
+    (raw_dir / "stray.txt").write_text("x", encoding="utf-8")
+    dir_update(str(tmp_path), str(raw_dir), False, keep=["KICS", SHA_FILE])
+    assert sorted(path.name for path in raw_dir.iterdir()) == sorted(["KICS", SHA_FILE])
+    assert (raw_dir / "KICS" / "policy.json").exists()
+
+def test_dir_update_without_keep_empties_raw_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw_dir = tmp_path / "pac_raw"
+    (raw_dir / "KICS").mkdir(parents=True)
+    (raw_dir / SHA_FILE).write_text("{}", encoding="utf-8")
+    dir_update(str(tmp_path), str(raw_dir), False)
+    assert list(raw_dir.iterdir()) == []
+    # Valid data is left untouched
+    (raw_dir / "KICS").mkdir()
+    dir_update(str(tmp_path), str(raw_dir), True)
+    assert [path.name for path in raw_dir.iterdir()] == ["KICS"]
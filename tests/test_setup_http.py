@@ -0,0 +1,75 @@
+'''
+Tests of init_setup.setup_url.setup_http(and KICS query table extraction) against a local stand-in HTTP server
+'''
+import functools
+import http.server
+import os
+import threading
+
+import pytest
+import requests
+
+from init_setup.setup_url.setup_http import HttpFetcher
+from init_setup.setup_url.setup_kics import extract_query_table
+
+QUERY_PAGE = (
+    "<table><tr><th>Nav</th></tr></table>"
+    "<table><tr><th>Query Name</th><th>Query Details</th></tr>"
+    "<tr><td>A  query</td><td><a href='a.html'>View</a></td></tr>"
+    "<tr><td>B</td><td><a href='/docs/b.html'>View</a></td></tr></table>"
+)
+
+@pytest.fixture
+def server(tmp_path):
+    '''Base URL of a local server serving tmp_path/site'''
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "queries.html").write_text(QUERY_PAGE, encoding="utf-8")
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(site))
+    # Keep test output clean
+    handler.func.log_message = lambda *args: None
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def fetcher(tmp_path):
+    fetcher = HttpFetcher(cache_dir=str(tmp_path / "cache"))
+    yield fetcher
+    fetcher.close()
+
+def test_repeat_fetch_is_served_from_disk_cache(server, fetcher):
+    url = f"{server}/queries.html"
+    content, from_cache = fetcher.fetch(url)
+    assert (content.decode("utf-8"), from_cache) == (QUERY_PAGE, False)
+    # Body of a 304 response must come from the cached file
+    _, body_path = fetcher._paths(url)
+    with open(body_path, "wb") as f:
+        f.write(b"cached")
+    assert fetcher.fetch(url) == (b"cached", True)
+
+def test_missing_cache_body_refetches(server, fetcher):
+    url = f"{server}/queries.html"
+    fetcher.fetch(url)
+    _, body_path = fetcher._paths(url)
+    os.remove(body_path)
+    assert fetcher.fetch(url) == (QUERY_PAGE.encode("utf-8"), False)
+
+def test_fetch_many_maps_failures_to_exceptions(server, fetcher):
+    ok, missing = f"{server}/queries.html", f"{server}/missing.html"
+    results = fetcher.fetch_many([ok, missing, ok])
+    assert list(results) == [ok, missing]
+    assert results[ok] == QUERY_PAGE.encode("utf-8")
+    assert isinstance(results[missing], requests.HTTPError)
+
+def test_extract_query_table_picks_largest_table_with_absolute_links(server, fetcher):
+    url = f"{server}/queries.html"
+    rows = extract_query_table(fetcher.fetch_text(url), url)
+    assert rows == [
+        ["Query Name", "Query Details"],
+        ["A query", f"{server}/a.html"],
+        ["B", f"{server}/docs/b.html"],
+    ]
+    assert extract_query_table("<p>no table</p>", url) == []
@@ -0,0 +1,49 @@
+'''
+Tests of init_setup.setup_jobs
+'''
+import json
+import time
+
+from init_setup.setup_jobs import DONE, FAILED, JobRunner
+
+def _wait(runner, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get_job(job_id)
+        if job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job did not finish: {job_id}")
+
+def test_logs_are_appended_outside_status_file(tmp_path):
+    def run_job(params, log, progress):
+        for i in range(params["lines"]):
+            log("info", f"line {i}")
+            progress((i + 1) / params["lines"], f"step {i}")
+        return "ok"
+    runner = JobRunner(tmp_path, run_job)
+    job_id, _ = runner.submit({"lines": 5})
+    job = _wait(runner, job_id)
+    assert (job["status"], job["result"], job["progress"]) == (DONE, "ok", 1.0)
+    with open(tmp_path / f"{job_id}.json", "r", encoding="utf-8") as f:
+        assert "logs" not in json.load(f)
+    assert [line["message"] for line in runner.get_logs(job_id)] == [f"line {i}" for i in range(5)]
+    assert [line["message"] for line in runner.get_logs(job_id, limit=2)] == ["line 3", "line 4"]
+    # Other processes read the same files
+    assert len(JobRunner(tmp_path, run_job).get_logs(job_id)) == 5
+
+def test_failed_job_logs_traceback(tmp_path):
+    def run_job(params, log, progress):
+        raise RuntimeError("boom")
+    runner = JobRunner(tmp_path, run_job)
+    job_id, _ = runner.submit({})
+    job = _wait(runner, job_id)
+    assert (job["status"], job["error"]) == (FAILED, "RuntimeError: boom")
+    logs = runner.get_logs(job_id)
+    assert logs[-1]["kind"] == "error" and "RuntimeError: boom" in logs[-1]["message"]
+
+def test_incomplete_log_line_is_skipped(tmp_path):
+    runner = JobRunner(tmp_path, lambda params, log, progress: None)
+    (tmp_path / "x.log").write_text('{"time": "t", "kind": "info", "message": "a"}\n{"time": "t", "ki', encoding="utf-8")
+    assert runner.get_logs("x") == [{"time": "t", "kind": "info", "message": "a"}]
+    assert runner.get_logs("missing") == []
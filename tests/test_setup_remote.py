@@ -0,0 +1,83 @@
+'''
+Tests of init_setup.setup_remote against local bare repositories
+'''
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from init_setup.setup_remote import SHA_FILE, check_upstream, load_fetched_shas, remote_head, save_fetched_sha
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+def _git(*args):
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout.strip()
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    '''(work tree, bare repo) with a single commit on 'main' pushed to bare repo'''
+    for key in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{key}_NAME", "test")
+        monkeypatch.setenv(f"GIT_{key}_EMAIL", "test@example.com")
+    work, bare = tmp_path / "work", tmp_path / "bare.git"
+    _git("init", "--bare", str(bare))
+    _git("init", str(work))
+    _git("-C", str(work), "checkout", "-b", "main")
+    _git("-C", str(work), "commit", "--allow-empty", "-m", "init")
+    _git("-C", str(work), "push", str(bare), "main")
+    return work, bare
+
+def _commit(work, bare, message):
+    _git("-C", str(work), "commit", "--allow-empty", "-m", message)
+    _git("-C", str(work), "push", str(bare), "main")
+    return _git("-C", str(work), "rev-parse", "HEAD")
+
+def _tool_info(bare, **overrides):
+    return {"Local": {"url": str(bare), "is_repo": "True", "folder_path": "x", "branch": "main", "head_path": "x", **overrides}}
+
+def test_remote_head_resolves_branch_tag_and_sha(repo):
+    work, bare = repo
+    head = _git("-C", str(work), "rev-parse", "HEAD")
+    _git("-C", str(work), "tag", "-a", "v1", "-m", "v1")
+    _git("-C", str(work), "push", str(bare), "v1")
+    assert remote_head(str(bare), "main") == head
+    # Annotated tag resolves to the commit it points to
+    assert remote_head(str(bare), "v1") == head
+    assert remote_head(str(bare), head) == head
+    assert remote_head(str(bare), "missing") is None
+
+def test_check_upstream_reports_unchanged_then_changed(repo, tmp_path):
+    work, bare = repo
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    tool_info = _tool_info(bare)
+    assert check_upstream(raw_dir, tool_info, ["Local"])["Local"]["changed"]
+    save_fetched_sha(raw_dir, "Local", tool_info["Local"], remote_head(str(bare), "main"))
+    assert check_upstream(raw_dir, tool_info, ["Local"])["Local"] == {"sha": remote_head(str(bare), "main"), "changed": False}
+    new_head = _commit(work, bare, "next")
+    assert check_upstream(raw_dir, tool_info, ["Local"])["Local"] == {"sha": new_head, "changed": True}
+
+def test_source_mismatch_counts_as_changed(repo, tmp_path):
+    _, bare = repo
+    tool_info = _tool_info(bare)
+    save_fetched_sha(tmp_path, "Local", tool_info["Local"], remote_head(str(bare), "main"))
+    moved = _tool_info(bare, folder_path="y")
+    assert check_upstream(tmp_path, moved, ["Local"])["Local"]["changed"]
+    assert not check_upstream(tmp_path, tool_info, ["Local"])["Local"]["changed"]
+
+def test_unreachable_remote_counts_as_changed(tmp_path):
+    tool_info = _tool_info(tmp_path / "missing.git")
+    save_fetched_sha(tmp_path, "Local", tool_info["Local"], "0" * 40)
+    assert check_upstream(tmp_path, tool_info, ["Local"])["Local"] == {"sha": None, "changed": True}
+
+def test_fetched_shas_file(tmp_path):
+    assert load_fetched_shas(tmp_path) == {}
+    (tmp_path / SHA_FILE).write_text("{broken", encoding="utf-8")
+    assert load_fetched_shas(tmp_path) == {}
+    tool_info = _tool_info(tmp_path)["Local"]
+    save_fetched_sha(tmp_path, "Local", tool_info, "a" * 40)
+    record = json.loads((tmp_path / SHA_FILE).read_text(encoding="utf-8"))["Local"]
+    assert record == {"sha": "a" * 40, "source": {"url": str(tmp_path), "folder_path": "x", "branch": "main", "head_path": "x"}}
+    save_fetched_sha(tmp_path, "Local", tool_info, None)
+    assert load_fetched_shas(tmp_path) == {}
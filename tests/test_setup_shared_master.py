@@ -0,0 +1,83 @@
+'''
+Tests of init_setup.setup_shared_master and the MASTER loading fallback of setup_load_master
+'''
+import json
+import os
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from init_setup.setup_load_master import open_master
+from init_setup.setup_shared_master import (
+    KEEP_VERSIONS, POINTER_FILE, arrow_path, map_master, publish_master, read_master_pointer
+)
+from parse_pac.normalize import compact_frame
+
+def _frame(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Open-source Tool": ["KICS", "Trivy", "KICS"][:rows],
+        "Severity": ["High", "Low", None][:rows],
+        "Title": ["A", None, "C"][:rows],
+    })
+
+def _published(master_db_dir) -> list:
+    return sorted(name for name in os.listdir(master_db_dir) if name.endswith(".arrow"))
+
+def test_publish_then_map_round_trips_compact_frame(tmp_path):
+    df = _frame()
+    publish_master(tmp_path, df, "v1")
+    master_df, version = map_master(tmp_path)
+    assert version == "v1"
+    expected = compact_frame(df)
+    pdt.assert_frame_equal(master_df, expected)
+    assert isinstance(master_df["Severity"].dtype, pd.CategoricalDtype)
+    assert list(master_df["Severity"].cat.categories) == list(expected["Severity"].cat.categories)
+    assert master_df["Title"].dtype == pd.StringDtype("pyarrow")
+
+def test_pointer_swaps_to_new_version(tmp_path):
+    publish_master(tmp_path, _frame(), "v1")
+    old_df, _ = map_master(tmp_path)
+    publish_master(tmp_path, _frame(1), "v2")
+    pointer = read_master_pointer(tmp_path)
+    assert (pointer["version"], pointer["file"], pointer["rows"]) == ("v2", os.path.basename(arrow_path(tmp_path, "v2")), 1)
+    new_df, version = map_master(tmp_path)
+    assert (version, len(new_df)) == ("v2", 1)
+    # Readers of the previous version keep their mapping
+    assert len(old_df) == 3 and old_df["Title"].tolist()[0] == "A"
+    # No temporary files are left behind
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_only_latest_versions_are_kept(tmp_path):
+    versions = [f"v{i}" for i in range(KEEP_VERSIONS + 2)]
+    for version in versions:
+        publish_master(tmp_path, _frame(), version)
+    assert _published(tmp_path) == sorted(os.path.basename(arrow_path(tmp_path, version)) for version in versions[-KEEP_VERSIONS:])
+
+def test_republished_version_is_not_pruned(tmp_path):
+    for version in ["v1", "v2", "v1"]:
+        publish_master(tmp_path, _frame(), version)
+    publish_master(tmp_path, _frame(), "v3")
+    assert _published(tmp_path) == ["MASTER_v1.arrow", "MASTER_v3.arrow"]
+
+@pytest.mark.parametrize("pointer", [None, "{broken", "missing file"])
+def test_missing_or_stale_pointer_is_not_mapped(tmp_path, pointer):
+    if pointer == "missing file":
+        publish_master(tmp_path, _frame(), "v1")
+        os.remove(arrow_path(tmp_path, "v1"))
+    elif pointer is not None:
+        (tmp_path / POINTER_FILE).write_text(pointer, encoding="utf-8")
+    assert read_master_pointer(tmp_path) is None
+    assert map_master(tmp_path) == (None, None)
+
+def test_open_master_falls_back_to_csv(tmp_path):
+    master_df_csv = tmp_path / "MASTER_db.csv"
+    _frame().to_csv(master_df_csv, index=False)
+    master_df, mem_report, version = open_master(str(master_df_csv), "mtime")
+    assert (len(master_df), version) == (3, "mtime")
+    assert mem_report is not None
+    (tmp_path / "MASTER_version.json").write_text(json.dumps({"version": "v-csv"}), encoding="utf-8")
+    assert open_master(str(master_df_csv), "mtime")[2] == "v-csv"
+    publish_master(tmp_path, _frame(1), "v-arrow")
+    master_df, mem_report, version = open_master(str(master_df_csv), "mtime")
+    assert (len(master_df), mem_report, version) == (1, None, "v-arrow")
@@ -0,0 +1,49 @@
+'''
+Tests of init_setup.setup_snapshot
+'''
+import datetime
+
+import pandas as pd
+import pytest
+
+from init_setup.setup_snapshot import SnapshotStore
+
+def _frame(ids, titles) -> pd.DataFrame:
+    return pd.DataFrame({"Open-source Tool": ["KICS"] * len(ids), "ID": ids, "IaC Framework": ["TF"] * len(ids), "Title": titles})
+
+def test_reader_sees_snapshots_recorded_by_another_instance(tmp_path):
+    reader = SnapshotStore(tmp_path)
+    writer = SnapshotStore(tmp_path)
+    first = writer.record(_frame(["a"], ["A"]), "v1", {"KICS": "x"}, datetime.datetime(2025, 1, 1))
+    assert reader.as_of(first["id"])["Title"].tolist() == ["A"]
+    second = writer.record(_frame(["a", "b"], ["A2", "B"]), "v1", {"KICS": "y"}, datetime.datetime(2025, 2, 1))
+    assert reader.as_of(second["id"])["Title"].tolist() == ["A2", "B"]
+    assert reader.diff(first["id"], second["id"])["added"]["ID"].tolist() == ["b"]
+
+def test_other_instance_does_not_duplicate_rows(tmp_path):
+    first, second = SnapshotStore(tmp_path), SnapshotStore(tmp_path)
+    first.record(_frame(["a"], ["A"]), "v1", {}, datetime.datetime(2025, 1, 1))
+    second.record(_frame(["a"], ["A"]), "v2", {}, datetime.datetime(2025, 2, 1))
+    assert len(SnapshotStore(tmp_path).index) == 1
+
+def test_incomplete_index_line_is_loaded_once_complete(tmp_path):
+    store = SnapshotStore(tmp_path)
+    with open(store.index_path, "w", encoding="utf-8") as f:
+        f.write("abc 0 1")
+    reader = SnapshotStore(tmp_path)
+    assert reader.index == {}
+    with open(store.index_path, "a", encoding="utf-8") as f:
+        f.write("0\n")
+    reader._refresh_index()
+    assert reader.index == {"abc": (0, 10)}
+
+def test_missing_rows_raise_descriptive_error(tmp_path):
+    store = SnapshotStore(tmp_path)
+    with pytest.raises(KeyError, match="missing from snapshot store index"):
+        store._read_rows(["unknown"])
+
+def test_catalog_stamp_changes_on_record(tmp_path):
+    store = SnapshotStore(tmp_path)
+    before = store.catalog_stamp()
+    store.record(_frame(["a"], ["A"]), "v1", {"KICS": "x"})
+    assert store.catalog_stamp() != before
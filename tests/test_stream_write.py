@@ -0,0 +1,42 @@
+'''
+Tests of init_setup.setup_stream_write
+'''
+import json
+import os
+
+import pandas as pd
+
+from init_setup.setup_stream_write import read_csv_chunks, write_formats
+
+COLUMNS = ["Open-source Tool", "ID", "Title"]
+
+def test_empty_tool_keeps_csv_header(tmp_path):
+    paths = write_formats(tmp_path, iter([]), "X", ["csv", "json", "xlsx"], columns=COLUMNS)
+    assert os.path.getsize(paths["csv"]) > 0
+    chunks = list(read_csv_chunks(paths["csv"]))
+    assert list(chunks[0].columns) == COLUMNS and chunks[0].empty
+
+def test_empty_csv_of_older_runs_reads_as_empty_frame(tmp_path):
+    path = tmp_path / "X_db.csv"
+    path.write_text("")
+    chunks = list(read_csv_chunks(path, columns=COLUMNS))
+    assert len(chunks) == 1 and chunks[0].empty
+    assert list(chunks[0].columns) == COLUMNS
+
+def test_chunks_round_trip(tmp_path):
+    df = pd.DataFrame({"Open-source Tool": ["KICS"] * 5, "ID": list("abcde"), "Title": ["t"] * 5})
+    paths = write_formats(tmp_path, df, "X", ["csv", "sql"], incremental=True)
+    chunks = list(read_csv_chunks(paths["csv"], chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks, ignore_index=True).equals(df.astype(object))
+
+def test_json_matches_single_frame_layout(tmp_path):
+    df = pd.DataFrame({"Open-source Tool": ["KICS"] * 5, "ID": list("abcde"), "Title": ["t", None, "é", "\"q\"", "t"]})
+    paths = write_formats(tmp_path, (df.iloc[i:i + 2] for i in range(0, 5, 2)), "X", ["json"])
+    with open(paths["json"], "r", encoding="utf-8") as f:
+        assert f.read() == df.to_json(orient="records", indent=2)
+
+def test_empty_json_is_empty_array(tmp_path):
+    paths = write_formats(tmp_path, iter([]), "X", ["json"], columns=COLUMNS)
+    with open(paths["json"], "r", encoding="utf-8") as f:
+        assert json.load(f) == []